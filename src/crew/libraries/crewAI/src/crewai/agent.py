@@ -134,6 +134,10 @@ class Agent(BaseAgent):
         default=None,
         description="KnowledgeSearchService method for searching in knowledge module with redis pub/sub",
     )
+    search_knowledges_batch: Optional[Any] = Field(
+        default=None,
+        description="KnowledgeSearchService method for several searches in one request",
+    )
     user_input_contextual_memory: Optional[Any] = Field(
         default=None,
         description="user_input_contextual_memory",
@@ -164,6 +168,40 @@ class Agent(BaseAgent):
         snippet = "\n\n".join(knowledge_snippets)
         return snippet
 
+    def _search_task_knowledges(self, task: Task) -> tuple[list, list]:
+        """Search agent and crew knowledges for the task, in one request if possible."""
+        searches = {}
+        # TODO: remove hardcode: search_limit, distance_threshold
+        if self.knowledge_collection_id:
+            searches["agent"] = {
+                "sender": "ag",
+                "knowledge_collection_id": self.knowledge_collection_id,
+                "query": task.prompt(),
+                "search_limit": 3,
+                "distance_threshold": 0.7,
+            }
+        if self.crew and self.crew.knowledge_collection_id:
+            searches["crew"] = {
+                "sender": "cr",
+                "knowledge_collection_id": self.crew.knowledge_collection_id,
+                "query": task.prompt(),
+                "search_limit": 3,
+                "distance_threshold": 0.7,
+            }
+        if not searches:
+            return [], []
+
+        if self.search_knowledges_batch is not None:
+            results = dict(
+                zip(searches, self.search_knowledges_batch(list(searches.values())))
+            )
+        else:
+            results = {
+                name: self.search_knowledges(**search)
+                for name, search in searches.items()
+            }
+        return results.get("agent", []), results.get("crew", [])
+
     def execute_task(
         self,
         task: Task,
@@ -220,16 +258,9 @@ class Agent(BaseAgent):
             self.user_input_contextual_memory = UserInputContextualMemory(
                 memory_config=self.crew.memory_config, um=self.crew._user_memory
             )
+        agent_knowledges, crew_knowledges = self._search_task_knowledges(task)
         agent_knowledge_snippet = ""
         if self.knowledge_collection_id:
-            # TODO: remove hardcode: search_limit, distance_threshold
-            agent_knowledges = self.search_knowledges(
-                sender="ag",
-                knowledge_collection_id=self.knowledge_collection_id,
-                query=task.prompt(),
-                search_limit=3,
-                distance_threshold=0.7,
-            )
             agent_knowledge_snippet = self._extract_knowledges(agent_knowledges)
             task_prompt += (
                 f'{KNOWLEDGE_KEYWORD} \n\n"{agent_knowledge_snippet}"'
@@ -239,14 +270,6 @@ class Agent(BaseAgent):
 
         if self.crew:
             if self.crew.knowledge_collection_id:
-                # TODO: remove hardcode: search_limit, distance_threshold
-                crew_knowledges = self.search_knowledges(
-                    sender="cr",
-                    knowledge_collection_id=self.crew.knowledge_collection_id,
-                    query=task.prompt(),
-                    search_limit=3,
-                    distance_threshold=0.7,
-                )
                 crew_knowledge_snippet = self._extract_knowledges(crew_knowledges)
                 if crew_knowledge_snippet:
                     if not agent_knowledge_snippet:
@@ -21,6 +21,13 @@ async def main():
     crewai_output_channel = os.environ.get(
         "CREWAI_OUTPUT_CHANNEL", "sessions:crewai_output"
     )
+    state_delta_messages = (
+        os.environ.get("GRAPH_STATE_DELTA_MESSAGES", "true").lower() == "true"
+    )
+    state_checkpoint_interval = int(
+        os.environ.get("GRAPH_STATE_CHECKPOINT_INTERVAL", 20)
+    )
+    graph_cache_size = int(os.environ.get("GRAPH_CACHE_SIZE", 128))
 
     # Initialize services
     redis_service = RedisService(host=redis_host, port=redis_port)
@@ -42,6 +49,9 @@ async def main():
         python_code_executor_service=python_code_executor_service,
         crewai_output_channel=crewai_output_channel,
         knowledge_search_service=knowledge_search_service,
+        state_delta_messages=state_delta_messages,
+        state_checkpoint_interval=state_checkpoint_interval,
+        graph_cache_size=graph_cache_size,
     )
 
     try:
@@ -14,9 +14,11 @@ class GraphMessage:
 @dataclass
 class FinishMessageData:
     output: object
-    state: dict
+    state: dict | None
     message_type: str = "finish"
     additional_data: dict | None = None
+    state_seq: int | None = None
+    state_delta: dict | None = None
 
 
 @dataclass
@@ -100,5 +102,7 @@ class ConditionGroupMessageData:
 @dataclass
 class ConditonGroupManipulationMessageData:
     group_name: int
-    state: dict
+    state: dict | None
+    state_seq: int | None = None
+    state_delta: dict | None = None
     
@@ -185,6 +185,10 @@ class CodeTaskData(BaseModel):
     entrypoint: str
     func_kwargs: dict | None = None
     global_kwargs: dict[str, Any] | None = None
+    # Channel the result is published to in addition to the shared results channel
+    reply_channel: str | None = None
+    # Tasks are queued fairly between sessions in the sandbox
+    session_id: int | None = None
 
 
 class CrewNodeData(BaseModel):
@@ -233,6 +237,13 @@ class EdgeData(BaseModel):
     end_key: str
 
 
+class ParallelEdgeData(BaseModel):
+    start_key: str
+    branches: list[str]
+    end_key: str
+    max_concurrency: int | None = None
+
+
 class ConditionalEdgeData(BaseModel):
     source: str
     python_code: PythonCodeData
@@ -248,6 +259,7 @@ class GraphData(BaseModel):
     edge_list: list[EdgeData] = []
     conditional_edge_list: list[ConditionalEdgeData] = []
     decision_table_node_list: list[DecisionTableNodeData] = []
+    parallel_edge_list: list[ParallelEdgeData] = []
     entry_point: str
 
 
@@ -265,3 +277,9 @@ class KnowledgeSearchMessage(BaseModel):
     query: str
     search_limit: int | None
     distance_threshold: float | None
+
+
+class KnowledgeSearchBatchMessage(BaseModel):
+    """Searches published together, every search gets its own response."""
+
+    searches: list[KnowledgeSearchMessage]
@@ -14,4 +14,5 @@ class SessionStatus(Enum):
         ERROR = "error"
 
 class ToolResponse(BaseModel):
-    data: Any
\ No newline at end of file
+    data: Any
+    image_id: str | None = None
\ No newline at end of file
@@ -80,6 +80,7 @@ class CrewParserService(metaclass=SingletonMeta):
             "step_callback": step_callback,
             "knowledge_collection_id": agent_data.knowledge_collection_id,
             "search_knowledges": self.knowledge_search_service.search_knowledges,
+            "search_knowledges_batch": self.knowledge_search_service.search_knowledges_batch,
         }
 
         return Agent(**agent_config)
@@ -1,4 +1,7 @@
+import json
 import time
+import hashlib
+import threading
 from typing import Any, Type
 from crewai.tools.base_tool import Tool
 from models.request_models import CodeResultData, CodeTaskData
@@ -11,6 +14,8 @@ from models.request_models import (
 )
 from crewai.tools import BaseTool
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pydantic import BaseModel
 from services.schema_converter.converter import generate_model_from_schema
 from services.pickle_encode import txt_to_obj
@@ -20,6 +25,13 @@ import asyncio
 
 
 class ProxyToolFactory:
+    """
+    Creates crewAI tools that run in the tool containers of the manager.
+
+    Class data of the tools is cached by tool alias and init configuration.
+    The manager reports the image that served class data and tool runs, the
+    cached class data of a tool is dropped once another image of it shows up.
+    """
 
     def __init__(
         self,
@@ -27,12 +39,81 @@ class ProxyToolFactory:
         port: int,
         redis_service: RedisService,
         python_code_executor_service: RunPythonCodeService,
+        pool_maxsize: int = 20,
     ):
         self.host = host
         self.port = port
         self.redis_service = redis_service
         self.python_code_executor_service = python_code_executor_service
         self.loop = asyncio.get_event_loop()
+        self.session = self._create_session(pool_maxsize=pool_maxsize)
+
+        # (tool alias, init configuration hash) -> class data
+        self._class_data: dict[tuple[str, str], dict] = {}
+        # tool alias -> id of the image the cached class data came from
+        self._image_ids: dict[str, str] = {}
+        self._class_data_lock = threading.Lock()
+
+    @staticmethod
+    def _create_session(pool_maxsize: int) -> requests.Session:
+        # Only failed connections are retried, a tool run must not be repeated
+        retry = Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5)
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        return session
+
+    @staticmethod
+    def _config_hash(tool_init_configuration: dict[str, Any] | None) -> str:
+        dumped = json.dumps(tool_init_configuration, sort_keys=True, default=str)
+        return hashlib.sha256(dumped.encode()).hexdigest()
+
+    def _update_image_id(self, tool_alias: str, image_id: str | None):
+        """Drop the cached class data of tool_alias if it came from another image."""
+        if image_id is None:
+            return
+        with self._class_data_lock:
+            if self._image_ids.get(tool_alias, image_id) != image_id:
+                logger.info(f"Image of tool {tool_alias} changed, dropping class data")
+                self._class_data = {
+                    key: data
+                    for key, data in self._class_data.items()
+                    if key[0] != tool_alias
+                }
+            self._image_ids[tool_alias] = image_id
+
+    def get_class_data(self, tool_data: ToolData) -> dict:
+        tool_init_configuration = None
+        if tool_data.tool_config is not None:
+            tool_init_configuration = tool_data.tool_config.tool_init_configuration
+
+        key = (tool_data.name_alias, self._config_hash(tool_init_configuration))
+        with self._class_data_lock:
+            data = self._class_data.get(key)
+        if data is not None:
+            return data
+
+        resp = self.post_data_with_retry(
+            url=f"http://{self.host}:{self.port}/tool/{tool_data.name_alias}/class-data",
+            json=ToolInitConfigurationModel(
+                tool_init_configuration=tool_init_configuration
+            ).model_dump(),
+        )
+        resp_data: dict = resp.json()
+        data: dict = txt_to_obj(resp_data["classdata"])
+        data["args_schema"] = generate_model_from_schema(
+            data["args_schema"]
+        )  # TODO: rename
+        data["args_schema"].model_rebuild()
+
+        logger.info(data)
+
+        self._update_image_id(tool_data.name_alias, resp_data.get("image_id"))
+        with self._class_data_lock:
+            self._class_data[key] = data
+        return data
 
     def create_python_code_proxy_tool(
         self, python_code_tool_data: PythonCodeToolData, global_kwargs: dict[str, Any]
@@ -66,24 +147,7 @@ class ProxyToolFactory:
 
     def create_proxy_tool(self, tool_data: ToolData) -> Type[BaseTool]:
 
-        tool_init_configuration = None
-        if tool_data.tool_config is not None:
-            tool_init_configuration = tool_data.tool_config.tool_init_configuration
-
-        resp = self.post_data_with_retry(
-            url=f"http://{self.host}:{self.port}/tool/{tool_data.name_alias}/class-data",
-            json=ToolInitConfigurationModel(
-                tool_init_configuration=tool_init_configuration
-            ).model_dump(),
-        )
-        data_txt = resp.json()["classdata"]
-        data: dict = txt_to_obj(data_txt)
-        data["args_schema"] = generate_model_from_schema(
-            data["args_schema"]
-        )  # TODO: rename
-        data["args_schema"].model_rebuild()
-        
-        logger.info(data)
+        data = self.get_class_data(tool_data=tool_data)
 
         proxy_tool_factory = self  # VERY BAD CODE!!
 
@@ -113,7 +177,7 @@ class ProxyToolFactory:
         run_kwargs: dict[str, Any],
     ) -> str:
 
-        response = requests.post(
+        response = self.session.post(
             url=f"http://{self.host}:{self.port}/tool/{tool_data.name_alias}/run",
             json={
                 "tool_config": tool_data.tool_config.model_dump(),
@@ -121,14 +185,16 @@ class ProxyToolFactory:
             },
         )
 
-        return ToolResponse.model_validate(response.json()).data
+        tool_response = ToolResponse.model_validate(response.json())
+        self._update_image_id(tool_data.name_alias, tool_response.image_id)
+        return tool_response.data
 
     # TODO: make async
     def fetch_data_with_retry(self, url, retries=15, delay=3):
         for attempt in range(retries):
             try:
                 print(f"Attempt {attempt + 1} to fetch data...")
-                resp = requests.get(url)
+                resp = self.session.get(url)
                 if resp.status_code == 200:
                     return resp
             except requests.exceptions.RequestException as e:
@@ -145,7 +211,7 @@ class ProxyToolFactory:
         for attempt in range(retries):
             try:
                 print(f"Attempt {attempt + 1} to fetch data...")
-                resp = requests.post(url=url, json=json)
+                resp = self.session.post(url=url, json=json)
                 if resp.status_code == 200:
                     return resp
             except requests.exceptions.RequestException as e:
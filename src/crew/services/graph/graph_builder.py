@@ -7,6 +7,7 @@ from loguru import logger
 
 
 from callbacks.session_callback_factory import CrewCallbackFactory
+from services.graph.session_context import SessionId
 from services.graph.subgraphs.decision_table_node import DecisionTableNodeSubgraph
 from services.graph.nodes.llm_node import LLMNode
 from models.state import *
@@ -17,6 +18,7 @@ from services.redis_service import RedisService
 from models.request_models import (
     ConditionGroupData,
     DecisionTableNodeData,
+    ParallelEdgeData,
     PythonCodeData,
     SessionData,
 )
@@ -30,6 +32,8 @@ class ReturnCodeError(Exception): ...
 
 
 class SessionGraphBuilder:
+    session_id = SessionId()
+
     def __init__(
         self,
         session_id: int,
@@ -58,6 +62,7 @@ class SessionGraphBuilder:
         self.knowledge_search_service = knowledge_search_service
 
         self._graph_builder = StateGraph(State)
+        self._nodes: dict[str, BaseNode] = {}
 
     def add_conditional_edges(
         self,
@@ -99,6 +104,7 @@ class SessionGraphBuilder:
                     python_code_data=python_code_data,
                     inputs=input_,
                     additional_global_kwargs=additional_global_kwargs,
+                    session_id=self.session_id,
                 )
             )
 
@@ -120,11 +126,38 @@ class SessionGraphBuilder:
     def set_entrypoint(self, node_name: str):
         self._graph_builder.set_entry_point(node_name)
 
-    def add_node(self, node: BaseNode):
+    def add_node(self, node: BaseNode | ParallelNode):
         async def inner(state: State, writer: StreamWriter):
             return await node.run(state, writer)
 
         self._graph_builder.add_node(node.node_name, inner)
+        self._nodes[node.node_name] = node
+
+    def add_parallel_edge(self, parallel_edge_data: ParallelEdgeData, node_name: str):
+        """
+        Adds a node running the branches concurrently between start_key and end_key.
+
+        Args:
+            parallel_edge_data (ParallelEdgeData): The branches and their concurrency limit.
+            node_name (str): The name of the node running the branches.
+        """
+        branches = []
+        for branch in parallel_edge_data.branches:
+            node = self._nodes.get(branch)
+            if not isinstance(node, BaseNode):
+                raise ValueError(
+                    f"Parallel branch {branch} should be a crew, python or llm node"
+                )
+            branches.append(node)
+
+        parallel_node = ParallelNode(
+            node_name=node_name,
+            branches=branches,
+            max_concurrency=parallel_edge_data.max_concurrency,
+        )
+        self.add_node(parallel_node)
+        self.add_edge(parallel_edge_data.start_key, node_name)
+        self.add_edge(node_name, parallel_edge_data.end_key)
 
     def add_decision_table_node(
         self, decision_table_node_data: DecisionTableNodeData
@@ -166,9 +199,9 @@ class SessionGraphBuilder:
 
         This method constructs and compiles a state graph based on the nodes and edges
         defined in the provided session data. It iterates over crew nodes, python nodes,
-        and LLM nodes, adding each to the graph. Additionally, it processes edges and
-        conditional edges to establish connections between nodes and sets the entry point
-        of the graph.
+        and LLM nodes, adding each to the graph. Additionally, it processes edges,
+        parallel edges and conditional edges to establish connections between nodes
+        and sets the entry point of the graph.
 
         Args:
             session_data (SessionData): The data containing the graph schema with nodes
@@ -218,6 +251,12 @@ class SessionGraphBuilder:
         for edge in schema.edge_list:
             self.add_edge(edge.start_key, edge.end_key)
 
+        for index, parallel_edge_data in enumerate(schema.parallel_edge_list):
+            self.add_parallel_edge(
+                parallel_edge_data=parallel_edge_data,
+                node_name=f"{parallel_edge_data.start_key}_parallel_{index}",
+            )
+
         for conditional_edge_data in schema.conditional_edge_list:
             self.add_conditional_edges(
                 from_node=conditional_edge_data.source,
@@ -1,4 +1,6 @@
+import hashlib
 import json
+from collections import OrderedDict
 from typing import Any
 from dotdict import DotDict
 from services.graph.graph_builder import SessionGraphBuilder, State
@@ -12,6 +14,9 @@ import asyncio
 from pathlib import Path
 from utils.helpers import load_env
 from services.graph.graph_builder import SessionGraphBuilder
+from services.graph.session_context import current_session_id
+from services.graph.state_delta_encoder import StateDeltaEncoder
+from langgraph.graph.state import CompiledStateGraph
 from services.knowledge_search_service import KnowledgeSearchService
 from dataclasses import asdict
 
@@ -26,6 +31,9 @@ class GraphSessionManagerService(metaclass=SingletonMeta):
         session_timeout_channel: str,
         crewai_output_channel: str,
         knowledge_search_service: KnowledgeSearchService,
+        state_delta_messages: bool = True,
+        state_checkpoint_interval: int = 20,
+        graph_cache_size: int = 128,
     ):
         """
         Initializes the GraphSessionManagerService with the required services and configuration.
@@ -36,6 +44,9 @@ class GraphSessionManagerService(metaclass=SingletonMeta):
             python_code_executor_service (RunPythonCodeService): The service responsible for executing Python code.
             session_schema_channel (str): The Redis channel for listening to session schema messages.
             crewai_output_channel (str): The Redis channel for publishing CrewAI output messages.
+            state_delta_messages (bool): Publish state changes instead of the full state in graph messages.
+            state_checkpoint_interval (int): Number of state messages between full state checkpoints.
+            graph_cache_size (int): Number of compiled graphs cached by schema, 0 disables the cache.
         """
 
         self.session_graph_pool: dict[int, asyncio.Task] = {}
@@ -46,34 +57,71 @@ class GraphSessionManagerService(metaclass=SingletonMeta):
         self.session_timeout_channel = session_timeout_channel
         self.crewai_output_channel = crewai_output_channel
         self.knowledge_search_service = knowledge_search_service
+        self.state_delta_messages = state_delta_messages
+        self.state_checkpoint_interval = state_checkpoint_interval
+        self.graph_cache_size = graph_cache_size
+        self._graph_cache: OrderedDict[str, CompiledStateGraph] = OrderedDict()
 
     def start(self):
         self._listener_task = asyncio.create_task(self._listen_to_channels())
         logger.info("Session Manager Service is now running.")
 
+    def get_graph(self, session_data: SessionData) -> CompiledStateGraph:
+        """
+        Returns the compiled graph for the graph schema of the session.
+
+        Compiled graphs are cached by a hash of the schema and shared by the
+        sessions running it, the session id is bound while a session runs
+        (see services.graph.session_context).
+        """
+        graph_hash = hashlib.sha256(
+            session_data.graph.model_dump_json().encode("utf-8")
+        ).hexdigest()
+
+        graph = self._graph_cache.get(graph_hash)
+        if graph is not None:
+            self._graph_cache.move_to_end(graph_hash)
+            logger.info(f"Using cached graph {graph_hash[:12]}")
+            return graph
+
+        session_graph_builder = SessionGraphBuilder(
+            session_id=session_data.id,
+            redis_service=self.redis_service,
+            crew_parser_service=self.crew_parser_service,
+            python_code_executor_service=self.python_code_executor_service,
+            crewai_output_channel=self.crewai_output_channel,
+            knowledge_search_service=self.knowledge_search_service,
+        )
+        graph = session_graph_builder.compile_from_schema(session_data=session_data)
+
+        if self.graph_cache_size > 0:
+            self._graph_cache[graph_hash] = graph
+            while len(self._graph_cache) > self.graph_cache_size:
+                self._graph_cache.popitem(last=False)
+        return graph
+
     async def run_session(self, session_data: SessionData):
 
         try:
             session_id = session_data.id
             initial_state = session_data.initial_state
+            # Every session runs in its own task, so the binding is per session
+            current_session_id.set(session_id)
 
-            session_graph_builder = SessionGraphBuilder(
-                session_id=session_id,
-                redis_service=self.redis_service,
-                crew_parser_service=self.crew_parser_service,
-                python_code_executor_service=self.python_code_executor_service,
-                crewai_output_channel=self.crewai_output_channel,
-                knowledge_search_service=self.knowledge_search_service,
-            )
-
-            graph = session_graph_builder.compile_from_schema(session_data=session_data)
+            graph = self.get_graph(session_data=session_data)
 
             state = {
                 "state_history": [],
                 "variables": DotDict(initial_state),
-                "system_variables": {"nodes": {}},
+                "system_variables": {"nodes": {}, "execution_counts": {}},
             }
 
+            state_delta_encoder = (
+                StateDeltaEncoder(self.state_checkpoint_interval)
+                if self.state_delta_messages
+                else None
+            )
+
             await self.redis_service.async_update_session_status(
                 session_id=session_id, status="run"
             )
@@ -81,6 +129,10 @@ class GraphSessionManagerService(metaclass=SingletonMeta):
                 state, stream_mode=["values", "custom"]
             ):
                 if stream_mode == "custom":
+                    if state_delta_encoder is not None:
+                        state_delta_encoder.encode(
+                            getattr(chunk, "message_data", None)
+                        )
                     data = asdict(chunk)
                     assert isinstance(data, dict), "custom chunk must be a dict"
 
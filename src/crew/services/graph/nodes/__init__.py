@@ -1,3 +1,4 @@
 from .base_node import BaseNode
 from .crew_node import CrewNode
-from .python_node import PythonNode
\ No newline at end of file
+from .python_node import PythonNode
+from .parallel_node import ParallelNode
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Any
 
+from services.graph.session_context import SessionId
 from services.graph.custom_message_writer import CustomSessionMessageWriter
 from models.graph_models import *
 from models.state import *
@@ -9,10 +10,12 @@ from langgraph.types import StreamWriter
 from dotdict import DotDict, Expression
 from utils import map_variables_to_input
 from utils import set_output_variables
+from utils import share_structure
 
 
 class BaseNode(ABC):
     TYPE = "BASE"
+    session_id = SessionId()
 
     def __init__(
         self,
@@ -39,6 +42,24 @@ class BaseNode(ABC):
 
         self.custom_session_message_writer = CustomSessionMessageWriter() or None
 
+    @staticmethod
+    def _execution_counts(state: State) -> dict[str, int]:
+        """
+        Number of finished executions by node name, kept next to the state
+        history so it does not have to be scanned. Built from the history once
+        if the state was created without it.
+        """
+        system_variables = state["system_variables"]
+        execution_counts = system_variables.get("execution_counts")
+        if execution_counts is None:
+            execution_counts = {}
+            for item in state.get("state_history") or []:
+                execution_counts[item["name"]] = (
+                    execution_counts.get(item["name"], 0) + 1
+                )
+            system_variables["execution_counts"] = execution_counts
+        return execution_counts
+
     def _calc_execution_order(self, state: State, name: str) -> int:
         """
         Calculate the number of times the node with the given name has been executed.
@@ -50,10 +71,7 @@ class BaseNode(ABC):
         Returns:
             int: The number of times the node has been executed.
         """
-        state_history = state.get("state_history", None)
-        if not state_history:
-            return 0
-        return sum(1 for item in state.get("state_history") if item["name"] == name)
+        return self._execution_counts(state).get(name, 0)
 
     def add_start_message(
         self, writer: StreamWriter, input_: Any, execution_order: int
@@ -222,18 +240,27 @@ class BaseNode(ABC):
         This function appends a new entry to the state's history, capturing the
         type, name, input, output, and any additional data. It deep copies the
         input, output, and additional data to ensure that the history reflects
-        the state at the time of execution.
+        the state at the time of execution. The variables snapshot shares every
+        unchanged part with the snapshot of the previous entry, so entries must
+        not be modified in place.
         """
 
+        execution_counts = self._execution_counts(state)
         variables = state["variables"]
         state_history = state["state_history"]
+        previous_variables = (
+            state_history[-1]["variables"] if state_history else {}
+        )
         state_history.append(
             {
                 "type": type,
                 "name": name,
                 "additional_data": copy.deepcopy(kwargs),
                 "input": copy.deepcopy(input),
-                "variables": copy.deepcopy(variables.model_dump()),
+                "variables": share_structure(
+                    variables.model_dump(), previous_variables
+                ),
                 "output": copy.deepcopy(output),
             }
         )
+        execution_counts[name] = execution_counts.get(name, 0) + 1
@@ -0,0 +1,126 @@
+import asyncio
+import copy
+
+from dotdict import DotDict
+from langgraph.types import StreamWriter
+from loguru import logger
+from models.state import State
+from services.graph.state_delta_encoder import diff_variables
+from .base_node import BaseNode
+
+
+def _set_path(variables: dict, path: list, value):
+    target = variables
+    for key in path[:-1]:
+        if not isinstance(target.get(key), dict):
+            target[key] = {}
+        target = target[key]
+    target[path[-1]] = value
+
+
+def _remove_path(variables: dict, path: list):
+    target = variables
+    for key in path[:-1]:
+        target = target.get(key)
+        if not isinstance(target, dict):
+            return
+    target.pop(path[-1], None)
+
+
+class ParallelNode:
+    """
+    Runs independent nodes concurrently and merges their results.
+
+    Every branch runs on its own copy of the state, so branches never see
+    changes of each other. When all branches are finished, their variable
+    changes and state history entries are applied in the order of the
+    branches, so the result does not depend on which branch finished first
+    and the last branch wins on conflicting variables.
+    """
+
+    TYPE = "PARALLEL"
+
+    def __init__(
+        self,
+        node_name: str,
+        branches: list[BaseNode],
+        max_concurrency: int | None = None,
+    ):
+        if not branches:
+            raise ValueError(f"Parallel node {node_name} has no branches")
+        self.node_name = node_name
+        self.branches = branches
+        self.max_concurrency = max_concurrency or len(branches)
+
+    @staticmethod
+    def _branch_state(state: State) -> State:
+        return {
+            # History entries are never modified, the list is enough to copy
+            "state_history": list(state["state_history"]),
+            "variables": DotDict(state["variables"].model_dump()),
+            "system_variables": copy.deepcopy(state["system_variables"]),
+        }
+
+    async def run(self, state: State, writer: StreamWriter) -> State:
+        logger.info(
+            f"Running {len(self.branches)} branches of {self.node_name}, "
+            f"{self.max_concurrency} at a time"
+        )
+        execution_counts = BaseNode._execution_counts(state)
+        branch_states = [self._branch_state(state) for _ in self.branches]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_branch(node: BaseNode, branch_state: State):
+            async with semaphore:
+                await node.run(branch_state, writer)
+
+        # A failed branch cancels the others, its error is raised as if the
+        # branch ran on its own instead of wrapped in an ExceptionGroup
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for node, branch_state in zip(self.branches, branch_states):
+                    task_group.create_task(run_branch(node, branch_state))
+        except ExceptionGroup as e:
+            raise e.exceptions[0] from None
+
+        return self._merge(state, branch_states, execution_counts)
+
+    def _merge(
+        self,
+        state: State,
+        branch_states: list[State],
+        execution_counts: dict[str, int],
+    ) -> State:
+        base_variables = state["variables"].model_dump()
+        variables = state["variables"].model_dump()
+        history_length = len(state["state_history"])
+        base_counts = dict(execution_counts)
+        changed_by: dict[tuple, str] = {}
+
+        for node, branch_state in zip(self.branches, branch_states):
+            changed, removed = diff_variables(
+                base_variables, branch_state["variables"].model_dump()
+            )
+            for path in removed:
+                _remove_path(variables, path)
+            for path, value in changed:
+                if tuple(path) in changed_by:
+                    logger.warning(
+                        f"Branches {changed_by[tuple(path)]} and {node.node_name} "
+                        f"of {self.node_name} both changed {path}, "
+                        f"keeping {node.node_name}"
+                    )
+                changed_by[tuple(path)] = node.node_name
+                _set_path(variables, path, value)
+
+            state["state_history"].extend(
+                branch_state["state_history"][history_length:]
+            )
+            branch_counts = branch_state["system_variables"]["execution_counts"]
+            for name, count in branch_counts.items():
+                execution_counts[name] = (
+                    execution_counts.get(name, 0) + count - base_counts.get(name, 0)
+                )
+
+        state["variables"] = DotDict(variables)
+        return state
@@ -40,6 +40,7 @@ class PythonNode(BaseNode):
             self.python_code_data,
             input_,
             additional_global_kwargs=additional_global_kwargs,
+            session_id=self.session_id,
         )
 
         python_message_data = PythonMessageData(
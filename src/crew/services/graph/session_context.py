@@ -0,0 +1,30 @@
+from contextvars import ContextVar
+
+# Id of the session the current task runs, set by GraphSessionManagerService.run_session
+current_session_id: ContextVar[int | None] = ContextVar(
+    "current_session_id", default=None
+)
+
+
+class SessionId:
+    """
+    session_id attribute of objects in a compiled graph.
+
+    Compiled graphs are cached and shared by all sessions with the same
+    graph schema, so the session id given when the graph was built is only
+    a fallback. While a session runs, the attribute is the id of that session.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        session_id = current_session_id.get()
+        if session_id is not None:
+            return session_id
+        return instance.__dict__[self.name]
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
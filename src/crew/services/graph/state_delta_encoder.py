@@ -0,0 +1,90 @@
+from typing import Any
+from utils import share_structure
+
+_MISSING = object()
+
+
+def diff_variables(
+    previous: Any, current: Any, path: tuple = ()
+) -> tuple[list[list], list[list]]:
+    """
+    Compare two variables snapshots.
+
+    Returns the changed paths with their new values, as [path, value] pairs,
+    and the removed paths. Dicts are compared key by key, any other changed
+    value is replaced as a whole.
+    """
+    if isinstance(previous, dict) and isinstance(current, dict):
+        changed = []
+        removed = [[*path, key] for key in previous if key not in current]
+        for key, value in current.items():
+            key_changed, key_removed = diff_variables(
+                previous.get(key, _MISSING), value, (*path, key)
+            )
+            changed.extend(key_changed)
+            removed.extend(key_removed)
+        return changed, removed
+
+    if type(previous) is type(current) and previous == current:
+        return [], []
+    return [[list(path), current]], []
+
+
+class StateDeltaEncoder:
+    """
+    Replaces the state of graph session messages with deltas.
+
+    One encoder per session. The first message with a state and every
+    checkpoint_interval-th one after it keep the full state, the others only
+    carry the changed and removed variable paths and the state history
+    entries appended since the previous message. Every message with a state
+    gets a sequence number, a delta applies to the state of base_seq.
+    """
+
+    def __init__(self, checkpoint_interval: int = 20):
+        self.checkpoint_interval = checkpoint_interval
+        self.seq = 0
+        self._variables = None
+        self._history_length = 0
+        self._last_history_item = None
+
+    def encode(self, message_data: Any) -> None:
+        state = getattr(message_data, "state", None)
+        if state is None:
+            return
+
+        variables = state["variables"]
+        state_history = state["state_history"]
+        checkpoint = (
+            self._variables is None
+            or self.seq % self.checkpoint_interval == 0
+            or not self._extends_history(state_history)
+        )
+        self.seq += 1
+        message_data.state_seq = self.seq
+
+        if not checkpoint:
+            changed, removed = diff_variables(self._variables, variables)
+            message_data.state = None
+            message_data.state_delta = {
+                "base_seq": self.seq - 1,
+                "changed": changed,
+                "removed": removed,
+                "state_history": state_history[self._history_length :],
+            }
+
+        # Keep a private copy, the message references the live state
+        self._variables = share_structure(variables, self._variables)
+        self._history_length = len(state_history)
+        self._last_history_item = state_history[-1] if state_history else None
+
+    def _extends_history(self, state_history: list) -> bool:
+        """
+        Whether state_history is the previous history with entries appended,
+        which is not the case for messages of parallel branches.
+        """
+        if len(state_history) < self._history_length:
+            return False
+        if self._history_length == 0:
+            return True
+        return state_history[self._history_length - 1] is self._last_history_item
@@ -1,6 +1,8 @@
 from datetime import datetime
 import json
+from dotdict import DotDict
 from loguru import logger
+from services.graph.session_context import SessionId
 from services.graph.custom_message_writer import CustomSessionMessageWriter
 from models.graph_models import FinishMessageData, GraphMessage, StartMessageData
 from models.request_models import (
@@ -11,6 +13,13 @@ from models.request_models import (
 from models.state import *
 from langgraph.types import StreamWriter
 from services.python_code_executor_service import RunPythonCodeService
+from utils.safe_expression import (
+    UnsafeOperationError,
+    compile_expression,
+    compile_manipulation,
+    evaluate_expression,
+    run_manipulation,
+)
 
 from langgraph.graph import StateGraph
 from langgraph.graph.state import CompiledStateGraph
@@ -23,6 +32,7 @@ class DecisionTableNodeDataError(Exception):
 
 class DecisionTableNodeSubgraph:
     TYPE = "DECISION_TABLE"
+    session_id = SessionId()
 
     def __init__(
         self,
@@ -78,6 +88,29 @@ class DecisionTableNodeSubgraph:
         if manipulation is None:
             return True
 
+        compiled = compile_manipulation(manipulation)
+        if compiled is not None:
+            # Runs on a copy, so a failed manipulation leaves the state untouched
+            variables = DotDict(state["variables"].model_dump())
+            try:
+                variables = run_manipulation(compiled, variables)
+                if isinstance(variables, DotDict):
+                    variables = variables.model_dump()
+                # Same values the sandbox could return
+                variables = json.loads(json.dumps(variables))
+            except UnsafeOperationError as e:
+                logger.debug(
+                    f"Manipulation is too large to run in-process, using sandbox: {e}"
+                )
+            except Exception as e:
+                raise DecisionTableNodeDataError(
+                    f"Manipulation execution failed with error: {e}"
+                )
+            else:
+                state["variables"].update(variables)
+                return
+        else:
+            logger.debug("Manipulation is outside of the safe subset, using sandbox")
         code = f"""
 def main(**kwargs) -> bool:
     variables = kwargs.get("variables", {{}})
@@ -109,7 +142,28 @@ def main(**kwargs) -> bool:
         expression: str,
         state: State,
     ) -> bool:
-
+        compiled = compile_expression(expression)
+        if compiled is not None:
+            # Expressions can not mutate, so they read the state variables directly
+            try:
+                result = evaluate_expression(compiled, state["variables"])
+            except UnsafeOperationError as e:
+                logger.debug(
+                    f"Expression is too large to run in-process, using sandbox: {e}"
+                )
+            except Exception as e:
+                raise DecisionTableNodeDataError(
+                    f"Expression execution failed with error: {e}"
+                )
+            else:
+                if not isinstance(result, bool):
+                    raise DecisionTableNodeDataError(
+                        "Expression execution failed with error: "
+                        "Expression must return a boolean value"
+                    )
+                return result
+        else:
+            logger.debug("Expression is outside of the safe subset, using sandbox")
         code = f"""
 def main(variables: dict) -> bool:
     result: bool = {expression}
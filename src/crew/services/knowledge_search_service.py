@@ -1,12 +1,13 @@
 import os
 import json
 import time
+import asyncio
 from uuid import uuid4
 from loguru import logger
 
 from utils.singleton_meta import SingletonMeta
 from services.redis_service import RedisService
-from models.request_models import KnowledgeSearchMessage
+from models.request_models import KnowledgeSearchBatchMessage, KnowledgeSearchMessage
 
 
 knowledge_search_get_channel = os.getenv(
@@ -18,10 +19,139 @@ knowledge_search_response_channel = os.getenv(
 
 
 class KnowledgeSearchService(metaclass=SingletonMeta):
-    def __init__(self, redis_service: RedisService):
+    """
+    Request/reply client for the knowledge service.
+
+    One shared listener is subscribed to the response channel and resolves
+    the waiting searches by uuid. The async methods run on the event loop,
+    the blocking ones are for crewAI agent threads and run the search on the
+    event loop of the service, so waiting does not hold a Redis connection.
+    """
+
+    def __init__(self, redis_service: RedisService, timeout: float = 15):
         self.redis_service = redis_service
+        self.timeout = timeout
 
-    def search_knowledges(
+        self._pending: dict[str, asyncio.Future] = {}
+        self._listener_task: asyncio.Task | None = None
+        self._listener_lock = asyncio.Lock()
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+
+    async def _ensure_listener(self):
+        """Subscribe to the response channel once, before the first search is published."""
+        self._loop = asyncio.get_running_loop()
+        if self._listener_task is not None and not self._listener_task.done():
+            return
+
+        async with self._listener_lock:
+            if self._listener_task is not None and not self._listener_task.done():
+                return
+            pubsub = await self.redis_service.async_subscribe(
+                knowledge_search_response_channel
+            )
+            self._listener_task = asyncio.create_task(self._listen(pubsub))
+
+    async def _listen(self, pubsub):
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    data: dict = json.loads(message["data"])
+                except Exception as e:
+                    logger.error(f"Invalid knowledge search response: {e}")
+                    continue
+
+                # Responses to other crew processes are published to the same channel
+                future = self._pending.pop(data.get("uuid"), None)
+                if future is not None and not future.done():
+                    future.set_result(data.get("results") or [])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Knowledge search listener stopped: {e}")
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError(f"Knowledge search listener stopped: {e}")
+                    )
+            self._pending.clear()
+        finally:
+            await pubsub.unsubscribe(knowledge_search_response_channel)
+            await pubsub.aclose()
+
+    async def asearch_knowledges_batch(self, searches: list[dict]) -> list[list[str]]:
+        """
+        Search several collections in one request.
+
+        Each search is a dict with the arguments of asearch_knowledges.
+        Returns the results in the order of the searches, searches without
+        a response within the timeout get no results.
+        """
+        if not searches:
+            return []
+
+        await self._ensure_listener()
+        loop = asyncio.get_running_loop()
+        messages = [
+            KnowledgeSearchMessage(
+                collection_id=search["knowledge_collection_id"],
+                uuid=f"{search['sender']}-{uuid4()}",
+                query=search["query"],
+                search_limit=search["search_limit"],
+                distance_threshold=search["distance_threshold"],
+            )
+            for search in searches
+        ]
+        futures = []
+        for message in messages:
+            future = loop.create_future()
+            self._pending[message.uuid] = future
+            futures.append(future)
+
+        start_time = time.monotonic()
+        try:
+            if len(messages) == 1:
+                payload = messages[0].model_dump()
+            else:
+                payload = KnowledgeSearchBatchMessage(searches=messages).model_dump()
+            await self.redis_service.async_publish(
+                knowledge_search_get_channel, payload
+            )
+
+            done, _ = await asyncio.wait(futures, timeout=self.timeout)
+        finally:
+            for message in messages:
+                self._pending.pop(message.uuid, None)
+
+        results = []
+        for message, future in zip(messages, futures):
+            if future not in done:
+                future.cancel()
+                logger.error(
+                    f"Search in collection {message.collection_id} failed: "
+                    f"No response received within {self.timeout} seconds"
+                )
+                results.append([])
+            elif future.exception() is not None:
+                logger.error(
+                    f"Search in collection {message.collection_id} failed: "
+                    f"{future.exception()}"
+                )
+                results.append([])
+            else:
+                results.append(future.result())
+                logger.info(
+                    f"Knowledge searching for collection {message.collection_id} "
+                    f"completed in {round(time.monotonic() - start_time, 2)} sec. "
+                    f"Sender: {message.uuid}"
+                )
+        return results
+
+    async def asearch_knowledges(
         self,
         sender: str,
         knowledge_collection_id: int,
@@ -29,36 +159,54 @@ class KnowledgeSearchService(metaclass=SingletonMeta):
         search_limit: int,
         distance_threshold: float,
     ) -> list[str]:
-        pubsub = self.redis_service.sync_subscribe(
-            channel=knowledge_search_response_channel
-        )
-        execution_uuid = f"{sender}-{str(uuid4())}"
-
-        execution_message = KnowledgeSearchMessage(
-            collection_id=knowledge_collection_id,
-            uuid=execution_uuid,
-            query=query,
-            search_limit=search_limit,
-            distance_threshold=distance_threshold,
-        )
-
-        self.redis_service.sync_publish(
-            channel=knowledge_search_get_channel, message=execution_message.model_dump()
+        results = await self.asearch_knowledges_batch(
+            [
+                {
+                    "sender": sender,
+                    "knowledge_collection_id": knowledge_collection_id,
+                    "query": query,
+                    "search_limit": search_limit,
+                    "distance_threshold": distance_threshold,
+                }
+            ]
         )
+        return results[0]
 
-        timeout = 15  # seconds
-        start_time = time.monotonic()
-
-        while time.monotonic() - start_time < timeout:
-            message = pubsub.get_message()
-            if message and message["type"] == "message":
-                data: dict = json.loads(message["data"])
-                if data.get("uuid") == execution_uuid:
-                    logger.info(
-                        f"Knowledge searching for collection {data['collection_id']} completed in {round((time.monotonic() - start_time), 2)} sec. Sender: {sender}"
-                    )
-                    return data["results"]
-            time.sleep(0.1)
+    def search_knowledges_batch(self, searches: list[dict]) -> list[list[str]]:
+        """Blocking asearch_knowledges_batch, for threads other than the event loop thread."""
+        if self._loop is None:
+            raise RuntimeError(
+                "KnowledgeSearchService was created outside of an event loop"
+            )
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "Blocking knowledge search in the event loop, use asearch_knowledges"
+            )
+        return asyncio.run_coroutine_threadsafe(
+            self.asearch_knowledges_batch(searches), self._loop
+        ).result()
 
-        logger.error(f"Search failed: No response received within {timeout} seconds")
-        return []
+    def search_knowledges(
+        self,
+        sender: str,
+        knowledge_collection_id: int,
+        query: str,
+        search_limit: int,
+        distance_threshold: float,
+    ) -> list[str]:
+        """Blocking asearch_knowledges, for threads other than the event loop thread."""
+        return self.search_knowledges_batch(
+            [
+                {
+                    "sender": sender,
+                    "knowledge_collection_id": knowledge_collection_id,
+                    "query": query,
+                    "search_limit": search_limit,
+                    "distance_threshold": distance_threshold,
+                }
+            ]
+        )[0]
@@ -74,6 +74,22 @@ class RedisService(metaclass=SingletonMeta):
         await self.aioredis_client.publish(channel, json.dumps(message))
         logger.info(f"Message published to channel '{channel}'.")
 
+    async def async_xadd(
+        self, stream: str, message: object, maxlen: int | None = None
+    ) -> str:
+        """
+        Add a message to a stream as its "data" field, the stream is trimmed
+        to about maxlen entries. Returns the id of the entry.
+        """
+        entry_id = await self.aioredis_client.xadd(
+            stream,
+            {"data": json.dumps(message)},
+            maxlen=maxlen,
+            approximate=True,
+        )
+        logger.info(f"Message added to stream '{stream}'.")
+        return entry_id
+
     def sync_publish(self, channel: str, message: object):
         self.sync_redis_client.publish(channel, json.dumps(message))
         logger.info(f"Message published to channel '{channel}'.")
@@ -1,4 +1,5 @@
 import json
+from functools import lru_cache
 from pathlib import Path
 import sys
 from tempfile import TemporaryDirectory
@@ -10,12 +11,24 @@ from pydantic import BaseModel
 
 
 def generate_model_from_schema(schema_dict: dict) -> Type[BaseModel]:
+    """
+    Generate a pydantic model from a JSON schema.
+
+    Models are cached by schema, so a schema used by many sessions is only
+    generated once.
+    """
+    return _generate_model(json.dumps(schema_dict))
+
+
+@lru_cache(maxsize=256)
+def _generate_model(schema_json: str) -> Type[BaseModel]:
+    schema_dict = json.loads(schema_json)
 
     with TemporaryDirectory() as temporary_directory_name:
         temporary_directory = Path(temporary_directory_name)
         output = Path(temporary_directory / "model.py")
         generate(
-            json.dumps(schema_dict),
+            schema_json,
             input_file_type=InputFileType.JsonSchema,
             output=output,
             # set up the output model types
@@ -0,0 +1,79 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from models.request_models import ToolConfigData, ToolData
+from services.crew.proxy_tool_factory import ProxyToolFactory
+from services.pickle_encode import obj_to_txt
+from tests.crew_parser_service.fixtures import (
+    mock_redis_service,
+    python_code_executor_service,
+)
+
+
+def class_data_response(image_id: str) -> MagicMock:
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        "classdata": obj_to_txt(
+            {
+                "name": "Mock tool",
+                "description": "Mock tool description",
+                "args_schema": {
+                    "title": "ArgsSchema",
+                    "type": "object",
+                    "properties": {"query": {"type": "string"}},
+                },
+            }
+        ),
+        "image_id": image_id,
+    }
+    return response
+
+
+def tool_data(tool_init_configuration: dict | None = None) -> ToolData:
+    return ToolData(
+        name_alias="mock_alias",
+        tool_config=ToolConfigData(
+            id=1, tool_init_configuration=tool_init_configuration
+        ),
+    )
+
+
+@pytest.fixture
+def proxy_tool_factory(mock_redis_service, python_code_executor_service):
+    factory = ProxyToolFactory(
+        host="127.0.0.1",
+        port=8001,
+        redis_service=mock_redis_service,
+        python_code_executor_service=python_code_executor_service,
+    )
+    factory.session = MagicMock()
+    return factory
+
+
+class TestProxyToolFactory:
+    def test_class_data_cached_per_init_configuration(self, proxy_tool_factory):
+        proxy_tool_factory.session.post.return_value = class_data_response("image-1")
+
+        proxy_tool_factory.create_proxy_tool(tool_data({"key": 1}))
+        proxy_tool_factory.create_proxy_tool(tool_data({"key": 1}))
+        assert proxy_tool_factory.session.post.call_count == 1
+
+        proxy_tool_factory.create_proxy_tool(tool_data({"key": 2}))
+        assert proxy_tool_factory.session.post.call_count == 2
+
+    def test_class_data_dropped_on_image_change(self, proxy_tool_factory):
+        proxy_tool_factory.session.post.return_value = class_data_response("image-1")
+        proxy_tool_factory.create_proxy_tool(tool_data())
+
+        run_response = MagicMock()
+        run_response.json.return_value = {"data": "result", "image_id": "image-2"}
+        proxy_tool_factory.session.post.return_value = run_response
+        assert (
+            proxy_tool_factory.run_tool_in_container(tool_data(), {"query": "q"})
+            == "result"
+        )
+
+        proxy_tool_factory.session.post.return_value = class_data_response("image-2")
+        proxy_tool_factory.create_proxy_tool(tool_data())
+        assert proxy_tool_factory.session.post.call_count == 3
@@ -0,0 +1,83 @@
+import asyncio
+from unittest.mock import Mock
+import pytest
+from dotdict import DotDict
+from services.graph.nodes import BaseNode, ParallelNode
+
+
+class SleepNode(BaseNode):
+    TYPE = "TEST"
+
+    def __init__(self, node_name: str, delay: float, output: dict | Exception, running: list):
+        super().__init__(
+            session_id=1, node_name=node_name, output_variable_path="variables"
+        )
+        self.custom_session_message_writer = Mock()
+        self.delay = delay
+        self.output = output
+        self.running = running
+
+    async def execute(self, state, writer, execution_order, input_):
+        self.running.append(1)
+        assert len(self.running) <= 2, "concurrency limit exceeded"
+        await asyncio.sleep(self.delay)
+        self.running.pop()
+        if isinstance(self.output, Exception):
+            raise self.output
+        return self.output
+
+
+def test_parallel_node_merges_branches_in_order():
+    running = []
+    branches = [
+        SleepNode("first", 0.03, {"first": 1, "shared": "first"}, running),
+        SleepNode("second", 0.01, {"second": 2, "shared": "second"}, running),
+        SleepNode("third", 0.02, {"third": 3}, running),
+    ]
+    parallel_node = ParallelNode("parallel", branches, max_concurrency=2)
+    state = {
+        "state_history": [],
+        "variables": DotDict({"initial": 0, "shared": None}),
+        "system_variables": {},
+    }
+
+    state = asyncio.run(parallel_node.run(state, writer=Mock()))
+
+    assert state["variables"].model_dump() == {
+        "initial": 0,
+        "shared": "second",
+        "first": 1,
+        "second": 2,
+        "third": 3,
+    }
+    assert [item["name"] for item in state["state_history"]] == [
+        "first",
+        "second",
+        "third",
+    ]
+    assert state["system_variables"]["execution_counts"] == {
+        "first": 1,
+        "second": 1,
+        "third": 1,
+    }
+
+
+def test_parallel_node_raises_branch_error():
+    running = []
+    branches = [
+        SleepNode("failing", 0.01, ValueError("branch failed"), running),
+        SleepNode("slow", 10, {"slow": 1}, running),
+    ]
+    parallel_node = ParallelNode("parallel", branches)
+    state = {
+        "state_history": [],
+        "variables": DotDict({"initial": 0}),
+        "system_variables": {},
+    }
+
+    with pytest.raises(ValueError, match="branch failed"):
+        asyncio.run(asyncio.wait_for(parallel_node.run(state, writer=Mock()), 1))
+
+    # The slow branch was cancelled and nothing was merged
+    assert running == [1]
+    assert state["variables"].model_dump() == {"initial": 0}
@@ -0,0 +1,26 @@
+import asyncio
+from services.graph.session_context import SessionId, current_session_id
+
+
+class SessionBoundNode:
+    session_id = SessionId()
+
+    def __init__(self, session_id: int):
+        self.session_id = session_id
+
+
+def test_session_id_is_bound_per_task():
+    node = SessionBoundNode(session_id=1)
+
+    async def run_session(session_id: int) -> int:
+        current_session_id.set(session_id)
+        await asyncio.sleep(0.01)
+        return node.session_id
+
+    async def run_sessions():
+        return await asyncio.gather(
+            asyncio.create_task(run_session(2)), asyncio.create_task(run_session(3))
+        )
+
+    assert asyncio.run(run_sessions()) == [2, 3]
+    assert node.session_id == 1
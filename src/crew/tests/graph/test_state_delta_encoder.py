@@ -0,0 +1,56 @@
+from models.graph_models import FinishMessageData
+from services.graph.state_delta_encoder import StateDeltaEncoder, diff_variables
+
+
+def finish_message(variables: dict, state_history: list) -> FinishMessageData:
+    return FinishMessageData(
+        output=None,
+        state={"variables": variables, "state_history": state_history},
+    )
+
+
+def test_diff_variables():
+    changed, removed = diff_variables(
+        {"a": {"b": 1, "c": 2}, "d": [1], "e": 1},
+        {"a": {"b": 1, "c": 3}, "d": [1, 2], "e": True},
+    )
+
+    assert changed == [[["a", "c"], 3], [["d"], [1, 2]], [["e"], True]]
+    assert removed == []
+    assert diff_variables({"a": {"b": 1}}, {"a": {}}) == ([], [["a", "b"]])
+
+
+def test_encode_deltas_between_checkpoints():
+    encoder = StateDeltaEncoder(checkpoint_interval=2)
+    state_history = [{"name": "first"}]
+    messages = []
+
+    for value in range(3):
+        message_data = finish_message({"value": value, "same": "x"}, state_history)
+        encoder.encode(message_data)
+        messages.append(message_data)
+        state_history.append({"name": f"node_{value}"})
+
+    first, second, third = messages
+    assert first.state_seq == 1 and first.state_delta is None
+    assert first.state["variables"] == {"value": 0, "same": "x"}
+
+    assert second.state_seq == 2 and second.state is None
+    assert second.state_delta == {
+        "base_seq": 1,
+        "changed": [[["value"], 1]],
+        "removed": [],
+        "state_history": [{"name": "node_0"}],
+    }
+
+    assert third.state_seq == 3 and third.state_delta is None
+    assert third.state["variables"] == {"value": 2, "same": "x"}
+
+
+def test_encode_ignores_messages_without_state():
+    encoder = StateDeltaEncoder()
+    message_data = {"message_type": "start"}
+
+    encoder.encode(message_data)
+
+    assert encoder.seq == 0
@@ -0,0 +1,158 @@
+import asyncio
+import json
+
+import fakeredis
+import pytest
+import pytest_asyncio
+
+from services.knowledge_search_service import (
+    KnowledgeSearchService,
+    knowledge_search_get_channel,
+    knowledge_search_response_channel,
+)
+from services.redis_service import RedisService
+from utils.singleton_meta import SingletonMeta
+
+
+def search(query: str, collection_id: int = 1) -> dict:
+    return {
+        "sender": "mock_agent",
+        "knowledge_collection_id": collection_id,
+        "query": query,
+        "search_limit": 3,
+        "distance_threshold": 0.7,
+    }
+
+
+@pytest.fixture
+def fake_server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
+
+
+@pytest_asyncio.fixture
+async def knowledge_search_service(fake_server):
+    SingletonMeta._instances.pop(RedisService, None)
+    SingletonMeta._instances.pop(KnowledgeSearchService, None)
+
+    redis_service = RedisService(host="127.0.0.1", port=6379)
+    redis_service.aioredis_client = fakeredis.FakeAsyncRedis(
+        server=fake_server, decode_responses=True
+    )
+    service = KnowledgeSearchService(redis_service=redis_service, timeout=1)
+    yield service
+
+    if service._listener_task is not None:
+        service._listener_task.cancel()
+        await asyncio.gather(service._listener_task, return_exceptions=True)
+    SingletonMeta._instances.pop(RedisService, None)
+    SingletonMeta._instances.pop(KnowledgeSearchService, None)
+
+
+@pytest_asyncio.fixture
+async def knowledge_service(fake_server):
+    """
+    Answers every search with its own response message in reverse order,
+    batches are fanned out per search like the knowledge service does.
+    """
+    client = fakeredis.FakeAsyncRedis(server=fake_server, decode_responses=True)
+    pubsub = client.pubsub()
+    await pubsub.subscribe(knowledge_search_get_channel)
+    received = []
+
+    async def respond():
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            data = json.loads(message["data"])
+            received.append(data)
+            searches = data["searches"] if "searches" in data else [data]
+            for search_data in reversed(searches):
+                await client.publish(
+                    knowledge_search_response_channel,
+                    json.dumps(
+                        {
+                            "uuid": search_data["uuid"],
+                            "results": [f"{search_data['query']} result"],
+                        }
+                    ),
+                )
+
+    task = asyncio.create_task(respond())
+    yield received
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await pubsub.aclose()
+
+
+class TestKnowledgeSearchService:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_searches_resolved_by_uuid(
+        self, knowledge_search_service, knowledge_service
+    ):
+        """
+            - Given searches waiting concurrently on the shared listener,
+            - When the responses arrive in another order,
+            - Then every search gets the results of its own uuid.
+        """
+        results = await asyncio.gather(
+            *(
+                knowledge_search_service.asearch_knowledges(**search(query))
+                for query in ("first", "second", "third")
+            )
+        )
+
+        assert results == [["first result"], ["second result"], ["third result"]]
+        assert len(knowledge_service) == 3
+        assert knowledge_search_service._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_batch_answered_per_search(
+        self, knowledge_search_service, knowledge_service
+    ):
+        """
+            - Given a batch of two searches,
+            - When it is published as one message and answered per search,
+            - Then the results are returned in the order of the searches.
+        """
+        results = await knowledge_search_service.asearch_knowledges_batch(
+            [search("first", collection_id=1), search("second", collection_id=2)]
+        )
+
+        assert results == [["first result"], ["second result"]]
+        assert len(knowledge_service) == 1
+        assert [
+            data["collection_id"] for data in knowledge_service[0]["searches"]
+        ] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_timeout_returns_no_results(self, knowledge_search_service):
+        """
+            - Given no knowledge service answers,
+            - When the timeout elapses,
+            - Then the search returns no results and is not pending anymore.
+        """
+        knowledge_search_service.timeout = 0.1
+
+        results = await knowledge_search_service.asearch_knowledges_batch(
+            [search("first"), search("second")]
+        )
+
+        assert results == [[], []]
+        assert knowledge_search_service._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_blocking_search(self, knowledge_search_service, knowledge_service):
+        """
+            - Given the service runs on the event loop,
+            - When the blocking search is called on the loop thread or another thread,
+            - Then it raises on the loop thread and returns the results on the other one.
+        """
+        with pytest.raises(RuntimeError, match="use asearch_knowledges"):
+            knowledge_search_service.search_knowledges(**search("first"))
+
+        results = await asyncio.to_thread(
+            knowledge_search_service.search_knowledges, **search("first")
+        )
+        assert results == ["first result"]
@@ -0,0 +1,139 @@
+import pytest
+from dotdict import DotDict
+from utils.safe_expression import (
+    UnsafeOperationError,
+    compile_expression,
+    compile_manipulation,
+    evaluate_expression,
+    run_manipulation,
+)
+
+
+@pytest.fixture
+def variables():
+    return DotDict({"count": 3, "name": "Alice", "user": {"tags": ["a", "b"]}})
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("variables.count > 2", True),
+        ("variables['name'].lower() == 'alice' and len(variables.user.tags) == 3", False),
+        ("'a' in variables.user.tags", True),
+        ("variables.get('missing') is None", True),
+        ("variables.count * 2 == 6 if variables.name else False", True),
+    ],
+)
+def test_evaluate_expression(variables, expression, expected):
+    code = compile_expression(expression)
+
+    assert code is not None
+    assert evaluate_expression(code, variables) is expected
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "__import__('os').system('ls')",
+        "variables.__class__",
+        "variables.add_property('x', '1')",
+        "open('/etc/passwd')",
+        "[x for x in variables.user.tags]",
+        "(lambda: True)()",
+        "variables.count ** 1000",
+        "variables.user.tags.append('c')",
+        "getattr(variables, '__dict__')",
+    ],
+)
+def test_unsafe_expression_is_not_compiled(expression):
+    assert compile_expression(expression) is None
+
+
+def test_expression_is_cached():
+    assert compile_expression("variables.count > 1") is compile_expression(
+        "variables.count > 1"
+    )
+
+
+def test_sequence_repetition_is_limited(variables):
+    code = compile_expression("len(variables.name * 1000000000) > 0")
+
+    with pytest.raises(ValueError):
+        evaluate_expression(code, variables)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "len(variables.name.replace('A', variables.name)) > 0",
+        "len(''.join(variables.user.tags)) > 0",
+        "len(variables.name.ljust(1000000000)) > 0",
+        "len(variables.name.center(1000000000)) > 0",
+        "len(variables.name.zfill(1000000000)) > 0",
+        "len(f'{variables.name:>1000000000}') > 0",
+    ],
+)
+def test_amplifying_expression_is_not_compiled(expression):
+    assert compile_expression(expression) is None
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "len(variables.name * 50000 + variables.name * 50000) > 0",
+        "len('%1000000000s' % variables.name) > 0",
+        "len(str([variables.name * 50000] * 50000)) > 0",
+        "sum([[0], [0]], []) == [0, 0]",
+    ],
+)
+def test_amplifying_expression_is_limited(variables, expression):
+    code = compile_expression(expression)
+
+    assert code is not None
+    with pytest.raises(UnsafeOperationError):
+        evaluate_expression(code, variables)
+
+
+@pytest.mark.parametrize(
+    "manipulation",
+    [
+        "x = variables.name * 50000\nx += x\nx += x",
+        "x = [0] * 50000\nx *= 3",
+        "x = variables.count * 1000000000\n" + "x = x * x\n" * 10,
+        "x = [0]\nx = [x, x]",
+        "x = [0]\nvariables.user.tags.append(x)",
+        "variables.copy = variables.user.tags",
+        "x = variables.user\nvariables.users = dict(first=x, second=x)",
+    ],
+)
+def test_amplifying_manipulation_is_limited(variables, manipulation):
+    code = compile_manipulation(manipulation)
+
+    assert code is not None
+    with pytest.raises(UnsafeOperationError):
+        run_manipulation(code, variables)
+
+
+def test_run_manipulation(variables):
+    code = compile_manipulation(
+        "variables.count += 1\nvariables.user.tags.append(variables.name)"
+    )
+
+    assert code is not None
+    variables = run_manipulation(code, variables)
+    assert variables.count == 4
+    assert variables.user.tags == ["a", "b", "Alice"]
+
+
+@pytest.mark.parametrize(
+    "manipulation",
+    [
+        "import os",
+        "len = variables.add_property",
+        "for tag in variables.user.tags: pass",
+        "variables['__properties__'] = {}",
+        "del variables.count",
+    ],
+)
+def test_unsafe_manipulation_is_not_compiled(manipulation):
+    assert compile_manipulation(manipulation) is None
@@ -0,0 +1,35 @@
+from utils.share_structure import share_structure
+
+
+def test_unchanged_parts_are_shared():
+    first = share_structure({"a": {"b": [1, 2]}, "c": 1, "d": ["x"]})
+    second = share_structure({"a": {"b": [1, 2]}, "c": 2, "d": ["x", "y"]}, first)
+
+    assert second == {"a": {"b": [1, 2]}, "c": 2, "d": ["x", "y"]}
+    assert second["a"] is first["a"]
+    assert second["d"] is not first["d"]
+    assert second["d"][0] is first["d"][0]
+    assert first == {"a": {"b": [1, 2]}, "c": 1, "d": ["x"]}
+
+
+def test_equal_snapshot_is_reused():
+    first = share_structure({"a": [{"b": 1}]})
+
+    assert share_structure({"a": [{"b": 1}]}, first) is first
+
+
+def test_snapshot_does_not_reference_value():
+    value = {"a": [[1, 2]], "b": {"c": 1}}
+    snapshot = share_structure(value)
+    value["a"][0].append(3)
+    value["b"]["c"] = 2
+
+    assert snapshot == {"a": [[1, 2]], "b": {"c": 1}}
+
+
+def test_leaves_of_another_type_are_not_shared():
+    first = share_structure({"a": 1, "b": [1]})
+    second = share_structure({"a": True, "b": [1.0]}, first)
+
+    assert second["a"] is True
+    assert isinstance(second["b"][0], float)
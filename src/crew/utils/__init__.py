@@ -5,4 +5,5 @@ from .ollama_loader import OllamaLoader
 from .groq import TokenThrottledChatGroq
 from .parse_llm import parse_llm
 from .map_variables import map_variables_to_input
-from .set_output_variables import set_output_variables
\ No newline at end of file
+from .set_output_variables import set_output_variables
+from .share_structure import share_structure
@@ -0,0 +1,480 @@
+import ast
+import copy
+from collections.abc import Mapping
+from functools import lru_cache
+from types import CodeType
+from typing import Any
+
+# Sequences longer than this can not be built in-process
+MAX_SEQUENCE_LENGTH = 100_000
+# Integers with more bits than this can not be built with "*" in-process
+MAX_INT_BITS = 4096
+
+SCALAR_TYPES = (type(None), bool, int, float, str, bytes)
+
+SAFE_BUILTINS = {
+    "abs": abs,
+    "all": all,
+    "any": any,
+    "bool": bool,
+    "dict": dict,
+    "float": float,
+    "int": int,
+    "isinstance": isinstance,
+    "len": len,
+    "list": list,
+    "max": max,
+    "min": min,
+    "round": round,
+    "set": set,
+    "sorted": sorted,
+    "str": str,
+    "sum": sum,
+    "tuple": tuple,
+}
+
+READ_ONLY_METHODS = {
+    "count",
+    "endswith",
+    "find",
+    "get",
+    "index",
+    "isdigit",
+    "items",
+    "keys",
+    "lower",
+    "lstrip",
+    "rstrip",
+    "split",
+    "startswith",
+    "strip",
+    "title",
+    "upper",
+    "values",
+}
+MUTATING_METHODS = {
+    "append",
+    "clear",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "setdefault",
+    "update",
+}
+
+_EXPRESSION_NODES = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.Compare,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.In,
+    ast.NotIn,
+    ast.Is,
+    ast.IsNot,
+    ast.IfExp,
+    ast.Constant,
+    ast.Name,
+    ast.Load,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Slice,
+    ast.List,
+    ast.Tuple,
+    ast.Dict,
+    ast.Set,
+    ast.Call,
+    ast.keyword,
+)
+_STATEMENT_NODES = (ast.Module, ast.Assign, ast.AugAssign, ast.Expr, ast.Store)
+
+
+class UnsafeOperationError(ValueError):
+    """
+    The code would build a value too large for the in-process evaluation,
+    it has to be executed in the sandbox.
+    """
+
+
+def _check_length(length: int):
+    if length > MAX_SEQUENCE_LENGTH:
+        raise UnsafeOperationError(f"Sequence longer than {MAX_SEQUENCE_LENGTH} items")
+
+
+def _check_scalars(values):
+    for value in values:
+        _scalar(value)
+
+
+def _scalar(value):
+    """
+    Containers can only be nested from literals, so no container is
+    referenced twice and the size of `variables` stays linear in the code.
+    """
+    if not isinstance(value, SCALAR_TYPES):
+        raise UnsafeOperationError(
+            f"'{type(value).__name__}' can not be stored in another container"
+        )
+    return value
+
+
+def _safe_add(left, right):
+    if isinstance(left, (str, bytes, list, tuple)) and type(left) is type(right):
+        _check_length(len(left) + len(right))
+        if isinstance(left, (list, tuple)):
+            _check_scalars(left)
+            _check_scalars(right)
+    return left + right
+
+
+def _safe_mul(left, right):
+    if isinstance(left, int) and isinstance(right, int):
+        if left.bit_length() + right.bit_length() > MAX_INT_BITS:
+            raise UnsafeOperationError(f"Integer larger than {MAX_INT_BITS} bits")
+    for sequence, times in ((left, right), (right, left)):
+        if isinstance(sequence, (str, bytes, list, tuple)) and isinstance(times, int):
+            _check_length(len(sequence) * times)
+            if isinstance(sequence, (list, tuple)):
+                _check_scalars(sequence)
+    return left * right
+
+
+def _safe_mod(left, right):
+    if isinstance(left, (str, bytes)):
+        raise UnsafeOperationError("String formatting is not allowed")
+    return left % right
+
+
+def _safe_iadd(target, value):
+    """`target += value`, lists are extended in place."""
+    if not isinstance(target, list):
+        return _safe_add(target, value)
+    _check_length(len(target) + len(value))
+    _check_scalars(target)
+    _check_scalars(value)
+    target += value
+    return target
+
+
+def _safe_imul(target, value):
+    """`target *= value`, lists are repeated in place."""
+    if not isinstance(target, list) or not isinstance(value, int):
+        return _safe_mul(target, value)
+    _check_length(len(target) * value)
+    _check_scalars(target)
+    target *= value
+    return target
+
+
+def _safe_sum(values, start=0):
+    if not isinstance(start, (int, float)):
+        raise UnsafeOperationError("Only numbers can be summed")
+    return sum(values, start)
+
+
+def _safe_str(*args, **kwargs):
+    if args:
+        _check_rendered_length(args[0], MAX_SEQUENCE_LENGTH)
+    return str(*args, **kwargs)
+
+
+def _check_rendered_length(value, budget: int) -> int:
+    """Budget left after rendering value, without rendering it."""
+    if isinstance(value, (str, bytes)):
+        budget -= len(value) + 2
+    elif isinstance(value, Mapping):
+        for key, item in value.items():
+            budget = _check_rendered_length(key, budget - 2)
+            budget = _check_rendered_length(item, budget)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            budget = _check_rendered_length(item, budget - 2)
+    elif isinstance(value, int):
+        budget -= value.bit_length() // 3 + 2
+    else:
+        budget -= 32
+    if budget < 0:
+        raise UnsafeOperationError(
+            f"String longer than {MAX_SEQUENCE_LENGTH} characters"
+        )
+    return budget
+
+
+def _safe_constructor(constructor: type):
+    def construct(*args, **kwargs):
+        for arg in args:
+            if isinstance(arg, Mapping):
+                _check_scalars(arg.values())
+            elif constructor is dict:
+                for item in arg:
+                    if not isinstance(item, (list, tuple)) or len(item) != 2:
+                        raise UnsafeOperationError("dict() takes a mapping or pairs")
+                    _check_scalars(item)
+            elif not isinstance(arg, (str, bytes)):
+                _check_scalars(arg)
+        _check_scalars(kwargs.values())
+        return constructor(*args, **kwargs)
+
+    return construct
+
+
+class _SafeSubsetValidator(ast.NodeVisitor):
+    """Rejects any node outside of the subset the decision tables need."""
+
+    def __init__(self, allowed_nodes: tuple, methods: set[str]):
+        self.allowed_nodes = allowed_nodes
+        self.methods = methods
+        self.assigned_names: set[str] = {"variables"}
+
+    def generic_visit(self, node: ast.AST):
+        if not isinstance(node, self.allowed_nodes):
+            raise ValueError(f"'{type(node).__name__}' is not allowed")
+        super().generic_visit(node)
+
+    def visit_Name(self, node: ast.Name):
+        if node.id.startswith("_"):
+            raise ValueError(f"Name '{node.id}' is not allowed")
+        if isinstance(node.ctx, ast.Store):
+            if node.id in SAFE_BUILTINS:
+                raise ValueError(f"Builtin '{node.id}' can not be reassigned")
+            self.assigned_names.add(node.id)
+        elif node.id not in SAFE_BUILTINS and node.id not in self.assigned_names:
+            raise ValueError(f"Name '{node.id}' is not defined")
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if node.attr.startswith("_"):
+            raise ValueError(f"Attribute '{node.attr}' is not allowed")
+        self.generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant):
+        if isinstance(node.value, str) and "__" in node.value:
+            raise ValueError("Dunder strings are not allowed")
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call):
+        if isinstance(node.func, ast.Name):
+            if node.func.id not in SAFE_BUILTINS:
+                raise ValueError(f"Function '{node.func.id}' is not allowed")
+        elif isinstance(node.func, ast.Attribute):
+            if node.func.attr not in self.methods:
+                raise ValueError(f"Method '{node.func.attr}' is not allowed")
+        else:
+            raise ValueError("Only builtins and methods can be called")
+        if any(keyword.arg is None for keyword in node.keywords):
+            raise ValueError("Double star arguments are not allowed")
+        self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign):
+        # The value is evaluated before the targets are bound
+        self.visit(node.value)
+        for target in node.targets:
+            self.visit(target)
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        # The target is evaluated twice once guarded
+        if any(isinstance(child, ast.Call) for child in ast.walk(node.target)):
+            raise ValueError("Calls are not allowed in augmented assignment targets")
+        if isinstance(node.target, ast.Name) and node.target.id not in self.assigned_names:
+            raise ValueError(f"Name '{node.target.id}' is not defined")
+        self.visit(node.value)
+        self.visit(node.op)
+        self.visit(node.target)
+
+
+_GUARDED_OPERATORS = {
+    ast.Add: "_safe_add",
+    ast.Mult: "_safe_mul",
+    ast.Mod: "_safe_mod",
+}
+_GUARDED_AUGMENTED_OPERATORS = {
+    ast.Add: "_safe_iadd",
+    ast.Mult: "_safe_imul",
+    ast.Mod: "_safe_mod",
+}
+_GUARDED_BUILTINS = {"dict", "list", "set", "sorted", "str", "sum", "tuple"}
+_DISPLAYS = (ast.Constant, ast.List, ast.Tuple, ast.Dict, ast.Set)
+
+
+def _call(name: str, args: list[ast.expr], keywords: list | None = None) -> ast.Call:
+    return ast.Call(
+        func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=keywords or []
+    )
+
+
+def _is_fresh(node: ast.expr) -> bool:
+    """Literals and guarded results are new containers holding only scalars."""
+    if isinstance(node, (ast.BinOp, *_DISPLAYS)):
+        return True
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id.startswith("_safe_")
+    )
+
+
+def _stored(node: ast.expr | None) -> ast.expr | None:
+    """Literals are checked element by element, other values have to be scalars."""
+    if node is None or _is_fresh(node):
+        return node
+    return ast.copy_location(_call("_scalar", [node]), node)
+
+
+def _load(node: ast.expr) -> ast.expr:
+    node = copy.deepcopy(node)
+    for child in ast.walk(node):
+        if hasattr(child, "ctx"):
+            child.ctx = ast.Load()
+    return node
+
+
+class _GuardSizes(ast.NodeTransformer):
+    """
+    Routes every operation that can grow a value through a size check, so
+    short code can not build huge strings, integers or nested containers.
+    """
+
+    def visit_BinOp(self, node: ast.BinOp):
+        self.generic_visit(node)
+        operator = _GUARDED_OPERATORS.get(type(node.op))
+        if operator is None:
+            return node
+        return ast.copy_location(_call(operator, [node.left, node.right]), node)
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        self.generic_visit(node)
+        operator = _GUARDED_AUGMENTED_OPERATORS.get(type(node.op))
+        if operator is None:
+            return node
+        return ast.copy_location(
+            ast.Assign(
+                targets=[node.target],
+                value=_call(operator, [_load(node.target), node.value]),
+            ),
+            node,
+        )
+
+    def visit_Assign(self, node: ast.Assign):
+        self.generic_visit(node)
+        if not all(isinstance(target, ast.Name) for target in node.targets):
+            node.value = _stored(node.value)
+        return node
+
+    def visit_Call(self, node: ast.Call):
+        self.generic_visit(node)
+        if isinstance(node.func, ast.Name) and node.func.id in _GUARDED_BUILTINS:
+            node.func = ast.Name(id=f"_safe_{node.func.id}", ctx=ast.Load())
+        elif (
+            isinstance(node.func, ast.Attribute)
+            and node.func.attr in MUTATING_METHODS
+        ):
+            node.args = [_stored(arg) for arg in node.args]
+            for keyword in node.keywords:
+                keyword.value = _stored(keyword.value)
+        return node
+
+    def visit_List(self, node: ast.List):
+        return self._visit_display(node, "elts")
+
+    def visit_Tuple(self, node: ast.Tuple):
+        return self._visit_display(node, "elts")
+
+    def visit_Set(self, node: ast.Set):
+        return self._visit_display(node, "elts")
+
+    def visit_Dict(self, node: ast.Dict):
+        self._visit_display(node, "keys")
+        return self._visit_display(node, "values")
+
+    def _visit_display(self, node: ast.expr, field: str):
+        self.generic_visit(node)
+        if isinstance(getattr(node, "ctx", ast.Load()), ast.Load):
+            setattr(node, field, [_stored(value) for value in getattr(node, field)])
+        return node
+
+
+def _compile(source: str, mode: str, allowed_nodes: tuple, methods: set[str]):
+    try:
+        tree = ast.parse(source, mode=mode)
+        _SafeSubsetValidator(allowed_nodes, methods).visit(tree)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+    tree = ast.fix_missing_locations(_GuardSizes().visit(tree))
+    return compile(tree, "<decision_table>", mode)
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> CodeType | None:
+    """
+    Compile a read-only expression over `variables`.
+
+    Returns None if the expression is outside of the safe subset,
+    such expressions have to be executed in the sandbox.
+    """
+    return _compile(expression.strip(), "eval", _EXPRESSION_NODES, READ_ONLY_METHODS)
+
+
+@lru_cache(maxsize=1024)
+def compile_manipulation(manipulation: str) -> CodeType | None:
+    """
+    Compile assignments and method calls that update `variables`.
+
+    Returns None if the manipulation is outside of the safe subset,
+    such manipulations have to be executed in the sandbox.
+    """
+    return _compile(
+        manipulation.strip(),
+        "exec",
+        _EXPRESSION_NODES + _STATEMENT_NODES,
+        READ_ONLY_METHODS | MUTATING_METHODS,
+    )
+
+
+def _namespace(variables: Any) -> dict[str, Any]:
+    return {
+        "__builtins__": SAFE_BUILTINS,
+        "_scalar": _scalar,
+        "_safe_add": _safe_add,
+        "_safe_mul": _safe_mul,
+        "_safe_mod": _safe_mod,
+        "_safe_iadd": _safe_iadd,
+        "_safe_imul": _safe_imul,
+        "_safe_sum": _safe_sum,
+        "_safe_str": _safe_str,
+        "_safe_dict": _safe_constructor(dict),
+        "_safe_list": _safe_constructor(list),
+        "_safe_set": _safe_constructor(set),
+        "_safe_sorted": _safe_constructor(sorted),
+        "_safe_tuple": _safe_constructor(tuple),
+        "variables": variables,
+    }
+
+
+def evaluate_expression(code: CodeType, variables: Any) -> Any:
+    """Evaluate code compiled by compile_expression."""
+    return eval(code, _namespace(variables))
+
+
+def run_manipulation(code: CodeType, variables: Any) -> Any:
+    """Run code compiled by compile_manipulation, returns the updated `variables`."""
+    namespace = _namespace(variables)
+    exec(code, namespace)
+    return namespace["variables"]
@@ -0,0 +1,57 @@
+import copy
+from typing import Any
+
+_MISSING = object()
+
+
+def share_structure(value: Any, previous: Any = _MISSING) -> Any:
+    """
+    Copy a JSON-like `value`, reusing the parts that are equal in `previous`.
+
+    Consecutive snapshots of the same variables mostly differ in a few keys,
+    so every unchanged dict, list or leaf of the new snapshot is the object
+    already stored in the previous one and memory grows with the changes
+    instead of the size of the variables. The result never references
+    containers of `value`, but shares objects with `previous`, so snapshots
+    must be treated as immutable.
+
+    Example:
+        ```
+        first = share_structure({"a": {"b": [1, 2]}, "c": 1})
+        second = share_structure({"a": {"b": [1, 2]}, "c": 2}, first)
+        second["a"] is first["a"]  # True
+        ```
+    """
+    if value is previous:
+        return value
+
+    if isinstance(value, dict):
+        if not isinstance(previous, dict):
+            previous = {}
+        shared = {
+            key: share_structure(item, previous.get(key, _MISSING))
+            for key, item in value.items()
+        }
+        if len(shared) == len(previous) and all(
+            key in previous and item is previous[key] for key, item in shared.items()
+        ):
+            return previous
+        return shared
+
+    if isinstance(value, list):
+        if not isinstance(previous, list):
+            previous = []
+        shared = [
+            share_structure(item, previous[index] if index < len(previous) else _MISSING)
+            for index, item in enumerate(value)
+        ]
+        if len(shared) == len(previous) and all(
+            item is previous_item for item, previous_item in zip(shared, previous)
+        ):
+            return previous
+        return shared
+
+    # Equal leaves of another type, e.g. 1 and True, are not interchangeable
+    if type(value) is type(previous) and value == previous:
+        return previous
+    return copy.deepcopy(value)
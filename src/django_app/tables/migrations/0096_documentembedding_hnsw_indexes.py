@@ -0,0 +1,47 @@
+from django.db import migrations
+
+# DocumentEmbedding.vector has no fixed dimensions because every collection may
+# use a different embedder. HNSW requires fixed dimensions, so there is one
+# partial expression index per supported embedding size. Knowledge search has
+# to use the same expression (vector::vector(N)) and predicate to hit them.
+# Must be kept in sync with INDEXED_DIMENSIONS in knowledge/storage.
+INDEXED_DIMENSIONS = (768, 1024, 1536)
+
+
+def _create_index_sql(dimensions: int) -> str:
+    return f"""
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS documentembedding_hnsw_{dimensions}
+    ON tables_documentembedding
+    USING hnsw ((vector::vector({dimensions})) vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64)
+    WHERE vector_dims(vector) = {dimensions};
+    """
+
+
+def _drop_index_sql(dimensions: int) -> str:
+    return f"DROP INDEX CONCURRENTLY IF EXISTS documentembedding_hnsw_{dimensions};"
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can not run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("tables", "0095_crew_memory_llm_config_and_more"),
+    ]
+
+    operations = [
+        # Iterative index scans (pgvector >= 0.8) keep filtered ANN search exact
+        # in the number of returned rows, update the extension to the installed version
+        migrations.RunSQL(
+            sql="ALTER EXTENSION vector UPDATE;",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        *[
+            migrations.RunSQL(
+                sql=_create_index_sql(dimensions),
+                reverse_sql=_drop_index_sql(dimensions),
+            )
+            for dimensions in INDEXED_DIMENSIONS
+        ],
+    ]
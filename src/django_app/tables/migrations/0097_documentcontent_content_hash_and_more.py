@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tables", "0096_documentembedding_hnsw_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="documentcontent",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="documentembedding",
+            name="chunk_hash",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="documentembedding",
+            name="embedder_model",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="documentembedding",
+            index=models.Index(
+                fields=["embedder_model", "chunk_hash"],
+                name="documentembedding_chunk_idx",
+            ),
+        ),
+        migrations.RunSQL(
+            sql="""
+            UPDATE tables_documentcontent
+            SET content_hash = encode(sha256(content), 'hex')
+            WHERE content_hash IS NULL;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
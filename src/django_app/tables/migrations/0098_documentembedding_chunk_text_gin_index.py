@@ -0,0 +1,26 @@
+from django.db import migrations
+
+# Full-text index for hybrid knowledge search. Knowledge search has to use the
+# same expression (to_tsvector with the same configuration) to hit it.
+# Must be kept in sync with TEXT_SEARCH_CONFIG in knowledge/storage.
+TEXT_SEARCH_CONFIG = "simple"
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can not run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("tables", "0097_documentcontent_content_hash_and_more"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS documentembedding_chunk_text_gin
+            ON tables_documentembedding
+            USING gin (to_tsvector('{TEXT_SEARCH_CONFIG}', chunk_text));
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS documentembedding_chunk_text_gin;",
+        ),
+    ]
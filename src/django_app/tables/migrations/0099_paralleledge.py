@@ -0,0 +1,41 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tables", "0098_documentembedding_chunk_text_gin_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ParallelEdge",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_key", models.CharField(max_length=255)),
+                ("branches", models.JSONField(default=list)),
+                ("end_key", models.CharField(max_length=255)),
+                (
+                    "max_concurrency",
+                    models.PositiveIntegerField(default=None, null=True),
+                ),
+                (
+                    "graph",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="parallel_edge_list",
+                        to="tables.graph",
+                    ),
+                ),
+            ],
+        ),
+    ]
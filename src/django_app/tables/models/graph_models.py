@@ -93,6 +93,18 @@ class Edge(models.Model):
         ]
 
 
+class ParallelEdge(models.Model):
+    """Nodes in branches run concurrently after start_key, then end_key runs."""
+
+    graph = models.ForeignKey(
+        "Graph", on_delete=models.CASCADE, related_name="parallel_edge_list"
+    )
+    start_key = models.CharField(max_length=255, blank=False)
+    branches = models.JSONField(default=list)
+    end_key = models.CharField(max_length=255, blank=False)
+    max_concurrency = models.PositiveIntegerField(null=True, default=None)
+
+
 class ConditionalEdge(models.Model):
 
     graph = models.ForeignKey(
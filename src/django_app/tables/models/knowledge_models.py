@@ -1,4 +1,5 @@
 from django.db import models
+import hashlib
 import uuid
 from pgvector.django import VectorField
 
@@ -152,9 +153,33 @@ class DocumentEmbedding(models.Model):
     vector = VectorField(
         null=True, blank=True
     )  # embedding vector, with flexible dimensions
+    # sha256 of chunk_text and the model that produced the vector,
+    # used by the knowledge service to reuse vectors of identical chunks
+    chunk_hash = models.CharField(max_length=64, null=True, blank=True)
+    embedder_model = models.CharField(max_length=255, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["embedder_model", "chunk_hash"],
+                name="documentembedding_chunk_idx",
+            )
+        ]
+
 
 class DocumentContent(models.Model):
 
     content = models.BinaryField(help_text="Binary file content (max 12MB)")
+    content_hash = models.CharField(
+        max_length=64, null=True, blank=True, db_index=True
+    )
+
+    @staticmethod
+    def calculate_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def save(self, *args, **kwargs):
+        if self.content_hash is None and self.content is not None:
+            self.content_hash = self.calculate_hash(bytes(self.content))
+        super().save(*args, **kwargs)
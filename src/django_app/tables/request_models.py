@@ -246,6 +246,13 @@ class EdgeData(BaseModel):
     end_key: str
 
 
+class ParallelEdgeData(BaseModel):
+    start_key: str
+    branches: list[str]
+    end_key: str
+    max_concurrency: int | None = None
+
+
 class ConditionalEdgeData(BaseModel):
     source: str
     python_code: PythonCodeData
@@ -261,6 +268,7 @@ class GraphData(BaseModel):
     edge_list: list[EdgeData] = []
     conditional_edge_list: list[ConditionalEdgeData] = []
     decision_table_node_list: list[DecisionTableNodeData] = []
+    parallel_edge_list: list[ParallelEdgeData] = []
     entry_point: str
 
 
@@ -22,6 +22,7 @@ from tables.models import (
     Edge,
     Graph,
     GraphSessionMessage,
+    ParallelEdge,
     PythonNode,
 )
 from rest_framework import serializers
@@ -706,6 +707,27 @@ class EdgeSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class ParallelEdgeSerializer(serializers.ModelSerializer):
+    max_concurrency = serializers.IntegerField(
+        min_value=1, required=False, allow_null=True
+    )
+
+    class Meta:
+        model = ParallelEdge
+        fields = "__all__"
+
+    def validate_branches(self, value):
+        if (
+            not isinstance(value, list)
+            or not value
+            or not all(isinstance(branch, str) and branch for branch in value)
+        ):
+            raise serializers.ValidationError(
+                "branches should be a non-empty list of node names"
+            )
+        return value
+
+
 class ConditionalEdgeSerializer(serializers.ModelSerializer):
     python_code = PythonCodeSerializer()
 
@@ -888,6 +910,7 @@ class GraphSerializer(serializers.ModelSerializer):
     crew_node_list = CrewNodeSerializer(many=True, read_only=True)
     python_node_list = PythonNodeSerializer(many=True, read_only=True)
     edge_list = EdgeSerializer(many=True, read_only=True)
+    parallel_edge_list = ParallelEdgeSerializer(many=True, read_only=True)
     conditional_edge_list = ConditionalEdgeSerializer(many=True, read_only=True)
     llm_node_list = LLMNodeSerializer(many=True, read_only=True)
     start_node_list = StartNodeSerializer(many=True, read_only=True)
@@ -903,6 +926,7 @@ class GraphSerializer(serializers.ModelSerializer):
             "crew_node_list",
             "python_node_list",
             "edge_list",
+            "parallel_edge_list",
             "conditional_edge_list",
             "llm_node_list",
             "decision_table_node_list",
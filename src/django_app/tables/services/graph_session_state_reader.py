@@ -0,0 +1,110 @@
+from tables.models import GraphSessionMessage
+from utils.logger import logger
+
+
+def apply_state_delta(state: dict, state_delta: dict) -> dict:
+    """
+    Build the state a delta describes from the state of its base_seq message.
+
+    Only the dicts on the changed paths are copied, everything else is shared
+    with the base state, so neither state may be modified in place.
+    """
+    variables = dict(state["variables"])
+
+    def parent_of(path: list) -> dict:
+        target = variables
+        for key in path[:-1]:
+            child = target.get(key)
+            child = dict(child) if isinstance(child, dict) else {}
+            target[key] = child
+            target = child
+        return target
+
+    for path in state_delta["removed"]:
+        parent_of(path).pop(path[-1], None)
+    for path, value in state_delta["changed"]:
+        if not path:
+            variables = value
+            continue
+        parent_of(path)[path[-1]] = value
+
+    return {
+        "variables": variables,
+        "state_history": [*state["state_history"], *state_delta["state_history"]],
+    }
+
+
+class GraphSessionStateReader:
+    """
+    Restores the full state of graph session messages.
+
+    The crew service publishes the full state only in checkpoint messages,
+    the messages between checkpoints carry a state_delta against the previous
+    message with a state (see StateDeltaEncoder in crew). Messages have to be
+    read in the order they were published, per session.
+    """
+
+    def __init__(self):
+        # session_id -> (state_seq, state)
+        self._states: dict[int, tuple[int, dict]] = {}
+
+    def can_read(self, session_id: int, message_data: dict) -> bool:
+        state_delta = message_data.get("state_delta")
+        if state_delta is None:
+            return True
+        seq, _ = self._states.get(session_id, (None, None))
+        return seq == state_delta["base_seq"]
+
+    def read(self, session_id: int, message_data: dict) -> dict:
+        """Returns message_data with the full state."""
+        seq = message_data.get("state_seq")
+        if seq is None:
+            return message_data
+
+        state_delta = message_data.get("state_delta")
+        if state_delta is None:
+            state = message_data["state"]
+        else:
+            if not self.can_read(session_id, message_data):
+                raise ValueError(
+                    f"State {state_delta['base_seq']} of session {session_id} "
+                    f"is missing, can not apply state {seq}"
+                )
+            _, base_state = self._states[session_id]
+            state = apply_state_delta(base_state, state_delta)
+            message_data = {**message_data, "state": state}
+
+        self._states[session_id] = (seq, state)
+        return message_data
+
+    def _read_since_checkpoint(self, message: GraphSessionMessage):
+        """Read the messages of the session from its last checkpoint before message."""
+        previous_messages = []
+        queryset = GraphSessionMessage.objects.filter(
+            session_id=message.session_id, id__lt=message.id
+        ).order_by("-id")
+        for previous_message in queryset.iterator():
+            message_data = previous_message.message_data
+            if message_data.get("state_seq") is None:
+                continue
+            previous_messages.append(previous_message)
+            if message_data.get("state_delta") is None:
+                break
+
+        for previous_message in reversed(previous_messages):
+            self.read(previous_message.session_id, previous_message.message_data)
+
+    def restore(self, messages: list[GraphSessionMessage]):
+        """
+        Replace delta message_data of the messages with the full state,
+        messages are not saved.
+        """
+        for message in sorted(messages, key=lambda message: message.id):
+            try:
+                if not self.can_read(message.session_id, message.message_data):
+                    self._read_since_checkpoint(message)
+                message.message_data = self.read(
+                    message.session_id, message.message_data
+                )
+            except ValueError as e:
+                logger.warning(f"Graph session message {message.id}: {e}")
@@ -16,6 +16,7 @@ class RunPythonCodeService(metaclass=SingletonMeta):
         self.code_exec_task_channel: str = os.environ.get(
             "CODE_EXEC_TASK_CHANNEL", "code_exec_tasks"
         )
+        self.code_exec_task_stream_maxlen = 10000
 
     def run_code(
         self,
@@ -47,9 +48,12 @@ class RunPythonCodeService(metaclass=SingletonMeta):
             global_kwargs={**python_code.global_kwargs, **additional_global_kwargs},
         )
 
-        channel = self.code_exec_task_channel
-        self.redis_service.redis_client.publish(
-            channel, code_task_data.model_dump_json()
+        # Tasks are a Redis Stream consumed by the sandbox consumer group
+        self.redis_service.redis_client.xadd(
+            self.code_exec_task_channel,
+            {"data": code_task_data.model_dump_json()},
+            maxlen=self.code_exec_task_stream_maxlen,
+            approximate=True,
         )
         return execution_id
 
@@ -4,6 +4,7 @@ from tables.models.graph_models import (
     DecisionTableNode,
     GraphSessionMessage,
     LLMNode,
+    ParallelEdge,
     StartNode,
 )
 from tables.models.llm_models import LLMConfig
@@ -21,6 +22,7 @@ from tables.request_models import (
     GraphData,
     GraphSessionMessageData,
     LLMNodeData,
+    ParallelEdgeData,
     PythonNodeData,
     SessionData,
 )
@@ -91,6 +93,7 @@ class SessionManagerService(metaclass=SingletonMeta):
         crew_node_list = CrewNode.objects.filter(graph=graph.pk)
         python_node_list = PythonNode.objects.filter(graph=graph.pk)
         edge_list = Edge.objects.filter(graph=graph.pk)
+        parallel_edge_list = ParallelEdge.objects.filter(graph=graph.pk)
         conditional_edge_list = ConditionalEdge.objects.filter(graph=graph.pk)
         llm_node_list = LLMNode.objects.filter(graph=graph.pk)
         decision_table_node_list = DecisionTableNode.objects.filter(graph=graph.pk)
@@ -122,6 +125,17 @@ class SessionManagerService(metaclass=SingletonMeta):
                 EdgeData(start_key=item.start_key, end_key=item.end_key)
             )
 
+        parallel_edge_data_list: list[ParallelEdgeData] = []
+        for item in parallel_edge_list:
+            parallel_edge_data_list.append(
+                ParallelEdgeData(
+                    start_key=item.start_key,
+                    branches=item.branches,
+                    end_key=item.end_key,
+                    max_concurrency=item.max_concurrency,
+                )
+            )
+
         conditional_edge_data_list: list[ConditionalEdgeData] = []
         for item in conditional_edge_list:
             conditional_edge_data_list.append(
@@ -150,6 +164,7 @@ class SessionManagerService(metaclass=SingletonMeta):
             edge_list=edge_data_list,
             conditional_edge_list=conditional_edge_data_list,
             decision_table_node_list=decision_table_node_data_list,
+            parallel_edge_list=parallel_edge_data_list,
             entry_point=entry_point,
         )
         session_data = SessionData(
@@ -8,6 +8,7 @@ from tables.views.model_view_sets import (
     CrewNodeViewSet,
     DecisionTableNodeModelViewSet,
     EdgeViewSet,
+    ParallelEdgeViewSet,
     GraphLightViewSet,
     GraphViewSet,
     PythonNodeViewSet,
@@ -98,6 +99,7 @@ router.register(r"llmnodes", LLMNodeViewSet)
 router.register(r"startnodes", StartNodeModelViewSet)
 
 router.register(r"edges", EdgeViewSet)
+router.register(r"paralleledges", ParallelEdgeViewSet)
 router.register(r"conditionaledges", ConditionalEdgeViewSet)
 router.register(r"graph-session-messages", GraphSessionMessageReadOnlyViewSet)
 router.register(r"memory", MemoryViewSet)
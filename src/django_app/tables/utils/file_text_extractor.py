@@ -1,10 +1,47 @@
+import codecs
 import csv
 import json
 import pdfplumber
 from docx import Document
-from io import TextIOWrapper
+from io import BytesIO, TextIOWrapper
+from typing import Iterator
 from bs4 import BeautifulSoup
 
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def extract_content_from_file(uploaded_file, file_type) -> bytes:
+    """
+    Extract text from the file and return it utf-8 encoded.
+    Text is encoded part by part (page, row, block), so there is no
+    intermediate list of parts and joined copy of the whole text.
+    """
+    buffer = BytesIO()
+    for text_part in iter_text_from_file(uploaded_file, file_type):
+        buffer.write(text_part.encode("utf-8"))
+    return buffer.getvalue()
+
+
+def iter_text_from_file(uploaded_file, file_type) -> Iterator[str]:
+    """
+    Extract text from the file part by part.
+    Pdf is extracted page by page, csv row by row and txt/md in blocks,
+    other formats have to be parsed as a whole and are yielded at once.
+    """
+    file_type = file_type.lower()
+
+    if file_type in ("txt", "md"):
+        yield from iter_text_from_plain(uploaded_file)
+
+    elif file_type == "pdf":
+        yield from iter_text_from_pdf(uploaded_file)
+
+    elif file_type == "csv":
+        yield from iter_text_from_csv(uploaded_file)
+
+    else:
+        yield extract_text_from_file(uploaded_file, file_type)
+
 
 def extract_text_from_file(uploaded_file, file_type):
     """
@@ -42,27 +79,41 @@ def extract_text_from_txt(uploaded_file):
     return uploaded_file.read().decode("utf-8")
 
 
-def extract_text_from_pdf(uploaded_file):
-    text = []
+def iter_text_from_plain(uploaded_file) -> Iterator[str]:
+    # Incremental decoder keeps multibyte characters split between blocks intact
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while block := uploaded_file.read(READ_BLOCK_SIZE):
+        yield decoder.decode(block)
+    yield decoder.decode(b"", final=True)
+
+
+def iter_text_from_pdf(uploaded_file) -> Iterator[str]:
     with pdfplumber.open(uploaded_file) as pdf:
-        for page in pdf.pages:
+        for page_number, page in enumerate(pdf.pages):
             page_text = page.extract_text() or ""
-            text.append(page_text.strip())
-        return "\n".join(text)
+            # Parsed layout objects of the page are cached until closed
+            page.close()
+            yield ("\n" if page_number else "") + page_text.strip()
 
 
-def extract_text_from_csv(uploaded_file):
+def extract_text_from_pdf(uploaded_file):
+    return "".join(iter_text_from_pdf(uploaded_file))
+
+
+def iter_text_from_csv(uploaded_file) -> Iterator[str]:
     wrapper = TextIOWrapper(uploaded_file, encoding="utf-8")
     delimeter = ","
     reader = csv.reader(wrapper, delimiter=delimeter)
 
-    extracted_rows = []
+    is_first_row = True
     for row in reader:
-        if len(row[0].replace(delimeter, "")) != 0:
-            extracted_rows.append(",".join(row))
+        if row and len(row[0].replace(delimeter, "")) != 0:
+            yield ("" if is_first_row else "\n") + ",".join(row)
+            is_first_row = False
+
 
-    extracted_text = "\n".join(extracted_rows)
-    return extracted_text
+def extract_text_from_csv(uploaded_file):
+    return "".join(iter_text_from_csv(uploaded_file))
 
 
 def extract_text_from_json(uploaded_file) -> str:
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from tables.models import DocumentMetadata, DocumentContent
-from .file_text_extractor import extract_text_from_file
+from .file_text_extractor import extract_content_from_file
 from loguru import logger
 import json
 import re
@@ -123,10 +123,8 @@ class SourceSerializerMixin:
             files, chunk_sizes, chunk_strategies, chunk_overlaps, additional_params
         ):
             file_type = uploaded_file.name.split(".")[-1].lower()
-            extracted_text = extract_text_from_file(uploaded_file, file_type)
-            document_content = DocumentContent.objects.create(
-                content=extracted_text.encode("utf-8")
-            )
+            content = extract_content_from_file(uploaded_file, file_type)
+            document_content = self._get_or_create_document_content(content)
 
             DocumentMetadata.objects.create(
                 file_name=uploaded_file.name,
@@ -145,6 +143,21 @@ class SourceSerializerMixin:
 
         return None
 
+    def _get_or_create_document_content(self, content: bytes) -> DocumentContent:
+        """
+        Reuse already stored content with the same hash, so re-uploaded files
+        share DocumentContent and their embeddings can be reused by the knowledge service.
+        """
+        content_hash = DocumentContent.calculate_hash(content)
+        document_content = DocumentContent.objects.filter(
+            content_hash=content_hash
+        ).first()
+        if document_content is None:
+            document_content = DocumentContent.objects.create(
+                content=content, content_hash=content_hash
+            )
+        return document_content
+
     def create_copy_collection(self, collection, list_document_metadata: list):
         self.validate_list_document_metadata(
             list_document_metadata=list_document_metadata
@@ -65,6 +65,7 @@ from tables.models import (
     Edge,
     Graph,
     GraphSessionMessage,
+    ParallelEdge,
     PythonCode,
     PythonCodeResult,
     PythonCodeTool,
@@ -90,6 +91,7 @@ from tables.serializers.model_serializers import (
     GraphSessionMessageSerializer,
     LLMNodeSerializer,
     MemorySerializer,
+    ParallelEdgeSerializer,
     PythonCodeResultSerializer,
     PythonCodeSerializer,
     PythonCodeToolSerializer,
@@ -120,6 +122,7 @@ from tables.serializers.knowledge_serializers import (
     DocumentMetadataSerializer,
 )
 from tables.services.redis_service import RedisService
+from tables.services.graph_session_state_reader import GraphSessionStateReader
 
 
 redis_service = RedisService()
@@ -330,6 +333,7 @@ class GraphViewSet(viewsets.ModelViewSet):
                     queryset=PythonNode.objects.select_related("python_code"),
                 ),
                 Prefetch("edge_list", queryset=Edge.objects.all()),
+                Prefetch("parallel_edge_list", queryset=ParallelEdge.objects.all()),
                 Prefetch(
                     "conditional_edge_list",
                     queryset=ConditionalEdge.objects.select_related("python_code"),
@@ -376,17 +380,43 @@ class EdgeViewSet(viewsets.ModelViewSet):
     serializer_class = EdgeSerializer
 
 
+class ParallelEdgeViewSet(viewsets.ModelViewSet):
+    queryset = ParallelEdge.objects.all()
+    serializer_class = ParallelEdgeSerializer
+
+
 class ConditionalEdgeViewSet(viewsets.ModelViewSet):
     queryset = ConditionalEdge.objects.all()
     serializer_class = ConditionalEdgeSerializer
 
 
 class GraphSessionMessageReadOnlyViewSet(ReadOnlyModelViewSet):
+    """
+    Graph session messages with the full state, messages stored with a
+    state delta are restored from the previous messages of their session.
+    """
+
     queryset = GraphSessionMessage.objects.all()
     serializer_class = GraphSessionMessageSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["session_id"]
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        messages = list(page if page is not None else queryset)
+        GraphSessionStateReader().restore(messages)
+
+        serializer = self.get_serializer(messages, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        message = self.get_object()
+        GraphSessionStateReader().restore([message])
+        return Response(self.get_serializer(message).data)
+
 
 class SourceCollectionViewSet(viewsets.ModelViewSet):
     """
@@ -1,7 +1,15 @@
 from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
 
 
 class BaseChunker(ABC):
     @abstractmethod
     def chunk(self, text):
         pass
+
+    def iter_chunks(self, text_parts: Iterable[str]) -> Iterator[str]:
+        """
+        Chunk text given as consecutive parts, yielding chunks as soon as they are ready.
+        Chunkers that need the whole document (markup, json, tokens) join the parts.
+        """
+        yield from self.chunk("".join(text_parts))
@@ -1,6 +1,7 @@
 from chunkers.base_chunker import BaseChunker
 from langchain_text_splitters import CharacterTextSplitter
 import re
+from typing import Iterable, Iterator
 from loguru import logger
 
 
@@ -30,3 +31,29 @@ class CharacterChunker(BaseChunker):
                     [part[i : i + self.chunk_size] for i in range(0, len(part), step)]
                 )
         return chunks
+
+    def iter_chunks(self, text_parts: Iterable[str]) -> Iterator[str]:
+        if self.regex_pattern:
+            # Regex separators may span parts, split the whole text
+            yield from self.chunk("".join(text_parts))
+            return
+
+        step = self.chunk_size - self.chunk_overlap
+        buffer = ""
+        for text_part in text_parts:
+            text_part = text_part.replace("\r", "")
+            # Same as part.strip() in chunk: leading whitespace of the text is skipped
+            buffer = buffer + text_part if buffer else text_part.lstrip()
+
+            # A window is emitted only when non-whitespace text follows it,
+            # so stripping trailing whitespace of the text can not change it
+            text_end = len(buffer.rstrip())
+            start = 0
+            while start + self.chunk_size < text_end:
+                yield buffer[start : start + self.chunk_size]
+                start += step
+            buffer = buffer[start:]
+
+        buffer = buffer.rstrip()
+        for i in range(0, len(buffer), step):
+            yield buffer[i : i + self.chunk_size]
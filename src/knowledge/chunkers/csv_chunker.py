@@ -1,4 +1,7 @@
 from chunkers.base_chunker import BaseChunker
+from chunkers.text_stream import iter_stripped_lines
+from itertools import islice
+from typing import Iterable, Iterator
 import math
 
 
@@ -34,3 +37,12 @@ class CSVChunker(BaseChunker):
             results.append(full_chunk_text)
 
         return results
+
+    def iter_chunks(self, text_parts: Iterable[str]) -> Iterator[str]:
+        """Yield chunks row by row, only one chunk of rows is kept in memory."""
+        lines = iter_stripped_lines(text_parts)
+        headers = list(islice(lines, self.headers_level))
+
+        while chunk_data_lines := list(islice(lines, self.rows_in_chunk)):
+            chunk_with_headers = "\n".join(headers + chunk_data_lines)
+            yield f"File name: {self.file_name} \n\n{chunk_with_headers}"
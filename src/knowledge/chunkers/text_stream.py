@@ -0,0 +1,64 @@
+import codecs
+from typing import Iterable, Iterator
+
+DECODE_BLOCK_SIZE = 1024 * 1024
+
+
+def iter_decoded(
+    binary_content, block_size: int = DECODE_BLOCK_SIZE, encoding: str = "utf-8"
+) -> Iterator[str]:
+    """
+    Decode binary content block by block without building the whole text.
+    Multibyte characters split between blocks are kept intact.
+    """
+    view = memoryview(binary_content)
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for start in range(0, len(view), block_size):
+        text = decoder.decode(view[start : start + block_size])
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def iter_lines(text_parts: Iterable[str]) -> Iterator[str]:
+    """Same lines as "".join(text_parts).splitlines(), but built incrementally."""
+    buffer = ""
+    for text_part in text_parts:
+        buffer += text_part
+        lines = buffer.splitlines(keepends=True)
+        buffer = ""
+        if lines and (
+            lines[-1].splitlines()[0] == lines[-1] or lines[-1].endswith("\r")
+        ):
+            # Last line is incomplete or may be the first half of "\r\n"
+            buffer = lines.pop()
+        for line in lines:
+            yield line.splitlines()[0]
+    if buffer:
+        yield from buffer.splitlines()
+
+
+def iter_stripped_lines(text_parts: Iterable[str]) -> Iterator[str]:
+    """Same lines as "".join(text_parts).strip().splitlines(), but built incrementally."""
+    last_line = None
+    # Whitespace-only lines after last_line, dropped if they end the text
+    blank_lines = []
+    for line in iter_lines(text_parts):
+        if last_line is None:
+            line = line.lstrip()
+            if line:
+                last_line = line
+            continue
+
+        if line.strip():
+            yield last_line
+            yield from blank_lines
+            blank_lines = []
+            last_line = line
+        else:
+            blank_lines.append(line)
+
+    if last_line is not None:
+        yield last_line.rstrip()
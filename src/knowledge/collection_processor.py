@@ -2,14 +2,16 @@ import os
 from loguru import logger
 import cachetools
 
-from storage.knowledge_storage import KnowledgeStorage
+from storage.knowledge_storage import KnowledgeStorage, hash_chunk
 from chunkers.token_chunker import TokenChunker
 from chunkers.markdown_chunker import MarkdownChunker
 from chunkers.character_chunker import CharacterChunker
 from chunkers.json_chunker import JSONChunker
 from chunkers.html_chunker import HTMLChunker
 from chunkers.csv_chunker import CSVChunker
+from chunkers.text_stream import iter_decoded
 from settings import Status
+from embedder.base_embedder import BaseEmbedder
 from embedder.openai import OpenAIEmbedder
 from embedder.gemini import GoogleGenAIEmbedder
 from embedder.cohere import CohereEmbedder
@@ -42,10 +44,104 @@ POSTGRES_KNOWLEDGE_CONFIG = {
 _embedder_cache = cachetools.LRUCache(maxsize=50)
 
 
+CHUNK_STRATEGIES = {
+    "token": TokenChunker,
+    "character": CharacterChunker,
+    "markdown": MarkdownChunker,
+    "html": HTMLChunker,
+    "json": JSONChunker,
+    "csv": CSVChunker,
+}
+
+
+def chunk_document(
+    binary_content: bytes,
+    file_name: str,
+    chunk_strategy: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    additional_params: dict,
+) -> list[str]:
+    """
+    Decode and chunk document content.
+    Content is decoded block by block and fed to the chunker incrementally,
+    streaming chunkers never hold the decoded text of the whole document.
+    Module-level so it can be submitted to a ProcessPoolExecutor.
+    """
+    additional_params.update({"file_name": file_name})
+    chunker = CHUNK_STRATEGIES[chunk_strategy](
+        chunk_size, chunk_overlap, additional_params
+    )
+    return list(chunker.iter_chunks(iter_decoded(binary_content)))
+
+
+def embed_chunks(
+    storage: KnowledgeStorage, embedder: BaseEmbedder, chunks: list[str]
+) -> list[list[float]]:
+    """
+    Embed chunks, reusing vectors already stored for identical chunks
+    embedded by the same model. Duplicate chunks are embedded once.
+    """
+    chunk_hashes = [hash_chunk(chunk) for chunk in chunks]
+    vectors = storage.get_embeddings_by_chunk_hash(
+        embedder.model_key, set(chunk_hashes)
+    )
+
+    missing = {}
+    for chunk_hash, chunk in zip(chunk_hashes, chunks):
+        if chunk_hash not in vectors:
+            missing.setdefault(chunk_hash, chunk)
+
+    if missing:
+        new_vectors = embedder.embed_batch(list(missing.values()))
+        vectors.update(zip(missing.keys(), new_vectors))
+
+    logger.info(
+        f"Embedded {len(missing)} of {len(chunks)} chunks, "
+        f"{len(chunks) - len(missing)} reused"
+    )
+    return [vectors[chunk_hash] for chunk_hash in chunk_hashes]
+
+
+def _create_default_embedder():
+
+    return OpenAIEmbedder(
+        api_key=os.getenv("OPENAI_API_KEY"), model_name="text-embedding-3-small"
+    )
+
+
+def create_embedder(embedder_config) -> BaseEmbedder:
+    """Create embedder for the collection embedding configuration."""
+
+    try:
+        provider = embedder_config["provider"].lower()
+        provider_to_class = {
+            "openai": OpenAIEmbedder,
+            "gemini": GoogleGenAIEmbedder,
+            "cohere": CohereEmbedder,
+            "mistral": MistralEmbedder,
+            "together_ai": TogetherAIEmbedder,
+        }
+        embedder_class = provider_to_class.get(provider)
+        if embedder_class is None:
+            raise ValueError(f"Embedder provider '{provider}' is not supported.")
+        logger.info(f"Embedder class: {embedder_class.__name__}")
+
+        return embedder_class(
+            api_key=embedder_config["api_key"],
+            model_name=embedder_config["model_name"],
+        )
+    except Exception as e:
+        logger.info(
+            f"Failed to set custom embedder. Default embedder setted. Error: {e}"
+        )
+        return _create_default_embedder()
+
+
 class CollectionProcessor:
-    def __init__(self, collection_id):
+    def __init__(self, collection_id, storage: KnowledgeStorage | None = None):
         self.collection_id = collection_id
-        self.storage = KnowledgeStorage(**POSTGRES_KNOWLEDGE_CONFIG)
+        self.storage = storage or KnowledgeStorage(**POSTGRES_KNOWLEDGE_CONFIG)
         self.embedder = self._get_cached_embedder()
 
     def _get_cached_embedder(self):
@@ -55,7 +151,7 @@ class CollectionProcessor:
 
         logger.info(f"Initializing embedder for collection {self.collection_id}")
         embedder_config = self.storage.get_embedder_configuration(self.collection_id)
-        embedder = self._set_embedder_config(embedder_config)
+        embedder = create_embedder(embedder_config)
 
         _embedder_cache[self.collection_id] = embedder
         return embedder
@@ -91,23 +187,40 @@ class CollectionProcessor:
                 chunk_size,
                 chunk_overlap,
                 additional_params,
+                document_content_id,
             ) in documents:
                 try:
                     self.storage.update_document_status(Status.PROCESSING, document_id)
-                    text = self._get_text_content(binary_content)
-                    additional_params.update({"file_name": file_name})
-                    chunker = self._get_chunk_strategy(
-                        chunk_strategy, chunk_size, chunk_overlap, additional_params
+                    copied = self.storage.copy_document_embeddings(
+                        document_id=document_id,
+                        collection_id=self.collection_id,
+                        document_content_id=document_content_id,
+                        chunk_strategy=chunk_strategy,
+                        chunk_size=chunk_size,
+                        chunk_overlap=chunk_overlap,
+                        additional_params=additional_params,
+                        embedder_model=self.embedder.model_key,
+                    )
+                    if copied:
+                        logger.info(f"Document: {file_name} reused embeddings!")
+                        continue
+
+                    chunks = chunk_document(
+                        binary_content,
+                        file_name,
+                        chunk_strategy,
+                        chunk_size,
+                        chunk_overlap,
+                        additional_params,
+                    )
+                    vectors = embed_chunks(self.storage, self.embedder, chunks)
+                    self.storage.save_embeddings(
+                        document_id=document_id,
+                        collection_id=self.collection_id,
+                        rows=zip(chunks, vectors),
+                        embedder_model=self.embedder.model_key,
+                        status=Status.COMPLETED,
                     )
-
-                    chunks = chunker.chunk(text)
-                    for chunk in chunks:
-
-                        vector = self.embedder.embed(chunk)
-                        self.storage.save_embedding(
-                            chunk, vector, document_id, self.collection_id
-                        )
-                    self.storage.update_document_status(Status.COMPLETED, document_id)
                     logger.info(f"Document: {file_name} embedded!")
 
                 except Exception as e:
@@ -120,54 +233,3 @@ class CollectionProcessor:
         except Exception as e:
             self.storage.update_collection_status(Status.FAILED, self.collection_id)
             logger.error(f"Error processing collection_id_{self.collection_id}: {e}")
-
-    def _get_text_content(self, binary_content) -> str:
-
-        content = bytes(binary_content).decode("utf-8")
-        return content
-
-    def _get_chunk_strategy(
-        self, chunk_strategy, chunk_size, chunk_overlap, additional_params
-    ):
-        strategies = {
-            "token": TokenChunker,
-            "character": CharacterChunker,
-            "markdown": MarkdownChunker,
-            "html": HTMLChunker,
-            "json": JSONChunker,
-            "csv": CSVChunker,
-        }
-        return strategies[chunk_strategy](chunk_size, chunk_overlap, additional_params)
-
-    def _create_default_embedding_function(self):
-
-        return OpenAIEmbedder(
-            api_key=os.getenv("OPENAI_API_KEY"), model_name="text-embedding-3-small"
-        )
-
-    def _set_embedder_config(self, embedder_config) -> None:
-        """Set the embedding configuration for the knowledge storage."""
-
-        try:
-            provider = embedder_config["provider"].lower()
-            provider_to_class = {
-                "openai": OpenAIEmbedder,
-                "gemini": GoogleGenAIEmbedder,
-                "cohere": CohereEmbedder,
-                "mistral": MistralEmbedder,
-                "together_ai": TogetherAIEmbedder,
-            }
-            embedder_class = provider_to_class.get(provider)
-            if embedder_class is None:
-                raise ValueError(f"Embedder provider '{provider}' is not supported.")
-            logger.info(f"Embedder class: {embedder_class.__name__}")
-
-            return embedder_class(
-                api_key=embedder_config["api_key"],
-                model_name=embedder_config["model_name"],
-            )
-        except Exception as e:
-            logger.info(
-                f"Failed to set custom embedder. Default embedder setted. Error: {e}"
-            )
-            return self._create_default_embedding_function()
@@ -1,5 +1,19 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
+
+import tiktoken
+
+
+_encoding = None
+
+
+def _count_tokens(text: str) -> int:
+    """Estimate the number of tokens in text using cl100k_base encoding."""
+    global _encoding
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return len(_encoding.encode_ordinary(text))
 
 
 class BaseEmbedder(ABC):
@@ -7,6 +21,18 @@ class BaseEmbedder(ABC):
     Abstract base class for text embedding models
     """
 
+    # Provider limits for a single embedding request.
+    # Subclasses override these with the values documented by the provider.
+    max_batch_size: int = 96
+    max_batch_tokens: int = 8000
+
+    model_name: str
+
+    @property
+    def model_key(self) -> str:
+        """Identifies the vector space, vectors with equal keys are interchangeable."""
+        return f"{type(self).__name__}:{self.model_name}"
+
     @abstractmethod
     def embed(self, text: str) -> List[float]:
         """
@@ -19,3 +45,68 @@ class BaseEmbedder(ABC):
             Embedding array
         """
         pass
+
+    async def aembed(self, text: str) -> List[float]:
+        """
+        Generate embedding for a single text without blocking the event loop.
+        Providers with an async client override this, others fall back to a thread.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding array
+        """
+        return await asyncio.to_thread(self.embed, text)
+
+    @abstractmethod
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for texts in a single provider request.
+        Texts are guaranteed to fit into max_batch_size and max_batch_tokens.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding arrays in the same order as texts
+        """
+        pass
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many texts using as few provider requests as possible.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding arrays in the same order as texts
+        """
+        vectors = []
+        for batch in self._iter_batches(texts):
+            vectors.extend(self._embed_texts(batch))
+        return vectors
+
+    def _iter_batches(self, texts: List[str]) -> Iterator[List[str]]:
+        """
+        Split texts into batches respecting max_batch_size and max_batch_tokens.
+        A text exceeding the token budget on its own is sent as a separate batch.
+        """
+        batch = []
+        batch_tokens = 0
+        for text in texts:
+            text_tokens = _count_tokens(text)
+            if batch and (
+                len(batch) >= self.max_batch_size
+                or batch_tokens + text_tokens > self.max_batch_tokens
+            ):
+                yield batch
+                batch = []
+                batch_tokens = 0
+
+            batch.append(text)
+            batch_tokens += text_tokens
+
+        if batch:
+            yield batch
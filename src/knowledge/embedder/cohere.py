@@ -6,6 +6,10 @@ import cohere
 
 
 class CohereEmbedder(BaseEmbedder):
+
+    max_batch_size = 96
+    max_batch_tokens = 128000
+
     def __init__(self, api_key: Optional[str] = None, model_name: Optional[str] = None):
 
         # dims=1536
@@ -17,6 +21,7 @@ class CohereEmbedder(BaseEmbedder):
                 "Cohere API key must be provided via argument or 'COHERE_API_KEY' environment variable."
             )
         self.client = cohere.ClientV2(api_key)
+        self.async_client = cohere.AsyncClientV2(api_key)
 
     def embed(self, text: str) -> List[float]:
         """
@@ -37,3 +42,43 @@ class CohereEmbedder(BaseEmbedder):
         )
 
         return response.embeddings.float_[0]
+
+    async def aembed(self, text: str) -> List[float]:
+        """
+        Generate an embedding for the given text using the async Cohere client.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            List[float]: The embedding vector.
+        """
+        text = text.replace("\n", " ")
+        response = await self.async_client.embed(
+            texts=[text],
+            model=self.model_name,
+            input_type=self.input_type,
+            embedding_types=["float"],
+        )
+
+        return response.embeddings.float_[0]
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for the given texts using a single Cohere request.
+
+        Args:
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            List[List[float]]: The embedding vectors in the order of texts.
+        """
+        texts = [text.replace("\n", " ") for text in texts]
+        response = self.client.embed(
+            texts=texts,
+            model=self.model_name,
+            input_type=self.input_type,
+            embedding_types=["float"],
+        )
+
+        return response.embeddings.float_
@@ -6,6 +6,10 @@ from google import genai
 
 
 class GoogleGenAIEmbedder(BaseEmbedder):
+
+    max_batch_size = 100
+    max_batch_tokens = 20000
+
     def __init__(self, api_key: Optional[str] = None, model_name: Optional[str] = None):
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
         if not self.api_key:
@@ -32,3 +36,37 @@ class GoogleGenAIEmbedder(BaseEmbedder):
         )
 
         return response.embeddings[0].values
+
+    async def aembed(self, text: str) -> List[float]:
+        """
+        Generate an embedding for the given text using the async Google Generative AI client.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            List[float]: The embedding vector.
+        """
+        text = text.replace("\n", " ")
+        response = await self.client.aio.models.embed_content(
+            model=self.model_name, contents=text
+        )
+
+        return response.embeddings[0].values
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for the given texts using a single Google Generative AI request.
+
+        Args:
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            List[List[float]]: The embedding vectors in the order of texts.
+        """
+        texts = [text.replace("\n", " ") for text in texts]
+        response = self.client.models.embed_content(
+            model=self.model_name, contents=texts
+        )
+
+        return [embedding.values for embedding in response.embeddings]
@@ -6,6 +6,10 @@ from mistralai import Mistral
 
 
 class MistralEmbedder(BaseEmbedder):
+
+    max_batch_size = 128
+    max_batch_tokens = 16000
+
     def __init__(self, api_key: Optional[str] = None, model_name: Optional[str] = None):
         # dims=1024
         self.model_name = model_name or "mistral-embed"
@@ -30,3 +34,35 @@ class MistralEmbedder(BaseEmbedder):
         response = self.client.embeddings.create(model=self.model_name, inputs=[text])
 
         return response.data[0].embedding
+
+    async def aembed(self, text: str) -> List[float]:
+        """
+        Generate an embedding for the given text using the async MistralAI client.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            List[float]: The embedding vector.
+        """
+        text = text.replace("\n", " ")
+        response = await self.client.embeddings.create_async(
+            model=self.model_name, inputs=[text]
+        )
+
+        return response.data[0].embedding
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for the given texts using a single MistralAI request.
+
+        Args:
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            List[List[float]]: The embedding vectors in the order of texts.
+        """
+        texts = [text.replace("\n", " ") for text in texts]
+        response = self.client.embeddings.create(model=self.model_name, inputs=texts)
+
+        return [item.embedding for item in response.data]
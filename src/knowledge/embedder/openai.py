@@ -1,17 +1,21 @@
 import os
 from .base_embedder import BaseEmbedder
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from typing import List
 
 
 class OpenAIEmbedder(BaseEmbedder):
 
+    max_batch_size = 2048
+    max_batch_tokens = 300000
+
     def __init__(self, api_key, model_name):
 
         self.model_name = model_name or "text-embedding-3-small"
 
         api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.client = OpenAI(api_key=api_key)
+        self.async_client = AsyncOpenAI(api_key=api_key)
 
     def embed(self, text: str) -> List[float]:
         """
@@ -29,3 +33,36 @@ class OpenAIEmbedder(BaseEmbedder):
             .data[0]
             .embedding
         )
+
+    async def aembed(self, text: str) -> List[float]:
+        """
+        Generate an embedding for the given text using the async OpenAI client.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            List[float]: The embedding vector.
+        """
+        text = text.replace("\n", " ")
+        response = await self.async_client.embeddings.create(
+            input=[text], model=self.model_name
+        )
+
+        return response.data[0].embedding
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Get the embeddings for the given texts using a single OpenAI request.
+
+        Args:
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            List[List[float]]: The embedding vectors in the order of texts.
+        """
+        texts = [text.replace("\n", " ") for text in texts]
+        response = self.client.embeddings.create(input=texts, model=self.model_name)
+
+        data = sorted(response.data, key=lambda item: item.index)
+        return [item.embedding for item in data]
@@ -2,10 +2,14 @@ import os
 from typing import List
 from .base_embedder import BaseEmbedder
 
-from together import Together
+from together import AsyncTogether, Together
 
 
 class TogetherAIEmbedder(BaseEmbedder):
+
+    max_batch_size = 64
+    max_batch_tokens = 32000
+
     def __init__(self, api_key=None, model_name=None):
         # dims=768
         self.model_name = model_name or "togethercomputer/m2-bert-80M-32k-retrieval"
@@ -15,6 +19,7 @@ class TogetherAIEmbedder(BaseEmbedder):
                 "Cohere API key must be provided via argument or 'TOGETHER_API_KEY' environment variable."
             )
         self.client = Together(api_key=self.api_key)
+        self.async_client = AsyncTogether(api_key=self.api_key)
 
     def embed(self, text: str) -> List[float]:
         """
@@ -30,3 +35,35 @@ class TogetherAIEmbedder(BaseEmbedder):
         response = self.client.embeddings.create(input=[text], model=self.model_name)
 
         return response.data[0].embedding
+
+    async def aembed(self, text: str) -> List[float]:
+        """
+        Generate an embedding for the given text using the async TogetherAI client.
+
+        Args:
+            text (str): The text to embed.
+
+        Returns:
+            List[float]: The embedding vector.
+        """
+        text = text.replace("\n", " ")
+        response = await self.async_client.embeddings.create(
+            input=[text], model=self.model_name
+        )
+
+        return response.data[0].embedding
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for the given texts using a single TogetherAI request.
+
+        Args:
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            List[List[float]]: The embedding vectors in the order of texts.
+        """
+        texts = [text.replace("\n", " ") for text in texts]
+        response = self.client.embeddings.create(input=texts, model=self.model_name)
+
+        return [item.embedding for item in response.data]
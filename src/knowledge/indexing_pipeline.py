@@ -0,0 +1,306 @@
+import asyncio
+from collections import defaultdict
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from loguru import logger
+
+from collection_processor import (
+    CollectionProcessor,
+    POSTGRES_KNOWLEDGE_CONFIG,
+    chunk_document,
+    embed_chunks,
+)
+from embedder.base_embedder import BaseEmbedder
+from storage.knowledge_storage import KnowledgeStorage
+from settings import Status
+
+
+@dataclass
+class CollectionJob:
+    collection_id: int
+    embedder: BaseEmbedder | None = None
+    pending: int = 0
+
+
+@dataclass
+class DocumentJob:
+    collection: CollectionJob
+    document_id: int
+    file_name: str
+    binary_content: bytes
+    chunk_strategy: str
+    chunk_size: int
+    chunk_overlap: int
+    additional_params: dict
+    chunks: list[str] = field(default_factory=list)
+    vectors: list[list[float]] = field(default_factory=list)
+    reused: bool = False
+    error: Exception | None = None
+
+
+class IndexingPipeline:
+    """
+    Staged indexing pipeline: fetch -> chunk -> embed -> write.
+
+    Every stage has its own worker count and is connected to the next one
+    through a bounded queue, so a slow stage applies backpressure instead of
+    buffering whole collections in memory. Chunking runs on a process pool,
+    database and provider calls run on a thread pool. Embedding requests are
+    additionally limited per provider.
+    """
+
+    def __init__(
+        self,
+        thread_executor: Executor,
+        process_executor: Executor,
+        fetch_workers: int = 2,
+        chunk_workers: int = 2,
+        embed_workers: int = 4,
+        write_workers: int = 2,
+        embed_concurrency_per_provider: int = 4,
+        queue_size: int = 32,
+    ):
+        self.thread_executor = thread_executor
+        self.process_executor = process_executor
+        self.fetch_workers = fetch_workers
+        self.chunk_workers = chunk_workers
+        self.embed_workers = embed_workers
+        self.write_workers = write_workers
+        self.embed_concurrency_per_provider = embed_concurrency_per_provider
+
+        self.collection_queue: asyncio.Queue[int] = asyncio.Queue(queue_size)
+        self.chunk_queue: asyncio.Queue[DocumentJob] = asyncio.Queue(queue_size)
+        self.embed_queue: asyncio.Queue[DocumentJob] = asyncio.Queue(queue_size)
+        self.write_queue: asyncio.Queue[DocumentJob] = asyncio.Queue(queue_size)
+
+        self._provider_semaphores: dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.embed_concurrency_per_provider)
+        )
+        self._collection_locks: dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        stages = [
+            (self._fetch_worker, self.fetch_workers),
+            (self._chunk_worker, self.chunk_workers),
+            (self._embed_worker, self.embed_workers),
+            (self._write_worker, self.write_workers),
+        ]
+        for worker, count in stages:
+            for _ in range(count):
+                self._tasks.append(asyncio.create_task(worker()))
+        logger.info("Indexing pipeline started.")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def submit(self, collection_id: int):
+        """Enqueue collection for indexing. Waits if the pipeline is saturated."""
+        await self.collection_queue.put(collection_id)
+
+    async def _run_in_thread(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.thread_executor, func, *args)
+
+    async def _fetch_worker(self):
+        storage = KnowledgeStorage(**POSTGRES_KNOWLEDGE_CONFIG)
+        while True:
+            collection_id = await self.collection_queue.get()
+            try:
+                await self._fetch_collection(storage, collection_id)
+            except Exception as e:
+                logger.error(f"Error processing collection_id_{collection_id}: {e}")
+                await self._mark_collection_failed(storage, collection_id)
+            finally:
+                self.collection_queue.task_done()
+
+    async def _mark_collection_failed(
+        self, storage: KnowledgeStorage, collection_id: int
+    ):
+        try:
+            await self._run_in_thread(
+                storage.update_collection_status, Status.FAILED, collection_id
+            )
+        except Exception as e:
+            logger.error(f"Failed to set status for collection_id_{collection_id}: {e}")
+
+    async def _fetch_collection(self, storage: KnowledgeStorage, collection_id: int):
+        # Documents are claimed under a per-collection lock, so repeated
+        # messages for the same collection never pick up the same document twice.
+        async with self._collection_locks[collection_id]:
+            await self._run_in_thread(
+                storage.update_collection_status, Status.PROCESSING, collection_id
+            )
+            processor = await self._run_in_thread(
+                CollectionProcessor, collection_id, storage
+            )
+            documents = await self._run_in_thread(
+                storage.get_documents, collection_id
+            )
+            if documents:
+                await self._run_in_thread(
+                    storage.update_documents_status,
+                    Status.PROCESSING,
+                    [document[0] for document in documents],
+                )
+
+        collection = CollectionJob(
+            collection_id=collection_id,
+            embedder=processor.embedder,
+            pending=len(documents),
+        )
+        if not documents:
+            await self._run_in_thread(
+                storage.update_collection_status, Status.COMPLETED, collection_id
+            )
+            return
+
+        logger.info(
+            f"Collection {collection_id}: {len(documents)} documents queued for indexing"
+        )
+        for (
+            document_id,
+            file_name,
+            binary_content,
+            chunk_strategy,
+            chunk_size,
+            chunk_overlap,
+            additional_params,
+            document_content_id,
+        ) in documents:
+            job = DocumentJob(
+                collection=collection,
+                document_id=document_id,
+                file_name=file_name,
+                binary_content=bytes(binary_content),
+                chunk_strategy=chunk_strategy,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                additional_params=additional_params,
+            )
+            job.reused = await self._try_copy_embeddings(
+                storage, job, document_content_id
+            )
+            if job.reused:
+                job.binary_content = b""
+                await self.write_queue.put(job)
+            else:
+                await self.chunk_queue.put(job)
+
+    async def _try_copy_embeddings(
+        self, storage: KnowledgeStorage, job: DocumentJob, document_content_id
+    ) -> bool:
+        """Reuse embeddings of an identical, already indexed document."""
+        if document_content_id is None:
+            return False
+        try:
+            return await self._run_in_thread(
+                lambda: storage.copy_document_embeddings(
+                    document_id=job.document_id,
+                    collection_id=job.collection.collection_id,
+                    document_content_id=document_content_id,
+                    chunk_strategy=job.chunk_strategy,
+                    chunk_size=job.chunk_size,
+                    chunk_overlap=job.chunk_overlap,
+                    additional_params=job.additional_params,
+                    embedder_model=job.collection.embedder.model_key,
+                )
+            )
+        except Exception as e:
+            logger.warning(
+                f"Failed to reuse embeddings for document ID: {job.document_id}. Error: {e}"
+            )
+            return False
+
+    async def _chunk_worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.chunk_queue.get()
+            try:
+                job.chunks = await loop.run_in_executor(
+                    self.process_executor,
+                    chunk_document,
+                    job.binary_content,
+                    job.file_name,
+                    job.chunk_strategy,
+                    job.chunk_size,
+                    job.chunk_overlap,
+                    job.additional_params,
+                )
+                # Raw content is no longer needed, release it before queueing
+                job.binary_content = b""
+                await self.embed_queue.put(job)
+            except Exception as e:
+                job.error = e
+                await self.write_queue.put(job)
+            finally:
+                self.chunk_queue.task_done()
+
+    async def _embed_worker(self):
+        storage = KnowledgeStorage(**POSTGRES_KNOWLEDGE_CONFIG)
+        while True:
+            job = await self.embed_queue.get()
+            try:
+                embedder = job.collection.embedder
+                semaphore = self._provider_semaphores[type(embedder).__name__]
+                async with semaphore:
+                    job.vectors = await self._run_in_thread(
+                        embed_chunks, storage, embedder, job.chunks
+                    )
+            except Exception as e:
+                job.error = e
+            finally:
+                await self.write_queue.put(job)
+                self.embed_queue.task_done()
+
+    async def _write_worker(self):
+        storage = KnowledgeStorage(**POSTGRES_KNOWLEDGE_CONFIG)
+        while True:
+            job = await self.write_queue.get()
+            try:
+                await self._write_document(storage, job)
+            except Exception as e:
+                logger.error(f"Error writing document ID: {job.document_id}. Error: {e}")
+            finally:
+                self.write_queue.task_done()
+
+    async def _write_document(self, storage: KnowledgeStorage, job: DocumentJob):
+        try:
+            if job.error is not None:
+                raise job.error
+
+            if job.reused:
+                logger.info(f"Document: {job.file_name} reused embeddings!")
+                return
+
+            await self._run_in_thread(
+                lambda: storage.save_embeddings(
+                    document_id=job.document_id,
+                    collection_id=job.collection.collection_id,
+                    rows=zip(job.chunks, job.vectors),
+                    embedder_model=job.collection.embedder.model_key,
+                    status=Status.COMPLETED,
+                )
+            )
+            logger.info(f"Document: {job.file_name} embedded!")
+        except Exception as e:
+            await self._run_in_thread(
+                storage.update_document_status, Status.FAILED, job.document_id
+            )
+            logger.error(
+                f"Error processing {job.file_name}, ID: {job.document_id}. Error: {e}"
+            )
+        finally:
+            job.collection.pending -= 1
+            if job.collection.pending == 0:
+                await self._run_in_thread(
+                    storage.update_collection_status,
+                    Status.COMPLETED,
+                    job.collection.collection_id,
+                )
+                logger.info(
+                    f"Embeddings created for collection_id: {job.collection.collection_id}"
+                )
@@ -1,12 +1,20 @@
 import os
 import asyncio
 import json
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from loguru import logger
 
 from services.redis_service import RedisService
-from collection_processor import CollectionProcessor
-from models.request_models import KnowledgeSearchMessage
+from services.search_service import SearchService
+from services.query_embedding_cache import QueryEmbeddingCache
+from services.reranker import CrossEncoderReranker
+from storage.async_knowledge_storage import AsyncKnowledgeStorage
+from storage.connection_pool import close_pools
+from storage.knowledge_storage import KnowledgeStorage
+from collection_processor import POSTGRES_KNOWLEDGE_CONFIG
+from indexing_pipeline import IndexingPipeline
+from models.request_models import KnowledgeSearchBatchMessage, KnowledgeSearchMessage
 
 # Redis Configuration
 redis_host = os.getenv("REDIS_HOST", "127.0.0.1")
@@ -20,9 +28,52 @@ knowledge_search_response_channel = os.getenv(
     "KNOWLEDGE_SEARCH_RESPONSE_CHANNEL", "knowledge:search:response"
 )
 
+# Indexing pipeline configuration
+fetch_workers = int(os.getenv("KNOWLEDGE_FETCH_WORKERS", "2"))
+chunk_workers = int(os.getenv("KNOWLEDGE_CHUNK_WORKERS", str(os.cpu_count() or 2)))
+embed_workers = int(os.getenv("KNOWLEDGE_EMBED_WORKERS", "8"))
+write_workers = int(os.getenv("KNOWLEDGE_WRITE_WORKERS", "2"))
+embed_concurrency_per_provider = int(
+    os.getenv("KNOWLEDGE_EMBED_CONCURRENCY_PER_PROVIDER", "4")
+)
+pipeline_queue_size = int(os.getenv("KNOWLEDGE_PIPELINE_QUEUE_SIZE", "32"))
+
+# Maximum number of searches processed at the same time
+search_concurrency = int(os.getenv("KNOWLEDGE_SEARCH_CONCURRENCY", "16"))
+# Default HNSW candidate list size, can be overridden per search message
+hnsw_ef_search = int(os.getenv("KNOWLEDGE_HNSW_EF_SEARCH", "100"))
+
+# "vector" or "hybrid" (vector + full-text with reciprocal rank fusion),
+# can be overridden per search message
+search_mode = os.getenv("KNOWLEDGE_SEARCH_MODE", "vector")
+hybrid_candidates = int(os.getenv("KNOWLEDGE_HYBRID_CANDIDATES", "20"))
+rrf_k = int(os.getenv("KNOWLEDGE_RRF_K", "60"))
+
+# Optional local cross-encoder reranking, disabled when no model is set
+reranker_model = os.getenv("KNOWLEDGE_RERANKER_MODEL", "")
+rerank_budget_ms = int(os.getenv("KNOWLEDGE_RERANK_BUDGET_MS", "200"))
+rerank_candidates = int(os.getenv("KNOWLEDGE_RERANK_CANDIDATES", "20"))
+
+# Query embedding cache, optionally shared between workers through Redis
+query_cache_size = int(os.getenv("KNOWLEDGE_QUERY_CACHE_SIZE", "1024"))
+query_cache_ttl = int(os.getenv("KNOWLEDGE_QUERY_CACHE_TTL", "3600"))
+query_cache_use_redis = os.getenv("KNOWLEDGE_QUERY_CACHE_REDIS", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
 
-async def indexing(redis_service, executor):
-    """Handles embedding creation from the Redis queue asynchronously."""
+# Process-wide Postgres pool used by the indexing pipeline
+db_pool_min_size = int(os.getenv("KNOWLEDGE_DB_POOL_MIN_SIZE", "1"))
+db_pool_max_size = int(
+    os.getenv(
+        "KNOWLEDGE_DB_POOL_MAX_SIZE", str(fetch_workers + embed_workers + write_workers)
+    )
+)
+
+
+async def indexing(redis_service, pipeline: IndexingPipeline):
+    """Feeds collections from the Redis queue into the indexing pipeline."""
     logger.info(f"Subscribed to channel '{knowledge_sources_channel}' for embeddings.")
 
     pubsub = await redis_service.async_subscribe(knowledge_sources_channel)
@@ -32,56 +83,65 @@ async def indexing(redis_service, executor):
                 data = json.loads(message["data"])
                 collection_id = data["collection_id"]
 
-                logger.info(f"Processing embeddings for collection_id: {collection_id}")
-
-                # Run blocking function in a ProcessPoolExecutor for CPU-bound work
-                loop = asyncio.get_running_loop()
-                await loop.run_in_executor(
-                    executor, run_process_collection, collection_id
-                )
-
-                logger.info(f"Embeddings created for collection_id: {collection_id}")
+                logger.info(f"Queued embeddings for collection_id: {collection_id}")
+                await pipeline.submit(collection_id)
             except Exception as e:
                 logger.error(f"Error processing embedding: {e}")
 
 
-def run_process_collection(collection_id):
-    """Runs the blocking embedding process in a separate process."""
-    processor = CollectionProcessor(collection_id)
-    processor.process_collection()
-
-
-async def searching(redis_service):
-    """Handles search queries from the Redis queue asynchronously."""
+async def searching(redis_service, search_service: SearchService):
+    """Dispatches search queries from the Redis queue concurrently."""
     logger.info(
         f"Subscribed to channel '{knowledge_search_get_channel}' for search queries."
     )
 
+    semaphore = asyncio.Semaphore(search_concurrency)
+    running_tasks: set[asyncio.Task] = set()
+
     pubsub = await redis_service.async_subscribe(knowledge_search_get_channel)
     async for message in pubsub.listen():
         if message["type"] == "message":
             try:
                 parsed_data = json.loads(message["data"])
-                data = KnowledgeSearchMessage(**parsed_data)
-                collection_id = data.collection_id
+                if "searches" in parsed_data:
+                    searches = KnowledgeSearchBatchMessage(**parsed_data).searches
+                else:
+                    searches = [KnowledgeSearchMessage(**parsed_data)]
+            except Exception as e:
+                logger.error(f"Error processing search: {e}")
+                continue
 
-                logger.info(f"Processing search for collection_id: {collection_id}")
+            for data in searches:
+                # Wait for a free slot so the number of in-flight searches stays bounded
+                await semaphore.acquire()
+                task = asyncio.create_task(search(redis_service, search_service, data))
+                running_tasks.add(task)
+                task.add_done_callback(running_tasks.discard)
+                task.add_done_callback(lambda _: semaphore.release())
 
-                processor = CollectionProcessor(collection_id)
-                result = processor.search(
-                    uuid=data.uuid,
-                    query=data.query,
-                    search_limit=data.search_limit,
-                    distance_threshold=data.distance_threshold,
-                )
 
-                await redis_service.async_publish(
-                    knowledge_search_response_channel, result
-                )
+async def search(
+    redis_service, search_service: SearchService, data: KnowledgeSearchMessage
+):
+    collection_id = data.collection_id
+    try:
+        logger.info(f"Processing search for collection_id: {collection_id}")
 
-                logger.info(f"Search completed for collection_id: {collection_id}")
-            except Exception as e:
-                logger.error(f"Error processing search: {e}")
+        result = await search_service.search(
+            uuid=data.uuid,
+            collection_id=collection_id,
+            query=data.query,
+            search_limit=data.search_limit,
+            distance_threshold=data.distance_threshold,
+            ef_search=data.ef_search,
+            search_mode=data.search_mode,
+        )
+
+        await redis_service.async_publish(knowledge_search_response_channel, result)
+
+        logger.info(f"Search completed for collection_id: {collection_id}")
+    except Exception as e:
+        logger.error(f"Error processing search: {e}")
 
 
 async def main():
@@ -89,16 +149,67 @@ async def main():
     redis_service = RedisService(host=redis_host, port=redis_port)
     await redis_service.connect()
 
-    # Use a ProcessPoolExecutor for CPU-bound tasks
-    executor = ThreadPoolExecutor()
+    # Creates the shared pool and bootstraps database extensions once per process
+    KnowledgeStorage(
+        **POSTGRES_KNOWLEDGE_CONFIG,
+        minconn=db_pool_min_size,
+        maxconn=db_pool_max_size,
+    ).connect()
+
+    search_storage = AsyncKnowledgeStorage(
+        **POSTGRES_KNOWLEDGE_CONFIG,
+        max_size=search_concurrency,
+        ef_search=hnsw_ef_search,
+    )
+    await search_storage.connect()
+    query_embedding_cache = QueryEmbeddingCache(
+        maxsize=query_cache_size,
+        ttl=query_cache_ttl,
+        redis_service=redis_service if query_cache_use_redis else None,
+    )
+    reranker = None
+    if reranker_model:
+        reranker = CrossEncoderReranker(reranker_model, budget_ms=rerank_budget_ms)
+    search_service = SearchService(
+        storage=search_storage,
+        query_embedding_cache=query_embedding_cache,
+        default_search_mode=search_mode,
+        hybrid_candidates=hybrid_candidates,
+        rrf_k=rrf_k,
+        reranker=reranker,
+        rerank_candidates=rerank_candidates,
+    )
+
+    # Threads for blocking DB and provider calls, processes for CPU-bound chunking
+    thread_executor = ThreadPoolExecutor(
+        max_workers=fetch_workers + embed_workers + write_workers
+    )
+    process_executor = ProcessPoolExecutor(
+        max_workers=chunk_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    pipeline = IndexingPipeline(
+        thread_executor=thread_executor,
+        process_executor=process_executor,
+        fetch_workers=fetch_workers,
+        chunk_workers=chunk_workers,
+        embed_workers=embed_workers,
+        write_workers=write_workers,
+        embed_concurrency_per_provider=embed_concurrency_per_provider,
+        queue_size=pipeline_queue_size,
+    )
+    pipeline.start()
 
-    task1 = asyncio.create_task(indexing(redis_service, executor))
-    task2 = asyncio.create_task(searching(redis_service))
+    task1 = asyncio.create_task(indexing(redis_service, pipeline))
+    task2 = asyncio.create_task(searching(redis_service, search_service))
 
     try:
         await asyncio.gather(task1, task2, return_exceptions=True)
     finally:
-        executor.shutdown(wait=True)
+        await pipeline.stop()
+        await search_storage.close()
+        close_pools()
+        process_executor.shutdown(wait=True)
+        thread_executor.shutdown(wait=True)
 
 
 if __name__ == "__main__":
@@ -7,3 +7,11 @@ class KnowledgeSearchMessage(BaseModel):
     query: str
     search_limit: int | None
     distance_threshold: float | None
+    ef_search: int | None = None
+    search_mode: str | None = None
+
+
+class KnowledgeSearchBatchMessage(BaseModel):
+    """Searches published together, every search gets its own response."""
+
+    searches: list[KnowledgeSearchMessage]
@@ -0,0 +1,110 @@
+import hashlib
+import json
+from typing import List
+import cachetools
+from loguru import logger
+
+from embedder.base_embedder import BaseEmbedder
+from services.redis_service import RedisService
+
+
+class QueryEmbeddingCache:
+    """
+    LRU/TTL cache of query embeddings keyed by (embedder, model, normalized query).
+
+    Lookups go to the in-process cache first and, when redis_service is given,
+    to Redis so that embeddings are shared across knowledge workers.
+    """
+
+    key_prefix = "knowledge:query_embedding"
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: int = 3600,
+        redis_service: RedisService | None = None,
+        log_every: int = 100,
+    ):
+        self.ttl = ttl
+        self.redis_service = redis_service
+        self.log_every = log_every
+        self._cache = cachetools.TTLCache(maxsize=maxsize, ttl=ttl)
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Collapse whitespace only, the case is kept as embedding models can be
+        case sensitive. The normalized query is the one that gets embedded,
+        so every query sharing a key gets the same embedding.
+        """
+        return " ".join(query.split())
+
+    def _make_key(self, embedder: BaseEmbedder, query: str) -> str:
+        raw_key = "|".join(
+            (
+                type(embedder).__name__,
+                str(getattr(embedder, "model_name", "")),
+                query,
+            )
+        )
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    async def aembed(self, embedder: BaseEmbedder, query: str) -> List[float]:
+        """Return cached embedding for the query or embed it with embedder."""
+        query = self.normalize_query(query)
+        key = self._make_key(embedder, query)
+
+        vector = self._cache.get(key)
+        if vector is not None:
+            self.local_hits += 1
+            self._log_stats()
+            return vector
+
+        redis_key = f"{self.key_prefix}:{key}"
+        if self.redis_service is not None:
+            try:
+                cached = await self.redis_service.async_get(redis_key)
+            except Exception as e:
+                logger.warning(f"Query embedding cache lookup in Redis failed: {e}")
+                cached = None
+            if cached is not None:
+                vector = json.loads(cached)
+                self._cache[key] = vector
+                self.redis_hits += 1
+                self._log_stats()
+                return vector
+
+        self.misses += 1
+        self._log_stats()
+        vector = await embedder.aembed(query)
+        self._cache[key] = vector
+
+        if self.redis_service is not None:
+            try:
+                await self.redis_service.async_set(
+                    redis_key, json.dumps(vector), ex=self.ttl
+                )
+            except Exception as e:
+                logger.warning(f"Query embedding cache write to Redis failed: {e}")
+
+        return vector
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        hits = self.local_hits + self.redis_hits
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "size": len(self._cache),
+        }
+
+    def _log_stats(self):
+        lookups = self.local_hits + self.redis_hits + self.misses
+        if self.log_every and lookups % self.log_every == 0:
+            logger.info(f"Query embedding cache stats: {self.stats()}")
@@ -23,3 +23,9 @@ class RedisService:
     async def async_publish(self, channel: str, message: object):
         await self.aioredis_client.publish(channel, json.dumps(message))
         logger.info(f"Message published to channel '{channel}'.")
+
+    async def async_get(self, key: str) -> str | None:
+        return await self.aioredis_client.get(key)
+
+    async def async_set(self, key: str, value: str, ex: int | None = None):
+        await self.aioredis_client.set(key, value, ex=ex)
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from loguru import logger
+
+
+class CrossEncoderReranker:
+    """
+    Reorders search candidates with a local cross-encoder model.
+
+    Reranking has a latency budget: if the model does not finish in time the
+    candidates are returned in their original order, so a slow or overloaded
+    reranker never delays the search response by more than the budget.
+    sentence-transformers is an optional dependency, it is only imported
+    when a reranker model is configured.
+    """
+
+    def __init__(self, model_name: str, budget_ms: int = 200, max_length: int = 512):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise ImportError(
+                "Reranking requires sentence-transformers, "
+                "install it or unset KNOWLEDGE_RERANKER_MODEL"
+            ) from e
+
+        self.model_name = model_name
+        self.budget = budget_ms / 1000
+        self.model = CrossEncoder(model_name, max_length=max_length)
+        # The model runs on its own thread, so scoring that ran out of budget
+        # keeps running there without taking threads of the default executor.
+        # The lock is held until scoring finishes, reranks meanwhile are skipped.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="reranker"
+        )
+        self._lock = threading.Lock()
+
+    def _score(self, query: str, candidates: list[str]) -> list[float]:
+        try:
+            return self.model.predict(
+                [(query, candidate) for candidate in candidates]
+            )
+        finally:
+            self._lock.release()
+
+    async def rerank(
+        self, query: str, candidates: list[str], limit: int | None
+    ) -> list[str]:
+        """Top limit candidates by score, all of them for limit None."""
+        if len(candidates) <= 1:
+            return candidates[:limit]
+        if not self._lock.acquire(blocking=False):
+            logger.warning("Reranker is busy, keeping retrieval order")
+            return candidates[:limit]
+
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._score, query, candidates
+        )
+        try:
+            async with asyncio.timeout(self.budget):
+                # Shielded, so a scoring that has not started yet still runs
+                # and releases the lock
+                scores = await asyncio.shield(future)
+        except TimeoutError:
+            # Nobody awaits the late result, retrieve its error so it is not reported
+            future.add_done_callback(lambda done: done.exception())
+            logger.warning(
+                f"Reranking {len(candidates)} candidates exceeded "
+                f"{self.budget * 1000:.0f}ms budget, keeping retrieval order"
+            )
+            return candidates[:limit]
+
+        logger.debug(
+            f"Reranked {len(candidates)} candidates in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        ranked = sorted(zip(scores, candidates), key=lambda item: item[0], reverse=True)
+        return [candidate for _, candidate in ranked[:limit]]
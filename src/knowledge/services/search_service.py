@@ -0,0 +1,114 @@
+import cachetools
+from loguru import logger
+
+from collection_processor import create_embedder
+from embedder.base_embedder import BaseEmbedder
+from services.query_embedding_cache import QueryEmbeddingCache
+from services.reranker import CrossEncoderReranker
+from storage.async_knowledge_storage import AsyncKnowledgeStorage
+
+
+SEARCH_MODES = ("vector", "hybrid")
+
+
+class SearchService:
+    """
+    Async counterpart of CollectionProcessor.search used by the search listener.
+
+    "vector" mode searches by embedding distance only, "hybrid" mode also
+    matches the query text and fuses both rankings in SQL. With a reranker
+    the SQL search returns rerank_candidates chunks and the reranker picks
+    the final search_limit of them.
+    """
+
+    def __init__(
+        self,
+        storage: AsyncKnowledgeStorage,
+        query_embedding_cache: QueryEmbeddingCache | None = None,
+        default_search_mode: str = "vector",
+        hybrid_candidates: int = 20,
+        rrf_k: int = 60,
+        reranker: CrossEncoderReranker | None = None,
+        rerank_candidates: int = 20,
+    ):
+        if default_search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode: {default_search_mode}")
+
+        self.storage = storage
+        self.query_embedding_cache = query_embedding_cache
+        self.default_search_mode = default_search_mode
+        self.hybrid_candidates = hybrid_candidates
+        self.rrf_k = rrf_k
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
+        self._embedder_cache = cachetools.LRUCache(maxsize=50)
+
+    async def get_embedder(self, collection_id: int) -> BaseEmbedder:
+        """Retrieve embedder from cache or initialize it if not cached."""
+        if collection_id in self._embedder_cache:
+            return self._embedder_cache[collection_id]
+
+        logger.info(f"Initializing embedder for collection {collection_id}")
+        embedder_config = await self.storage.get_embedder_configuration(collection_id)
+        embedder = create_embedder(embedder_config)
+
+        self._embedder_cache[collection_id] = embedder
+        return embedder
+
+    async def search(
+        self,
+        uuid,
+        collection_id,
+        query,
+        search_limit,
+        distance_threshold,
+        ef_search: int | None = None,
+        search_mode: str | None = None,
+    ) -> dict:
+        search_mode = search_mode or self.default_search_mode
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode: {search_mode}")
+
+        embedder = await self.get_embedder(collection_id)
+        if self.query_embedding_cache is not None:
+            embedded_query = await self.query_embedding_cache.aembed(embedder, query)
+        else:
+            embedded_query = await embedder.aembed(query)
+
+        # A search_limit of None returns every match, there is nothing to widen
+        limit = search_limit
+        if self.reranker is not None and search_limit is not None:
+            limit = max(self.rerank_candidates, search_limit)
+
+        if search_mode == "hybrid":
+            knowledge_snippets = await self.storage.hybrid_search(
+                embedded_query=embedded_query,
+                query=query,
+                collection_id=collection_id,
+                limit=limit,
+                distance_threshold=distance_threshold,
+                candidates=self.hybrid_candidates,
+                rrf_k=self.rrf_k,
+                ef_search=ef_search,
+            )
+        else:
+            knowledge_snippets = await self.storage.search(
+                embedded_query=embedded_query,
+                collection_id=collection_id,
+                limit=limit,
+                distance_threshold=distance_threshold,
+                ef_search=ef_search,
+            )
+
+        if self.reranker is not None:
+            knowledge_snippets = await self.reranker.rerank(
+                query, knowledge_snippets, search_limit
+            )
+        if knowledge_snippets:
+            logger.info(f"KNOWLEDGES: {knowledge_snippets[0][:150]}...")
+
+        return {
+            "uuid": uuid,
+            "collection_id": collection_id,
+            "results": knowledge_snippets,
+        }
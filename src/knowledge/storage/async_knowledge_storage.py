@@ -0,0 +1,168 @@
+from typing import Dict, List, Optional
+from loguru import logger
+import asyncpg
+
+from storage.vector_search import (
+    EXACT_SEARCH_QUERY,
+    INDEXED_DIMENSIONS,
+    build_ann_search_query,
+    build_hybrid_search_query,
+)
+
+
+class AsyncKnowledgeStorage:
+    """
+    Read-only access to knowledge tables for the search path, backed by an
+    asyncpg connection pool so concurrent searches never block the event loop.
+    """
+
+    def __init__(
+        self,
+        dbname,
+        user,
+        password,
+        host,
+        port,
+        min_size: int = 1,
+        max_size: int = 10,
+        ef_search: int = 100,
+    ):
+        self.conn_params = dict(
+            database=dbname, user=user, password=password, host=host, port=port
+        )
+        self.min_size = min_size
+        self.max_size = max_size
+        self.ef_search = ef_search
+        self.pool: asyncpg.Pool | None = None
+
+    async def connect(self):
+        if self.pool is None:
+            self.pool = await asyncpg.create_pool(
+                **self.conn_params,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                server_settings={"application_name": "knowledge_search"},
+            )
+            logger.info("Async knowledge storage pool created.")
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def get_embedder_configuration(
+        self, collection_id: int
+    ) -> Dict[str, Optional[str]]:
+        sql_query = """
+        SELECT
+            ec.api_key AS api_key,
+            em.name AS model_name,
+            p.name AS provider
+        FROM
+            tables_sourcecollection sc
+        JOIN
+            tables_embeddingconfig ec
+            ON ec.id = sc.embedder_id
+        JOIN
+            tables_embeddingmodel em
+            ON em.id = ec.model_id
+        JOIN
+            tables_provider p
+            ON p.id = em.embedding_provider_id
+        WHERE
+            sc.collection_id = $1;
+        """
+        result = await self.pool.fetchrow(sql_query, collection_id)
+
+        if result is None:
+            raise ValueError(
+                f"No embedding model found for collection_id={collection_id}"
+            )
+
+        return {
+            "api_key": result["api_key"],
+            "model_name": result["model_name"],
+            "provider": result["provider"],
+        }
+
+    async def _configure_ann_search(self, conn, ef_search: int | None):
+        """Set HNSW scan settings for the current transaction."""
+        await conn.execute(
+            "SELECT set_config('hnsw.ef_search', $1, true), "
+            "set_config('hnsw.iterative_scan', 'relaxed_order', true);",
+            str(ef_search or self.ef_search),
+        )
+
+    async def search(
+        self,
+        embedded_query: List[float],
+        collection_id: int,
+        limit: int | None = 3,
+        distance_threshold: float = 0.6,
+        ef_search: int | None = None,
+    ) -> list:
+        """
+        Search for documents in the knowledge base using vector similarity.
+
+        Vectors with an indexed dimension are searched through the matching HNSW
+        index with iterative scan, so filtering by collection does not cut the
+        result below limit. ef_search trades recall for latency.
+        """
+        dimensions = len(embedded_query)
+        # asyncpg has no codec for pgvector, pass the vector as its text form
+        vector_literal = "[" + ",".join(map(str, embedded_query)) + "]"
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                if dimensions in INDEXED_DIMENSIONS:
+                    await self._configure_ann_search(conn, ef_search)
+                    sql_query = build_ann_search_query(dimensions)
+                else:
+                    sql_query = EXACT_SEARCH_QUERY
+
+                results = await conn.fetch(
+                    sql_query, vector_literal, collection_id, limit, distance_threshold
+                )
+
+        return [r["chunk_text"] for r in results]
+
+    async def hybrid_search(
+        self,
+        embedded_query: List[float],
+        query: str,
+        collection_id: int,
+        limit: int | None = 3,
+        distance_threshold: float = 0.6,
+        candidates: int = 20,
+        rrf_k: int = 60,
+        ef_search: int | None = None,
+    ) -> list:
+        """
+        Search combining vector similarity and full-text match on chunk_text,
+        fused with reciprocal rank fusion. Each retriever contributes up to
+        candidates chunks, the top limit chunks are selected in SQL, all of
+        them for limit None.
+        """
+        dimensions = len(embedded_query)
+        vector_literal = "[" + ",".join(map(str, embedded_query)) + "]"
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                if dimensions in INDEXED_DIMENSIONS:
+                    await self._configure_ann_search(conn, ef_search)
+                    sql_query = build_hybrid_search_query(dimensions)
+                else:
+                    sql_query = build_hybrid_search_query(None)
+
+                results = await conn.fetch(
+                    sql_query,
+                    vector_literal,
+                    collection_id,
+                    limit,
+                    distance_threshold,
+                    query,
+                    candidates if limit is None else max(candidates, limit),
+                    rrf_k,
+                )
+
+        return [r["chunk_text"] for r in results]
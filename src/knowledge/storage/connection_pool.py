@@ -0,0 +1,117 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+from loguru import logger
+import psycopg2
+from psycopg2.extensions import connection as PGConnection
+from psycopg2.pool import ThreadedConnectionPool
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool.
+
+    Unlike ThreadedConnectionPool it waits for a free connection instead of
+    raising when exhausted, pings connections that were idle for longer than
+    health_check_interval and replaces broken ones.
+    """
+
+    def __init__(
+        self,
+        minconn: int,
+        maxconn: int,
+        health_check_interval: float = 30.0,
+        on_init: Optional[Callable[[PGConnection], None]] = None,
+        **conn_params,
+    ):
+        self.health_check_interval = health_check_interval
+        self._pool = ThreadedConnectionPool(minconn, maxconn, **conn_params)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._last_used: dict[int, float] = {}
+
+        if on_init is not None:
+            with self.connection() as conn:
+                on_init(conn)
+
+    def _is_healthy(self, conn: PGConnection) -> bool:
+        if conn.closed != 0:
+            return False
+
+        last_used = self._last_used.get(id(conn), 0.0)
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _getconn(self) -> PGConnection:
+        conn = self._pool.getconn()
+        while not self._is_healthy(conn):
+            logger.warning("Discarding broken database connection from pool")
+            self._discard(conn)
+            conn = self._pool.getconn()
+        return conn
+
+    def _discard(self, conn: PGConnection):
+        self._last_used.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            conn = self._getconn()
+            try:
+                yield conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                self._discard(conn)
+                raise
+            except Exception:
+                self._release(conn)
+                raise
+            else:
+                self._release(conn)
+        finally:
+            self._slots.release()
+
+    def _release(self, conn: PGConnection):
+        self._last_used[id(conn)] = time.monotonic()
+        self._pool.putconn(conn)
+
+    def closeall(self):
+        self._pool.closeall()
+        self._last_used.clear()
+
+
+_pools: dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(
+    conn_params: dict,
+    minconn: int = 1,
+    maxconn: int = 10,
+    on_init: Optional[Callable[[PGConnection], None]] = None,
+) -> ConnectionPool:
+    """Return the process-wide pool for conn_params, creating it on first use."""
+    key = tuple(sorted(conn_params.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(minconn, maxconn, on_init=on_init, **conn_params)
+            _pools[key] = pool
+            logger.info(f"Database connection pool created (max {maxconn}).")
+        return pool
+
+
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
@@ -1,52 +1,70 @@
-from typing import Dict, Optional, List
+import hashlib
+import json
+from typing import Dict, Iterable, Optional, List, Tuple
 from contextlib import contextmanager
 from loguru import logger
-import psycopg2
-from psycopg2.extras import execute_values
+from psycopg2.extras import Json, execute_values
 from settings import Status
+from storage.connection_pool import ConnectionPool, get_pool
+
+
+def hash_chunk(chunk_text: str) -> str:
+    return hashlib.sha256(chunk_text.encode("utf-8")).hexdigest()
+
+
+def _ensure_uuid_extension(conn):
+    try:
+        with conn.cursor() as cur:
+            cur.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        logger.exception("Failed to ensure uuid-ossp extension")
+        raise
 
 
 class KnowledgeStorage:
-    def __init__(self, dbname, user, password, host, port):
+    def __init__(self, dbname, user, password, host, port, minconn=1, maxconn=10):
         self.conn_params = dict(
             dbname=dbname, user=user, password=password, host=host, port=port
         )
-        self.conn = None
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.pool: ConnectionPool | None = None
 
     def connect(self):
-        if self.conn is None or self.conn.closed != 0:
-            self.conn = psycopg2.connect(**self.conn_params)
-            self._ensure_uuid_extension()
+        """
+        Attach to the process-wide connection pool.
+        The uuid-ossp extension is bootstrapped once, when the pool is created.
+        """
+        if self.pool is None:
+            self.pool = get_pool(
+                self.conn_params,
+                minconn=self.minconn,
+                maxconn=self.maxconn,
+                on_init=_ensure_uuid_extension,
+            )
 
     def close(self):
-        if self.conn:
-            self.conn.close()
-
-    def _ensure_uuid_extension(self):
-        try:
-            with self.conn.cursor() as cur:
-                cur.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";')
-            self.conn.commit()
-        except Exception:
-            self.conn.rollback()
-            logger.exception("Failed to ensure uuid-ossp extension")
-            raise
+        # Connections are returned to the shared pool after every transaction
+        self.pool = None
 
     @contextmanager
     def transaction(self):
-        try:
-            with self.conn.cursor() as cur:
-                yield cur
-                self.conn.commit()
-        except Exception:
-            self.conn.rollback()
-            logger.exception("Database error during transaction")
-            raise
+        with self.pool.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    yield cur
+                    conn.commit()
+            except Exception:
+                conn.rollback()
+                logger.exception("Database error during transaction")
+                raise
 
     def get_documents(self, collection_id):
         self.connect()
         query = """
-            SELECT dm.document_id, dm.file_name, dc.content, dm.chunk_strategy, dm.chunk_size, dm.chunk_overlap, dm.additional_params
+            SELECT dm.document_id, dm.file_name, dc.content, dm.chunk_strategy, dm.chunk_size, dm.chunk_overlap, dm.additional_params, dm.document_content_id
             FROM tables_documentmetadata dm
             JOIN tables_documentcontent dc
             ON dm.document_content_id = dc.id
@@ -59,14 +77,122 @@ class KnowledgeStorage:
             cur.execute(query, (collection_id, Status.NEW.value))
             return cur.fetchall()
 
-    def save_embedding(self, chunk_text, embedding, document_id, collection_id):
+    def save_embeddings(
+        self,
+        document_id,
+        collection_id,
+        rows: Iterable[Tuple[str, List[float]]],
+        embedder_model: str | None = None,
+        status: Status = Status.COMPLETED,
+        page_size: int = 500,
+    ):
+        """
+        Bulk insert (chunk_text, vector) rows of a document and set the document
+        status in a single transaction.
+        """
         self.connect()
         query = """
-        INSERT INTO tables_documentembedding (embedding_id, chunk_text, vector, created_at, document_id, collection_id)
-        VALUES (uuid_generate_v4(), %s, %s, NOW(), %s, %s);
+        INSERT INTO tables_documentembedding (embedding_id, chunk_text, vector, created_at, document_id, collection_id, chunk_hash, embedder_model)
+        VALUES %s;
+        """
+        template = "(uuid_generate_v4(), %s, %s, NOW(), %s, %s, %s, %s)"
+        values = (
+            (
+                chunk_text,
+                embedding,
+                document_id,
+                collection_id,
+                hash_chunk(chunk_text),
+                embedder_model,
+            )
+            for chunk_text, embedding in rows
+        )
+        with self.transaction() as cur:
+            execute_values(cur, query, values, template=template, page_size=page_size)
+            self._set_document_status(cur, status, document_id)
+
+    def get_embeddings_by_chunk_hash(
+        self, embedder_model: str, chunk_hashes: Iterable[str]
+    ) -> Dict[str, List[float]]:
+        """
+        Return already stored vectors for chunks with the given hashes
+        that were embedded by the same model.
+        """
+        self.connect()
+        query = """
+        SELECT DISTINCT ON (chunk_hash) chunk_hash, vector::text
+        FROM tables_documentembedding
+        WHERE embedder_model = %s
+        AND chunk_hash = ANY(%s);
+        """
+        with self.transaction() as cur:
+            cur.execute(query, (embedder_model, list(chunk_hashes)))
+            results = cur.fetchall()
+
+        return {chunk_hash: json.loads(vector) for chunk_hash, vector in results}
+
+    def copy_document_embeddings(
+        self,
+        document_id,
+        collection_id,
+        document_content_id,
+        chunk_strategy,
+        chunk_size,
+        chunk_overlap,
+        additional_params,
+        embedder_model: str,
+    ) -> bool:
+        """
+        Copy embeddings from a completed document with the same content, chunk
+        parameters and embedder model, and mark the document as completed.
+
+        Returns False if there is no such document.
+        """
+        self.connect()
+        find_query = """
+        SELECT dm.document_id
+        FROM tables_documentmetadata dm
+        WHERE dm.document_content_id = %s
+        AND dm.document_id <> %s
+        AND dm.status = %s
+        AND dm.chunk_strategy = %s
+        AND dm.chunk_size = %s
+        AND dm.chunk_overlap = %s
+        AND dm.additional_params = %s
+        AND EXISTS (
+            SELECT 1 FROM tables_documentembedding de
+            WHERE de.document_id = dm.document_id
+            AND de.embedder_model = %s
+        )
+        LIMIT 1;
+        """
+        copy_query = """
+        INSERT INTO tables_documentembedding (embedding_id, chunk_text, vector, created_at, document_id, collection_id, chunk_hash, embedder_model)
+        SELECT uuid_generate_v4(), chunk_text, vector, NOW(), %s, %s, chunk_hash, embedder_model
+        FROM tables_documentembedding
+        WHERE document_id = %s;
         """
         with self.transaction() as cur:
-            cur.execute(query, (chunk_text, embedding, document_id, collection_id))
+            cur.execute(
+                find_query,
+                (
+                    document_content_id,
+                    document_id,
+                    Status.COMPLETED.value,
+                    chunk_strategy,
+                    chunk_size,
+                    chunk_overlap,
+                    Json(additional_params),
+                    embedder_model,
+                ),
+            )
+            source = cur.fetchone()
+            if source is None:
+                return False
+
+            cur.execute(copy_query, (document_id, collection_id, source[0]))
+            self._set_document_status(cur, Status.COMPLETED, document_id)
+            return True
 
     def update_document_status(self, status, document_id):
         self.connect()
@@ -74,13 +200,30 @@ class KnowledgeStorage:
             logger.error(f"Trying to set an invalid status: {status}")
             return
 
+        with self.transaction() as cur:
+            self._set_document_status(cur, status, document_id)
+
+    def update_documents_status(self, status, document_ids: List[int]):
+        self.connect()
+        if not isinstance(status, Status):
+            logger.error(f"Trying to set an invalid status: {status}")
+            return
+
         query = """
         UPDATE tables_documentmetadata
         SET status = %s
-        WHERE document_id = %s;
+        WHERE document_id = ANY(%s);
         """
         with self.transaction() as cur:
-            cur.execute(query, (status.value, document_id))
+            cur.execute(query, (status.value, list(document_ids)))
+
+    def _set_document_status(self, cur, status: Status, document_id):
+        query = """
+        UPDATE tables_documentmetadata
+        SET status = %s
+        WHERE document_id = %s;
+        """
+        cur.execute(query, (status.value, document_id))
 
     def update_collection_status(self, status, collection_id):
         self.connect()
@@ -146,18 +289,22 @@ class KnowledgeStorage:
         """
         self.connect()
         sql_query = """
-        SELECT vector <=> %s::vector AS distance, chunk_text
-        FROM tables_documentembedding
-        WHERE collection_id = %s
+        WITH nearest AS MATERIALIZED (
+            SELECT vector <=> %s::vector AS distance, chunk_text
+            FROM tables_documentembedding
+            WHERE collection_id = %s
+            ORDER BY distance
+            LIMIT %s
+        )
+        SELECT distance, chunk_text FROM nearest
+        WHERE distance < %s
         ORDER BY distance
-        LIMIT %s
         """
 
         with self.transaction() as cur:
-            cur.execute(sql_query, (embedded_query, collection_id, limit))
+            cur.execute(
+                sql_query, (embedded_query, collection_id, limit, distance_threshold)
+            )
             results = cur.fetchall()
 
-        return [r[1] for r in results if float(r[0]) < distance_threshold]
-
-    def __del__(self):
-        self.close()
+        return [r[1] for r in results]
@@ -0,0 +1,109 @@
+# Dimensions that have a partial HNSW index on tables_documentembedding.
+# Must be kept in sync with migration 0096_documentembedding_hnsw_indexes.
+INDEXED_DIMENSIONS = (768, 1024, 1536)
+
+# Text search configuration of the GIN index on chunk_text.
+# Must be kept in sync with migration 0098_documentembedding_chunk_text_gin_index.
+TEXT_SEARCH_CONFIG = "simple"
+
+# Query parameters shared by all search queries:
+# $1 query vector, $2 collection_id, $3 limit, $4 distance threshold.
+# Hybrid search adds $5 query text, $6 candidates per retriever, $7 RRF k.
+
+EXACT_SEARCH_QUERY = """
+WITH nearest AS MATERIALIZED (
+    SELECT vector <=> $1::vector AS distance, chunk_text
+    FROM tables_documentembedding
+    WHERE collection_id = $2
+    ORDER BY distance
+    LIMIT $3
+)
+SELECT distance, chunk_text FROM nearest
+WHERE distance < $4
+ORDER BY distance
+"""
+
+
+def _nearest_query(dimensions: int | None, limit_param: str) -> str:
+    """
+    Nearest chunks of the collection by cosine distance.
+    Indexed dimensions use the partial expression index, others are searched exactly.
+    """
+    if dimensions is None:
+        return f"""
+        SELECT embedding_id, chunk_text, vector <=> $1::vector AS distance
+        FROM tables_documentembedding
+        WHERE collection_id = $2
+        ORDER BY vector <=> $1::vector
+        LIMIT {limit_param}
+        """
+
+    if dimensions not in INDEXED_DIMENSIONS:
+        raise ValueError(f"No vector index for {dimensions} dimensions")
+
+    return f"""
+    SELECT embedding_id, chunk_text,
+        vector::vector({dimensions}) <=> $1::vector({dimensions}) AS distance
+    FROM tables_documentembedding
+    WHERE vector_dims(vector) = {dimensions}
+    AND collection_id = $2
+    ORDER BY vector::vector({dimensions}) <=> $1::vector({dimensions})
+    LIMIT {limit_param}
+    """
+
+
+def build_ann_search_query(dimensions: int) -> str:
+    """
+    Query using the partial expression index for the given dimensions.
+    Relaxed iterative scan may return rows slightly out of order,
+    so the threshold and final ordering are applied on the materialized result.
+    """
+    return f"""
+    WITH nearest AS MATERIALIZED ({_nearest_query(dimensions, "$3")})
+    SELECT distance, chunk_text FROM nearest
+    WHERE distance < $4
+    ORDER BY distance
+    """
+
+
+def build_hybrid_search_query(dimensions: int | None) -> str:
+    """
+    Fuse vector and full-text candidates with reciprocal rank fusion.
+
+    Each retriever ranks up to $6 candidates, a chunk scores
+    sum(1 / ($7 + rank)) over the retrievers that found it, and the top $3
+    chunks by score are returned. The distance threshold only filters vector
+    candidates, chunks matching the query text are kept regardless of distance.
+    Pass dimensions=None for vectors without an index.
+    """
+    return f"""
+    WITH nearest AS MATERIALIZED ({_nearest_query(dimensions, "$6")}),
+    semantic AS (
+        SELECT embedding_id, chunk_text,
+            ROW_NUMBER() OVER (ORDER BY distance) AS rank
+        FROM nearest
+        WHERE distance < $4
+    ),
+    lexical AS (
+        SELECT embedding_id, chunk_text,
+            ROW_NUMBER() OVER (
+                ORDER BY ts_rank_cd(
+                    to_tsvector('{TEXT_SEARCH_CONFIG}', chunk_text), query
+                ) DESC
+            ) AS rank
+        FROM tables_documentembedding,
+            websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', $5) query
+        WHERE collection_id = $2
+        AND to_tsvector('{TEXT_SEARCH_CONFIG}', chunk_text) @@ query
+        ORDER BY rank
+        LIMIT $6
+    )
+    SELECT
+        COALESCE(semantic.chunk_text, lexical.chunk_text) AS chunk_text,
+        COALESCE(1.0 / ($7 + semantic.rank), 0)
+            + COALESCE(1.0 / ($7 + lexical.rank), 0) AS score
+    FROM semantic
+    FULL OUTER JOIN lexical ON lexical.embedding_id = semantic.embedding_id
+    ORDER BY score DESC
+    LIMIT $3
+    """
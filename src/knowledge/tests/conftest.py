@@ -0,0 +1,11 @@
+import os
+
+# collection_processor reads the database settings on import, the tests never connect
+for key in (
+    "DB_NAME",
+    "DB_KNOWLEDGE_USER",
+    "DB_KNOWLEDGE_PASSWORD",
+    "DB_PORT",
+    "DB_HOST_NAME",
+):
+    os.environ.setdefault(key, "test")
@@ -0,0 +1,59 @@
+import asyncio
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.reranker import CrossEncoderReranker
+
+
+@pytest.fixture
+def reranker() -> CrossEncoderReranker:
+    with patch.dict(sys.modules, {"sentence_transformers": MagicMock()}):
+        reranker = CrossEncoderReranker("mock_model", budget_ms=50)
+    yield reranker
+    reranker._executor.shutdown(wait=False)
+
+
+def test_rerank_orders_by_score(reranker):
+    reranker.model.predict.return_value = [0.1, 0.9, 0.5]
+
+    result = asyncio.run(reranker.rerank("query", ["a", "b", "c"], limit=2))
+
+    assert result == ["b", "c"]
+
+
+def test_busy_reranker_keeps_retrieval_order(reranker):
+    """
+        - Given a scoring that runs out of budget and keeps running,
+        - When more reranks arrive meanwhile,
+        - Then they return the retrieval order without queueing behind it.
+    """
+    release = threading.Event()
+
+    def predict(pairs):
+        release.wait(5)
+        return [0.1, 0.9]
+
+    reranker.model.predict.side_effect = predict
+
+    async def rerank_while_busy():
+        first = await reranker.rerank("query", ["a", "b"], limit=2)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        second = await reranker.rerank("query", ["a", "b"], limit=2)
+        return first, second, loop.time() - start
+
+    first, second, busy_elapsed = asyncio.run(rerank_while_busy())
+
+    assert first == second == ["a", "b"]
+    assert busy_elapsed < reranker.budget
+    assert reranker.model.predict.call_count == 1
+
+    release.set()
+    # Runs once the late scoring is finished and released the model
+    reranker._executor.submit(lambda: None).result(5)
+    reranker.model.predict.side_effect = None
+    reranker.model.predict.return_value = [0.1, 0.9]
+    assert asyncio.run(reranker.rerank("query", ["a", "b"], limit=2)) == ["b", "a"]
@@ -0,0 +1,84 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from services.search_service import SearchService
+from storage.async_knowledge_storage import AsyncKnowledgeStorage
+
+
+def search_service(reranker=None) -> SearchService:
+    storage = MagicMock(spec=AsyncKnowledgeStorage)
+    storage.search = AsyncMock(return_value=["first", "second"])
+    storage.hybrid_search = AsyncMock(return_value=["first", "second"])
+    service = SearchService(storage=storage, reranker=reranker, rerank_candidates=20)
+    embedder = MagicMock()
+    embedder.aembed = AsyncMock(return_value=[0.1, 0.2])
+    service.get_embedder = AsyncMock(return_value=embedder)
+    return service
+
+
+def search(service: SearchService, search_limit, search_mode: str) -> dict:
+    return asyncio.run(
+        service.search(
+            uuid="uuid",
+            collection_id=1,
+            query="query",
+            search_limit=search_limit,
+            distance_threshold=0.6,
+            search_mode=search_mode,
+        )
+    )
+
+
+@pytest.mark.parametrize("search_mode", ["vector", "hybrid"])
+def test_unbounded_search_limit_with_reranker(search_mode):
+    reranker = MagicMock()
+    reranker.rerank = AsyncMock(
+        side_effect=lambda query, candidates, limit: candidates[::-1][:limit]
+    )
+    service = search_service(reranker)
+
+    result = search(service, search_limit=None, search_mode=search_mode)
+
+    assert result["results"] == ["second", "first"]
+    storage_search = getattr(
+        service.storage, "hybrid_search" if search_mode == "hybrid" else "search"
+    )
+    assert storage_search.await_args.kwargs["limit"] is None
+    reranker.rerank.assert_awaited_once_with("query", ["first", "second"], None)
+
+
+def test_reranker_widens_bounded_search_limit():
+    reranker = MagicMock()
+    reranker.rerank = AsyncMock(return_value=["first"])
+    service = search_service(reranker)
+
+    search(service, search_limit=3, search_mode="vector")
+
+    assert service.storage.search.await_args.kwargs["limit"] == 20
+
+
+@pytest.mark.parametrize("limit, candidates_limit", [(None, 20), (3, 20), (50, 50)])
+def test_hybrid_search_candidates(limit, candidates_limit):
+    storage = AsyncKnowledgeStorage("db", "user", "password", "host", 5432)
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=[])
+    conn.execute = AsyncMock()
+    storage.pool = MagicMock()
+    storage.pool.acquire.return_value.__aenter__.return_value = conn
+
+    asyncio.run(
+        storage.hybrid_search(
+            embedded_query=[0.1, 0.2],
+            query="query",
+            collection_id=1,
+            limit=limit,
+            candidates=20,
+        )
+    )
+
+    args = conn.fetch.await_args.args
+    # LIMIT NULL returns every fused match
+    assert args[3] is limit
+    assert args[6] == candidates_limit
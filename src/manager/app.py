@@ -23,6 +23,7 @@ from models.models import (
 from repositories.import_tool_data_repository import ImportToolDataRepository
 from services.tool_image_service import ToolImageService
 from services.tool_container_service import ToolContainerService
+from services.docker_registry import DockerRegistry
 from services.redis_service import RedisService
 from services.session_timeout_service import SessionTimeoutService
 from helpers.yaml_parser import load_env_from_yaml_config
@@ -32,12 +33,25 @@ from helpers.logger import logger
 app = FastAPI()
 
 import_tool_data_repository = ImportToolDataRepository()
+docker_registry = DockerRegistry(
+    docker_client=ToolContainerService.docker_client,
+    resync_interval=float(os.environ.get("DOCKER_REGISTRY_RESYNC_INTERVAL", 60)),
+)
 tool_image_service = ToolImageService(
-    import_tool_data_repository=import_tool_data_repository
+    import_tool_data_repository=import_tool_data_repository,
+    docker_registry=docker_registry,
 )
 tool_container_service = ToolContainerService(
     tool_image_service=tool_image_service,
     import_tool_data_repository=import_tool_data_repository,
+    docker_registry=docker_registry,
+    readiness_timeout=float(os.environ.get("TOOL_READINESS_TIMEOUT", 90)),
+    min_replicas=int(os.environ.get("TOOL_MIN_REPLICAS", 1)),
+    max_replicas=int(os.environ.get("TOOL_MAX_REPLICAS", 4)),
+    replica_concurrency=int(os.environ.get("TOOL_MAX_CONCURRENCY", 4)),
+    scale_up_queue_depth=int(os.environ.get("TOOL_SCALE_UP_QUEUE_DEPTH", 2)),
+    idle_timeout=float(os.environ.get("TOOL_IDLE_TIMEOUT", 600)),
+    idle_check_interval=float(os.environ.get("TOOL_IDLE_CHECK_INTERVAL", 60)),
 )
 redis_service = RedisService()
 
@@ -58,17 +72,19 @@ session_timeout_service = SessionTimeoutService(
     status_code=200,
     response_model=ClassDataResponseModel,
 )
-def post_class_data(
+async def post_class_data(
     tool_alias: str, tool_init_configuration: ToolInitConfigurationModel
 ):
     logger.info(f"{tool_alias}; {tool_init_configuration.tool_init_configuration}")
     try:
-        classdata = tool_container_service.request_class_data(
+        class_data = await tool_container_service.request_class_data(
             tool_alias=tool_alias,
             tool_init_configuration=tool_init_configuration.model_dump(),
-        )["classdata"]
+        )
         logger.info(f"Class data retrieved successfully for tool alias: {tool_alias}")
-        return ClassDataResponseModel(classdata=classdata)
+        return ClassDataResponseModel(
+            classdata=class_data["classdata"], image_id=class_data["image_id"]
+        )
     except Exception as e:
         logger.error(f"Failed to retrieve class data for tool alias {tool_alias}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -77,13 +93,15 @@ def post_class_data(
 @app.post(
     "/tool/{tool_alias}/run", status_code=200, response_model=RunToolResponseModel
 )
-def run(tool_alias: str, run_tool_params_model: RunToolParamsModel):
+async def run(tool_alias: str, run_tool_params_model: RunToolParamsModel):
     try:
-        run_tool_response = tool_container_service.request_run_tool(
+        run_tool_response = await tool_container_service.request_run_tool(
             tool_alias=tool_alias, run_tool_params_model=run_tool_params_model
         )
         logger.info(f"Tool with alias {tool_alias} run successfully.")
-        return RunToolResponseModel(data=run_tool_response["data"])
+        return RunToolResponseModel(
+            data=run_tool_response["data"], image_id=run_tool_response["image_id"]
+        )
     except Exception as e:
         logger.error(f"Failed to run tool with alias {tool_alias}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -121,9 +139,16 @@ async def start_up():
     """
     Starts redis subscribtion, starts SessionTimeoutService, connects to DB
     """
+    docker_registry.start()
+    tool_container_service.start()
+
     db_connected = await test_database_connection()
     if not db_connected:
         logger.error("Failed to connect to database during startup")
+    else:
+        # Containers of tools in active sessions start while the manager serves requests
+        tool_aliases = await session_repository.get_active_tool_aliases()
+        asyncio.create_task(tool_container_service.prewarm(tool_aliases))
 
     try:
         await redis_service.init_redis()
@@ -144,6 +169,8 @@ async def start_up():
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    docker_registry.stop()
+    await tool_container_service.aclose()
     if session_timeout_service:
         await session_timeout_service.stop()
     await redis_service.aioredis_client.close()
@@ -23,10 +23,12 @@ class ToolListResponseModel(BaseModel):
 
 class ClassDataResponseModel(BaseModel):
     classdata: str
+    image_id: str | None = None
 
 
 class RunToolResponseModel(BaseModel):
     data: str
+    image_id: str | None = None
 
 
 class RunCrewResponseModel(BaseModel):
@@ -86,3 +86,31 @@ class SessionRepository:
             return await self._execute_with_session(operation)
         except Exception:
             return None
+
+    async def get_active_tool_aliases(self) -> list[str]:
+        """
+        Get the aliases of the tools configured for agents of the crews
+        in the graphs of sessions with status 'run', 'pending' or 'wait_for_user'
+        """
+
+        async def operation(session: AsyncSession):
+            query = text(
+                """
+                SELECT DISTINCT tool.name_alias
+                FROM tables_session session
+                JOIN tables_crewnode crew_node ON crew_node.graph_id = session.graph_id
+                JOIN tables_crew_agents crew_agent ON crew_agent.crew_id = crew_node.crew_id
+                JOIN tables_agent_configured_tools agent_tool
+                    ON agent_tool.agent_id = crew_agent.agent_id
+                JOIN tables_toolconfig tool_config ON tool_config.id = agent_tool.toolconfig_id
+                JOIN tables_tool tool ON tool.id = tool_config.tool_id
+                WHERE session.status IN ('run', 'pending', 'wait_for_user')
+                """
+            )
+            result = await session.execute(query)
+            return [row.name_alias for row in result.fetchall()]
+
+        try:
+            return await self._execute_with_session(operation)
+        except Exception:
+            return []
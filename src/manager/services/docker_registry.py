@@ -0,0 +1,227 @@
+import threading
+
+import docker.errors
+from docker.client import DockerClient
+from docker.models.images import Image
+from docker.models.containers import Container
+
+from helpers.logger import logger
+
+
+CONTAINER_ACTIONS = {
+    "create",
+    "start",
+    "restart",
+    "die",
+    "stop",
+    "kill",
+    "pause",
+    "unpause",
+    "rename",
+    "destroy",
+}
+IMAGE_ACTIONS = {"pull", "build", "load", "import", "tag", "untag", "delete"}
+
+
+class DockerRegistry:
+    """
+    In-memory view of the containers and images of the Docker host.
+
+    Lookups do not call the Docker API. The registry is kept up to date from
+    the Docker events stream in a background thread and re-synced from a full
+    listing every resync_interval seconds, in case events were lost while
+    the stream was reconnecting.
+    """
+
+    def __init__(
+        self,
+        docker_client: DockerClient,
+        resync_interval: float = 60,
+        reconnect_delay: float = 3,
+    ):
+        self.docker_client = docker_client
+        self.resync_interval = resync_interval
+        self.reconnect_delay = reconnect_delay
+
+        self._lock = threading.Lock()
+        # container id -> container
+        self._containers: dict[str, Container] = {}
+        # "name:tag" -> image
+        self._images: dict[str, Image] = {}
+        # Every change bumps the generation, so a resync can tell which
+        # entries changed while the Docker host was being listed
+        self._generation = 0
+        # container id -> generation of its last change
+        self._container_changes: dict[str, int] = {}
+        # "name:tag" -> generation of its last change
+        self._image_changes: dict[str, int] = {}
+
+        self._stop_event = threading.Event()
+        self._events = None
+
+    def start(self):
+        self.resync()
+        threading.Thread(target=self._watch_events, daemon=True).start()
+        threading.Thread(target=self._resync_periodically, daemon=True).start()
+        logger.info("Docker registry started.")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._events is not None:
+            self._events.close()
+
+    def resync(self):
+        with self._lock:
+            listed_at = self._generation
+        containers = self.docker_client.containers.list(all=True)
+        images = self.docker_client.images.list()
+        with self._lock:
+            self._containers = self._merge_listing(
+                {container.id: container for container in containers},
+                self._containers,
+                self._container_changes,
+                listed_at,
+            )
+            self._images = self._merge_listing(
+                {tag: image for image in images for tag in image.tags},
+                self._images,
+                self._image_changes,
+                listed_at,
+            )
+        logger.debug(
+            f"Docker registry synced: {len(containers)} container(s), {len(images)} image(s)"
+        )
+
+    @staticmethod
+    def _merge_listing(
+        listed: dict, cached: dict, changes: dict[str, int], listed_at: int
+    ) -> dict:
+        """
+        Entries changed since listed_at are newer than the listing, so they
+        are kept as cached. Older changes are in the listing and forgotten.
+        """
+        for key, generation in list(changes.items()):
+            if generation <= listed_at:
+                del changes[key]
+            elif key in cached:
+                listed[key] = cached[key]
+            else:
+                listed.pop(key, None)
+        return listed
+
+    def _container_changed(self, container_id: str):
+        self._generation += 1
+        self._container_changes[container_id] = self._generation
+
+    def _image_changed(self, tag: str):
+        self._generation += 1
+        self._image_changes[tag] = self._generation
+
+    def _resync_periodically(self):
+        while not self._stop_event.wait(self.resync_interval):
+            try:
+                self.resync()
+            except Exception as e:
+                logger.warning(f"Docker registry resync failed: {e}")
+
+    def _watch_events(self):
+        while not self._stop_event.is_set():
+            try:
+                self._events = self.docker_client.events(
+                    decode=True, filters={"type": ["container", "image"]}
+                )
+                # Changes made while the stream was disconnected have no events
+                self.resync()
+                for event in self._events:
+                    self._handle_event(event)
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                logger.warning(f"Docker events stream failed: {e}")
+            self._stop_event.wait(self.reconnect_delay)
+
+    def _handle_event(self, event: dict):
+        object_id = event.get("id") or event.get("Actor", {}).get("ID")
+        if object_id is None:
+            return
+
+        action = event.get("Action") or event.get("status", "")
+        if event.get("Type") == "container" and action in CONTAINER_ACTIONS:
+            if action == "destroy":
+                with self._lock:
+                    self._containers.pop(object_id, None)
+                    self._container_changed(object_id)
+            else:
+                self.refresh_container(object_id)
+        elif event.get("Type") == "image" and action in IMAGE_ACTIONS:
+            self.refresh_image(object_id)
+
+    def refresh_container(self, container_id: str):
+        try:
+            container = self.docker_client.containers.get(container_id)
+        except docker.errors.NotFound:
+            container = None
+
+        with self._lock:
+            if container is None:
+                self._containers.pop(container_id, None)
+                self._container_changed(container_id)
+            else:
+                self._containers[container.id] = container
+                self._container_changed(container.id)
+
+    def refresh_image(self, image_ref: str):
+        """Refresh an image by id or name, tags it lost are dropped."""
+        try:
+            image = self.docker_client.images.get(image_ref)
+        except docker.errors.ImageNotFound:
+            image = None
+
+        image_id = image.id if image is not None else image_ref
+        with self._lock:
+            images = {
+                tag: cached_image
+                for tag, cached_image in self._images.items()
+                if cached_image.id != image_id and tag != image_ref
+            }
+            if image is not None:
+                for tag in image.tags:
+                    images[tag] = image
+            for tag in self._images.keys() | images.keys():
+                if self._images.get(tag) is not images.get(tag):
+                    self._image_changed(tag)
+            self._images = images
+
+    def add_container(self, container: Container):
+        """Register a container started by the manager without waiting for its event."""
+        with self._lock:
+            self._containers[container.id] = container
+            self._container_changed(container.id)
+
+    def remove_container(self, container: Container):
+        with self._lock:
+            self._containers.pop(container.id, None)
+            self._container_changed(container.id)
+
+    def add_image(self, image: Image):
+        """Register an image built or pulled by the manager without waiting for its event."""
+        with self._lock:
+            for tag in image.tags:
+                self._images[tag] = image
+                self._image_changed(tag)
+
+    def get_image(self, tag: str) -> Image | None:
+        with self._lock:
+            return self._images.get(tag)
+
+    def find_running_containers(self, image_tag: str) -> list[Container]:
+        with self._lock:
+            image = self._images.get(image_tag)
+            if image is None:
+                return []
+            return [
+                container
+                for container in self._containers.values()
+                if container.attrs.get("Image") == image.id
+                and container.status == "running"
+            ]
@@ -1,9 +1,10 @@
 import os
-import time
-from typing import Any
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 import docker.types
-import requests
-from requests import HTTPError, RequestException
+import docker.errors
+import httpx
 
 import docker
 from docker.types import Mount
@@ -15,61 +16,77 @@ from repositories.import_tool_data_repository import (
     ImportToolDataRepository,
 )
 from services.tool_image_service import ToolImageService
+from services.docker_registry import DockerRegistry
+from services.tool_replica_pool import ToolReplicaPool
 from helpers.logger import logger
 
 
 class ToolContainerService:
+    """
+    Starts tool containers and forwards requests to them.
+
+    Requests go through one pooled async HTTP client. A container that was
+    just started is polled until its server answers instead of retrying the
+    request itself.
+
+    Every tool image has a pool of min_replicas to max_replicas containers,
+    each serving at most replica_concurrency requests at once. Requests go to
+    the replica with the least outstanding requests, another replica is
+    started once scale_up_queue_depth requests wait for a slot, and replicas
+    idle for idle_timeout seconds are removed down to min_replicas. A busy or
+    starting tool does not hold up requests to the others.
+    """
+
     docker_client = docker.client.from_env()
 
     def __init__(
         self,
         tool_image_service: ToolImageService,
         import_tool_data_repository: ImportToolDataRepository,
+        docker_registry: DockerRegistry | None = None,
+        readiness_timeout: float = 90,
+        min_replicas: int = 1,
+        max_replicas: int = 4,
+        replica_concurrency: int = 4,
+        scale_up_queue_depth: int = 2,
+        idle_timeout: float = 600,
+        idle_check_interval: float = 60,
     ):
         self.tool_image_service = tool_image_service
         self.import_tool_data_repository = import_tool_data_repository
+        self.docker_registry = docker_registry
+        self.readiness_timeout = readiness_timeout
+        self.min_replicas = min_replicas
+        self.max_replicas = max_replicas
+        self.replica_concurrency = replica_concurrency
+        self.scale_up_queue_depth = scale_up_queue_depth
+        self.idle_timeout = idle_timeout
+        self.idle_check_interval = idle_check_interval
+
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            # Tool runs take as long as the tool needs
+            timeout=httpx.Timeout(None, connect=5),
+        )
+        # image name -> pool
+        self._pools: dict[str, ToolReplicaPool] = {}
+        self._ready_container_ids: set[str] = set()
+        self._background_tasks: set[asyncio.Task] = set()
+        self._idle_check_task: asyncio.Task | None = None
 
         manager_container = self.docker_client.containers.get("manager_container")
         network_settings = manager_container.attrs["NetworkSettings"]
         self.network_name = list(network_settings["Networks"].keys())[0]
 
-    def fetch_data_with_retry(self, url, retries=10, delay=3):
-        for attempt in range(retries):
-            try:
-                logger.debug(f"Attempt {attempt + 1} to fetch data from URL: {url}")
-                resp = requests.get(url)
-                if resp.status_code == 200:
-                    logger.info(f"Data fetched successfully from URL: {url}")
-                    return resp
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"Request failed on attempt {attempt + 1}: {e}")
-            if attempt < retries - 1:
-                time.sleep(delay)
-        logger.error(f"Failed to fetch data after {retries} attempts for URL: {url}")
-        raise Exception(f"Failed to fetch data after {retries} attempts.")
-
-    def post_data_with_retry(self, url, json, retries=30, delay=3):
-        if json is None:
-            json = dict()
-
-        for attempt in range(retries):
-            try:
-                logger.debug(f"Attempt {attempt + 1} to fetch data from URL: {url}")
-                resp = requests.post(url, json=json)
-                if resp.status_code == 200:
-                    logger.info(f"Data fetched successfully from URL: {url}")
-                    return resp
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"Request failed on attempt {attempt + 1}: {e}")
-            if attempt < retries - 1:
-                time.sleep(delay)
-        logger.error(f"Failed to fetch data after {retries} attempts for URL: {url}")
-        raise Exception(f"Failed to fetch data after {retries} attempts.")
-
     def find_running_containers_by_image_name(self, image_name) -> list[Container]:
-        containers = self.docker_client.containers.list(
-            filters={"ancestor": image_name}
-        )
+        if self.docker_registry is not None:
+            containers = self.docker_registry.find_running_containers(
+                f"{image_name}:latest"
+            )
+        else:
+            containers = self.docker_client.containers.list(
+                filters={"ancestor": image_name}
+            )
         logger.info(
             f"Found {len(containers)} running container(s) for image name: {image_name}"
         )
@@ -87,55 +104,221 @@ class ToolContainerService:
         logger.info(f"Found running container for tool alias: {tool_alias}")
         return list_containers[0]
 
-    def request_class_data(
-        self, tool_alias: str, tool_init_configuration: dict[str, Any] | None
-    ) -> dict:
-        container = self.get_running_tool(tool_alias=tool_alias)
-        if not container:
-            logger.info(
-                f"Container not found for tool alias {tool_alias}, starting a new container."
+    def start(self):
+        self._idle_check_task = asyncio.create_task(self._remove_idle_replicas())
+
+    async def aclose(self):
+        if self._idle_check_task is not None:
+            self._idle_check_task.cancel()
+        await self.http_client.aclose()
+
+    def _get_pool(self, image_name: str) -> ToolReplicaPool:
+        pool = self._pools.get(image_name)
+        if pool is None:
+            pool = ToolReplicaPool(
+                image_name=image_name,
+                min_replicas=self.min_replicas,
+                max_replicas=self.max_replicas,
+                replica_concurrency=self.replica_concurrency,
+                scale_up_queue_depth=self.scale_up_queue_depth,
             )
-            container = self.run_container_by_tool_alias(tool_alias=tool_alias)
+            self._pools[image_name] = pool
+        return pool
+
+    def _start_replica(
+        self, pool: ToolReplicaPool, tool_alias: str, replicas: list[Container]
+    ):
+        """Start a replica in the background, call with pool.condition held."""
+        container_name = pool.replica_name(pool.image_name, replicas)
+        pool.starting.add(container_name)
+        pool.start_error = None
+        logger.info(f"Starting replica {container_name} for tool alias: {tool_alias}")
+
+        async def start():
+            try:
+                container = await asyncio.to_thread(
+                    self.run_container_by_tool_alias,
+                    tool_alias=tool_alias,
+                    container_name=container_name,
+                )
+                await self.wait_until_ready(container)
+            except Exception as e:
+                logger.error(f"Failed to start replica {container_name}: {e}")
+                pool.start_error = e
+            finally:
+                async with pool.condition:
+                    pool.starting.discard(container_name)
+                    pool.condition.notify_all()
+
+        task = asyncio.create_task(start())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
 
-        response = self.post_data_with_retry(
-            f"http://{container.name}:8000/tool/{tool_alias}/class-data/",
-            json=tool_init_configuration,
+    async def prewarm(self, tool_aliases: list[str]):
+        """Start min_replicas containers for each of the tools."""
+        for tool_alias in tool_aliases:
+            try:
+                image_name = (
+                    self.import_tool_data_repository.find_image_name_by_tool_alias(
+                        tool_alias=tool_alias
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"Can not prewarm tool {tool_alias}: {e}")
+                continue
+
+            pool = self._get_pool(image_name)
+            async with pool.condition:
+                replicas = self.find_running_containers_by_image_name(image_name)
+                while len(replicas) + len(pool.starting) < pool.min_replicas:
+                    self._start_replica(pool, tool_alias, replicas)
+
+    async def _acquire_replica(
+        self, tool_alias: str
+    ) -> tuple[ToolReplicaPool, Container]:
+        image_name = self.import_tool_data_repository.find_image_name_by_tool_alias(
+            tool_alias=tool_alias
         )
-        return response.json()
+        pool = self._get_pool(image_name)
+        async with pool.condition:
+            woken = False
+            while True:
+                replicas = self.find_running_containers_by_image_name(image_name)
+                container = pool.select(replicas)
+                if container is not None:
+                    pool.acquire(container)
+                    return pool, container
 
-    def request_run_tool(
-        self, tool_alias: str, run_tool_params_model: RunToolParamsModel
-    ) -> dict:
-        container = self.get_running_tool(tool_alias=tool_alias)
-        if not container:
-            logger.info(
-                f"Container not found for tool alias {tool_alias}, starting a new container."
-            )
-            container = self.run_container_by_tool_alias(tool_alias=tool_alias)
+                if woken and pool.start_error is not None and not replicas:
+                    raise RuntimeError(
+                        f"Failed to start a container for tool alias {tool_alias}"
+                    ) from pool.start_error
+                if pool.needs_replica(len(replicas), queued=pool.waiting + 1):
+                    self._start_replica(pool, tool_alias, replicas)
+
+                pool.waiting += 1
+                try:
+                    await pool.condition.wait()
+                finally:
+                    pool.waiting -= 1
+                woken = True
+
+    async def _release_replica(self, pool: ToolReplicaPool, container: Container):
+        async with pool.condition:
+            pool.release(container)
+            pool.condition.notify()
 
+    @asynccontextmanager
+    async def tool_replica(self, tool_alias: str) -> AsyncIterator[Container]:
+        """A ready container of the tool, reserved for one request."""
+        pool, container = await self._acquire_replica(tool_alias=tool_alias)
         try:
-            response = requests.post(
-                url=f"http://{container.name}:8000/tool/{tool_alias}/run",
-                json=run_tool_params_model.model_dump(),
-            )
-            response.raise_for_status()
-            logger.info(f"Tool run requested successfully for tool alias: {tool_alias}")
-            return response.json()
-        except HTTPError as e:
-            logger.error(f"HTTP error occurred while running tool {tool_alias}: {e}")
-            raise RuntimeError(
-                f"HTTP error occurred while running tool {tool_alias}: {e}"
-            )
-        except RequestException as e:
-            logger.error(f"Request error occurred while running tool {tool_alias}: {e}")
-            raise RuntimeError(
-                f"Request error occurred while running tool {tool_alias}: {e}"
-            )
+            await self.wait_until_ready(container)
+            yield container
+        finally:
+            await self._release_replica(pool, container)
+
+    async def _remove_idle_replicas(self):
+        while True:
+            await asyncio.sleep(self.idle_check_interval)
+            for pool in list(self._pools.values()):
+                async with pool.condition:
+                    replicas = self.find_running_containers_by_image_name(
+                        pool.image_name
+                    )
+                    idle_replicas = pool.take_idle(replicas, self.idle_timeout)
+
+                for container in idle_replicas:
+                    logger.info(f"Removing idle replica {container.name}")
+                    try:
+                        await asyncio.to_thread(container.remove, force=True)
+                    except docker.errors.NotFound:
+                        pass
+                    except Exception as e:
+                        logger.error(
+                            f"Failed to remove idle replica {container.name}: {e}"
+                        )
+                    if self.docker_registry is not None:
+                        self.docker_registry.remove_container(container)
+                    self._ready_container_ids.discard(container.id)
+                    async with pool.condition:
+                        pool.forget(container)
+
+    async def wait_until_ready(self, container: Container):
+        if container.id in self._ready_container_ids:
+            return
+
+        # Any response means the server is up, older tool images have no /health
+        url = f"http://{container.name}:8000/health"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.readiness_timeout
+        delay = 0.1
+        while True:
+            try:
+                await self.http_client.get(url, timeout=2)
+                break
+            except httpx.TransportError as e:
+                if loop.time() + delay > deadline:
+                    raise TimeoutError(
+                        f"Container {container.name} is not ready after "
+                        f"{self.readiness_timeout} seconds: {e}"
+                    )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 2)
 
-    def run_container_by_tool_alias(self, tool_alias):
+        logger.info(f"Container {container.name} is ready.")
+        self._ready_container_ids.add(container.id)
+
+    async def request_class_data(
+        self, tool_alias: str, tool_init_configuration: dict[str, Any] | None
+    ) -> dict:
+        async with self.tool_replica(tool_alias=tool_alias) as container:
+            try:
+                response = await self.http_client.post(
+                    f"http://{container.name}:8000/tool/{tool_alias}/class-data/",
+                    json=tool_init_configuration,
+                )
+            except httpx.TransportError:
+                self._ready_container_ids.discard(container.id)
+                raise
+        response.raise_for_status()
+        logger.info(f"Class data fetched successfully for tool alias: {tool_alias}")
+        # Clients cache class data per image, so they have to know which one served it
+        return {**response.json(), "image_id": container.attrs["Image"]}
+
+    async def request_run_tool(
+        self, tool_alias: str, run_tool_params_model: RunToolParamsModel
+    ) -> dict:
+        async with self.tool_replica(tool_alias=tool_alias) as container:
+            try:
+                response = await self.http_client.post(
+                    url=f"http://{container.name}:8000/tool/{tool_alias}/run",
+                    json=run_tool_params_model.model_dump(),
+                )
+                response.raise_for_status()
+                logger.info(
+                    f"Tool run requested successfully for tool alias: {tool_alias}"
+                )
+                return {**response.json(), "image_id": container.attrs["Image"]}
+            except httpx.HTTPStatusError as e:
+                logger.error(f"HTTP error occurred while running tool {tool_alias}: {e}")
+                raise RuntimeError(
+                    f"HTTP error occurred while running tool {tool_alias}: {e}"
+                )
+            except httpx.RequestError as e:
+                if isinstance(e, httpx.TransportError):
+                    self._ready_container_ids.discard(container.id)
+                logger.error(
+                    f"Request error occurred while running tool {tool_alias}: {e}"
+                )
+                raise RuntimeError(
+                    f"Request error occurred while running tool {tool_alias}: {e}"
+                )
+
+    def run_container_by_tool_alias(self, tool_alias, container_name=None):
         logger.debug(f"Running container for tool alias: {tool_alias}")
         image = self.tool_image_service.get_or_build_tool_alias(tool_alias=tool_alias)
-        return self.run_container(image=image)
+        return self.run_container(image=image, container_name=container_name)
 
     def run_container(
         self, image: Image, container_name=None, port: int = 0
@@ -144,11 +327,15 @@ class ToolContainerService:
             container_name = image.tags[-1].split(":")[0]
 
         # Remove any existing container with the same name
-        for container in self.docker_client.containers.list(all=True):
-            if container.name == container_name:
-                logger.info(f"Removing existing container with name: {container_name}")
-                container.remove(force=True)
-                break
+        try:
+            existing_container = self.docker_client.containers.get(container_name)
+        except docker.errors.NotFound:
+            existing_container = None
+        if existing_container is not None:
+            logger.info(f"Removing existing container with name: {container_name}")
+            existing_container.remove(force=True)
+            if self.docker_registry is not None:
+                self.docker_registry.remove_container(existing_container)
 
         # Run new container
         container_tool = self.docker_client.containers.run(
@@ -172,5 +359,8 @@ class ToolContainerService:
             ],
         )
 
+        if self.docker_registry is not None:
+            self.docker_registry.add_container(container_tool)
+
         logger.info(f"Container {container_name} started successfully.")
         return container_tool
@@ -5,6 +5,7 @@ import docker.errors
 from helpers.logger import logger
 from services.build_tool import ToolDockerImageBuilder
 from repositories.import_tool_data_repository import ImportToolDataRepository
+from services.docker_registry import DockerRegistry
 
 import docker
 from docker.models.images import Image
@@ -15,8 +16,13 @@ from docker.client import DockerClient
 class ToolImageService:
     client: DockerClient = docker.client.from_env()
 
-    def __init__(self, import_tool_data_repository: ImportToolDataRepository):
+    def __init__(
+        self,
+        import_tool_data_repository: ImportToolDataRepository,
+        docker_registry: DockerRegistry | None = None,
+    ):
         self.import_tool_data_repository = import_tool_data_repository
+        self.docker_registry = docker_registry
 
     def build_image(self, image_name: str) -> Image:
 
@@ -31,6 +37,8 @@ class ToolImageService:
         )
 
         image = tdib.build_tool_image(image_name=import_tool_data.image_name)
+        if self.docker_registry is not None:
+            self.docker_registry.add_image(image)
         logger.info(
             f"Image built successfully with name: {import_tool_data.image_name}"
         )
@@ -52,6 +60,8 @@ class ToolImageService:
             logger.info(f"Image tagged locally with name: {image_name}")
             pulled_image = self.client.images.get(image_name)
             self.client.images.remove(image=dockerhub_image_name)
+            if self.docker_registry is not None:
+                self.docker_registry.add_image(pulled_image)
             return pulled_image
         return None
 
@@ -60,7 +70,11 @@ class ToolImageService:
         image_name = self.import_tool_data_repository.find_image_name_by_tool_alias(
             tool_alias=tool_alias
         )
-        image_list = [img for img in self.client.images.list() if f'{image_name}:latest' in img.tags]
+        if self.docker_registry is not None:
+            image = self.docker_registry.get_image(f"{image_name}:latest")
+            image_list = [image] if image is not None else []
+        else:
+            image_list = [img for img in self.client.images.list() if f'{image_name}:latest' in img.tags]
 
         if image_list:
             logger.info(f"Image found locally for alias {tool_alias}: {image_name}")
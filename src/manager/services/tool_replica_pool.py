@@ -0,0 +1,111 @@
+import time
+import asyncio
+from collections import defaultdict
+
+from docker.models.containers import Container
+
+
+class ToolReplicaPool:
+    """
+    Routing and scaling state of the containers of one tool image.
+
+    The replicas themselves are the running containers of the image, the
+    pool only tracks the requests they are serving. All methods have to be
+    called with `condition` held.
+    """
+
+    def __init__(
+        self,
+        image_name: str,
+        min_replicas: int = 1,
+        max_replicas: int = 4,
+        replica_concurrency: int = 4,
+        scale_up_queue_depth: int = 2,
+    ):
+        self.image_name = image_name
+        self.min_replicas = min_replicas
+        self.max_replicas = max(max_replicas, min_replicas, 1)
+        self.replica_concurrency = replica_concurrency
+        self.scale_up_queue_depth = scale_up_queue_depth
+
+        self.condition = asyncio.Condition()
+        # container id -> requests in flight
+        self.outstanding: defaultdict[str, int] = defaultdict(int)
+        # container id -> time the replica was last used or first seen
+        self.last_used: dict[str, float] = {}
+        # ids of replicas that are being removed
+        self.draining: set[str] = set()
+        # names of replicas that are being started
+        self.starting: set[str] = set()
+        self.waiting = 0
+        self.start_error: Exception | None = None
+
+    def select(self, replicas: list[Container]) -> Container | None:
+        """Least outstanding requests replica with a free slot."""
+        now = time.monotonic()
+        candidates = []
+        for container in replicas:
+            self.last_used.setdefault(container.id, now)
+            if (
+                container.id not in self.draining
+                and self.outstanding[container.id] < self.replica_concurrency
+            ):
+                candidates.append(container)
+        if not candidates:
+            return None
+        return min(candidates, key=lambda container: self.outstanding[container.id])
+
+    def acquire(self, container: Container):
+        self.outstanding[container.id] += 1
+
+    def release(self, container: Container):
+        self.outstanding[container.id] -= 1
+        if self.outstanding[container.id] <= 0:
+            del self.outstanding[container.id]
+        self.last_used[container.id] = time.monotonic()
+
+    def needs_replica(self, replica_count: int, queued: int) -> bool:
+        """
+        Whether another replica has to be started for `queued` requests
+        waiting for a slot. Replicas are added one at a time above min_replicas.
+        """
+        total = replica_count + len(self.starting)
+        if total >= self.max_replicas:
+            return False
+        if total == 0 or total < self.min_replicas:
+            return True
+        return not self.starting and queued >= self.scale_up_queue_depth
+
+    def replica_name(self, base_name: str, replicas: list[Container]) -> str:
+        """The first replica is named after the image, the others get an index."""
+        used_names = {container.name for container in replicas} | self.starting
+        if base_name not in used_names:
+            return base_name
+        index = 1
+        while f"{base_name}-{index}" in used_names:
+            index += 1
+        return f"{base_name}-{index}"
+
+    def take_idle(
+        self, replicas: list[Container], idle_timeout: float
+    ) -> list[Container]:
+        """Marks the replicas idle for idle_timeout as draining, keeping min_replicas."""
+        now = time.monotonic()
+        active = [
+            container for container in replicas if container.id not in self.draining
+        ]
+        removable = len(active) - self.min_replicas
+        idle = []
+        for container in active:
+            if len(idle) >= removable:
+                break
+            last_used = self.last_used.setdefault(container.id, now)
+            if self.outstanding[container.id] == 0 and now - last_used > idle_timeout:
+                self.draining.add(container.id)
+                idle.append(container)
+        return idle
+
+    def forget(self, container: Container):
+        self.draining.discard(container.id)
+        self.outstanding.pop(container.id, None)
+        self.last_used.pop(container.id, None)
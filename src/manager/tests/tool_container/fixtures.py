@@ -6,8 +6,10 @@ import os
 import pytest
 import json
 import docker
+import httpx
 from unittest.mock import MagicMock, Mock, patch
 from repositories.import_tool_data_repository import ImportToolDataRepository
+from services.docker_registry import DockerRegistry
 
 if TYPE_CHECKING:
     from typing import Generator
@@ -162,6 +164,46 @@ def mock_tool_container_service(mocker, mock_tool_image_service: ToolImageServic
     return tool_container_service
 
 
+@pytest.fixture
+def mock_docker_registry() -> DockerRegistry:
+    """Registry of a mocked Docker host with the 'mock_tool:latest' image and no containers."""
+    docker_registry = DockerRegistry(MagicMock())
+    docker_registry.add_image(MagicMock(id="sha256:mock_tool", tags=["mock_tool:latest"]))
+    return docker_registry
+
+
+@pytest.fixture
+def mock_pooled_tool_container_service(
+    mock_tool_container_service: ToolContainerService,
+    mock_docker_registry: DockerRegistry,
+) -> ToolContainerService:
+    """
+    ToolContainerService with a mocked HTTP client, serving 'mock_tool' from
+    mock_docker_registry. Started containers are added to the registry.
+    """
+    service = mock_tool_container_service
+    service.import_tool_data_repository = Mock()
+    service.import_tool_data_repository.find_image_name_by_tool_alias.return_value = 'mock_tool'
+    service.docker_registry = mock_docker_registry
+    service.readiness_timeout = 0.5
+
+    service.http_client = MagicMock(spec=httpx.AsyncClient)
+    response = MagicMock()
+    response.json.return_value = {"data": "result"}
+    service.http_client.get.return_value = response
+    service.http_client.post.return_value = response
+
+    def run_container_by_tool_alias(tool_alias, container_name=None):
+        container = MagicMock(id=f"id_{container_name}", status="running")
+        container.name = container_name
+        container.attrs = {"Image": "sha256:mock_tool"}
+        mock_docker_registry.add_container(container)
+        return container
+
+    service.run_container_by_tool_alias = Mock(side_effect=run_container_by_tool_alias)
+    return service
+
+
 @pytest.fixture
 def tools_config_file(tmpdir) -> str:
     tools_config_content = [
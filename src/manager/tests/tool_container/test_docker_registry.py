@@ -0,0 +1,123 @@
+from unittest.mock import MagicMock
+
+import docker.errors
+import pytest
+
+from services.docker_registry import DockerRegistry
+
+
+def mock_image(image_id: str, tags: list[str]) -> MagicMock:
+    return MagicMock(id=image_id, tags=tags)
+
+
+def mock_container(
+    container_id: str, image_id: str, status: str = "running"
+) -> MagicMock:
+    container = MagicMock(id=container_id, status=status)
+    container.name = container_id
+    container.attrs = {"Image": image_id}
+    return container
+
+
+@pytest.fixture
+def docker_client() -> MagicMock:
+    docker_client = MagicMock()
+    docker_client.images.list.return_value = [
+        mock_image("sha256:old", ["mock_tool:latest"])
+    ]
+    docker_client.containers.list.return_value = [
+        mock_container("running_tool", "sha256:old"),
+        mock_container("exited_tool", "sha256:old", status="exited"),
+    ]
+    return docker_client
+
+
+class TestDockerRegistry:
+
+    def test_find_running_containers(self, docker_client):
+        """
+            - Given a running and an exited container of 'mock_tool:latest',
+            - When `find_running_containers` is called after a resync,
+            - Then only the running container is returned, without another Docker API call.
+        """
+        registry = DockerRegistry(docker_client)
+        registry.resync()
+        docker_client.reset_mock()
+
+        containers = registry.find_running_containers("mock_tool:latest")
+
+        assert [container.id for container in containers] == ["running_tool"]
+        assert registry.find_running_containers("other_tool:latest") == []
+        docker_client.containers.list.assert_not_called()
+
+    def test_image_rebuild_events(self, docker_client):
+        """
+            - Given 'mock_tool:latest' is cached for the old image,
+            - When the tag moves to a rebuilt image and the old image is deleted,
+            - Then the tag resolves to the rebuilt image and old containers are not returned.
+        """
+        registry = DockerRegistry(docker_client)
+        registry.resync()
+
+        new_image = mock_image("sha256:new", ["mock_tool:latest"])
+        docker_client.images.get.return_value = new_image
+        registry._handle_event({"Type": "image", "Action": "tag", "id": "sha256:new"})
+
+        docker_client.images.get.side_effect = docker.errors.ImageNotFound("deleted")
+        registry._handle_event(
+            {"Type": "image", "Action": "delete", "id": "sha256:old"}
+        )
+
+        assert registry.get_image("mock_tool:latest") is new_image
+        assert registry.find_running_containers("mock_tool:latest") == []
+
+    def test_container_events(self, docker_client):
+        """
+            - Given a registry synced with one running container,
+            - When a new container starts and the running one is destroyed,
+            - Then only the new container is returned.
+        """
+        registry = DockerRegistry(docker_client)
+        registry.resync()
+
+        docker_client.containers.get.return_value = mock_container(
+            "new_tool", "sha256:old"
+        )
+        registry._handle_event(
+            {"Type": "container", "Action": "start", "id": "new_tool"}
+        )
+        registry._handle_event(
+            {"Type": "container", "Action": "destroy", "id": "running_tool"}
+        )
+
+        containers = registry.find_running_containers("mock_tool:latest")
+        assert [container.id for container in containers] == ["new_tool"]
+
+    def test_resync_keeps_changes_made_while_listing(self, docker_client):
+        """
+            - Given a registry synced with a running and an exited container,
+            - When a container is added and another removed while a resync lists the host,
+            - Then the resync keeps both changes instead of the outdated listing.
+        """
+        registry = DockerRegistry(docker_client)
+        registry.resync()
+        listing = docker_client.containers.list.return_value
+        started_tool = mock_container("started_tool", "sha256:old")
+
+        def list_containers(all):
+            registry.add_container(started_tool)
+            registry.remove_container(listing[0])
+            return listing
+
+        docker_client.containers.list.side_effect = list_containers
+        registry.resync()
+
+        containers = registry.find_running_containers("mock_tool:latest")
+        assert [container.id for container in containers] == ["started_tool"]
+
+        # Once listed after the changes, the host is the source of truth again
+        docker_client.containers.list.side_effect = None
+        registry.resync()
+
+        containers = registry.find_running_containers("mock_tool:latest")
+        assert [container.id for container in containers] == ["running_tool"]
@@ -1,8 +1,17 @@
+import asyncio
 from unittest.mock import Mock, MagicMock, patch
+import httpx
 from docker.models.images import Image
+from models.models import RunToolParamsModel
 
 from tests.tool_container.fixtures import tool_container_service, mocktool_image, manager_container
 from tests.tool_container.fixtures import test_network, docker_client
+from tests.tool_container.fixtures import (
+    mock_tool_image_service,
+    mock_tool_container_service,
+    mock_docker_registry,
+    mock_pooled_tool_container_service,
+)
 import pytest
 
 @pytest.mark.skip
@@ -30,3 +39,85 @@ def test_request_class_data_image_exist(tool_container_service, mocktool_image,
 
         expected_url = f"http://{container.name}:8000/tool/{tool_alias}/class-data/"
         mock_requests_get.assert_called_with(expected_url)
+
+
+class TestToolContainerServicePool:
+
+    @pytest.mark.asyncio
+    async def test_readiness_backoff_until_timeout(
+        self, mock_pooled_tool_container_service
+    ):
+        """
+            - Given a container whose server never answers and a readiness timeout of 0.5 seconds,
+            - When `wait_until_ready` is called,
+            - Then /health is polled with a doubling delay until the next poll is past the timeout.
+        """
+        service = mock_pooled_tool_container_service
+        service.http_client.get.side_effect = httpx.ConnectError("refused")
+        container = service.run_container_by_tool_alias("mock_alias", "mock_tool")
+
+        with pytest.raises(TimeoutError):
+            await service.wait_until_ready(container)
+
+        # Polled at 0, 0.1 and 0.3 seconds, the next poll at 0.7 is past the timeout
+        assert service.http_client.get.await_count == 3
+        service.http_client.get.assert_awaited_with(
+            "http://mock_tool:8000/health", timeout=2
+        )
+        assert container.id not in service._ready_container_ids
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_start_one_container(
+        self, mock_pooled_tool_container_service
+    ):
+        """
+            - Given no running container for 'mock_tool',
+            - When three requests for the tool arrive at once,
+            - Then a single replica is started and serves all of them.
+        """
+        service = mock_pooled_tool_container_service
+        service.scale_up_queue_depth = 10
+
+        results = await asyncio.gather(
+            *(
+                service.request_class_data(
+                    tool_alias="mock_alias", tool_init_configuration=None
+                )
+                for _ in range(3)
+            )
+        )
+
+        assert results == [{"data": "result", "image_id": "sha256:mock_tool"}] * 3
+        service.run_container_by_tool_alias.assert_called_once_with(
+            tool_alias="mock_alias", container_name="mock_tool"
+        )
+        pool = service._pools["mock_tool"]
+        assert pool.starting == set()
+        assert pool.outstanding == {}
+
+    @pytest.mark.asyncio
+    async def test_transport_error_drops_readiness(
+        self, mock_pooled_tool_container_service
+    ):
+        """
+            - Given a ready 'mock_tool' container,
+            - When a request to it fails with a transport error,
+            - Then the container is polled for readiness again before the next request.
+        """
+        service = mock_pooled_tool_container_service
+        container = service.run_container_by_tool_alias("mock_alias", "mock_tool")
+        await service.wait_until_ready(container)
+        params = RunToolParamsModel(run_kwargs={"query": "q"})
+
+        service.http_client.post.side_effect = httpx.ConnectError("reset")
+        with pytest.raises(RuntimeError):
+            await service.request_run_tool("mock_alias", params)
+        assert container.id not in service._ready_container_ids
+
+        service.http_client.post.side_effect = None
+        service.http_client.get.reset_mock()
+        result = await service.request_run_tool("mock_alias", params)
+
+        assert result == {"data": "result", "image_id": "sha256:mock_tool"}
+        service.http_client.get.assert_awaited_once()
+        assert container.id in service._ready_container_ids
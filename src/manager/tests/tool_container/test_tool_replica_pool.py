@@ -0,0 +1,77 @@
+from unittest.mock import MagicMock
+
+from services.tool_replica_pool import ToolReplicaPool
+
+
+def mock_container(name: str) -> MagicMock:
+    container = MagicMock(id=f"id_{name}")
+    container.name = name
+    return container
+
+
+class TestToolReplicaPool:
+
+    def test_select_least_outstanding(self):
+        """
+            - Given two replicas with one and zero requests in flight,
+            - When a replica is selected,
+            - Then the idle one is returned, and none once every slot is taken.
+        """
+        pool = ToolReplicaPool("mock_tool", replica_concurrency=1)
+        busy, idle = mock_container("mock_tool"), mock_container("mock_tool-1")
+        pool.acquire(busy)
+
+        assert pool.select([busy, idle]) is idle
+
+        pool.acquire(idle)
+        assert pool.select([busy, idle]) is None
+
+        pool.release(busy)
+        assert pool.select([busy, idle]) is busy
+
+    def test_needs_replica(self):
+        """
+            - Given a pool of 1 to 2 replicas that scales up at a queue depth of 2,
+            - When requests wait for a slot,
+            - Then a replica is added for a deep enough queue, one at a time, up to max_replicas.
+        """
+        pool = ToolReplicaPool(
+            "mock_tool", min_replicas=1, max_replicas=2, scale_up_queue_depth=2
+        )
+
+        assert pool.needs_replica(replica_count=0, queued=1)
+        assert not pool.needs_replica(replica_count=1, queued=1)
+        assert pool.needs_replica(replica_count=1, queued=2)
+
+        pool.starting.add("mock_tool-1")
+        assert not pool.needs_replica(replica_count=1, queued=5)
+
+        pool.starting.clear()
+        assert not pool.needs_replica(replica_count=2, queued=5)
+
+    def test_replica_name(self):
+        pool = ToolReplicaPool("mock_tool")
+        pool.starting.add("mock_tool-1")
+
+        assert pool.replica_name("mock_tool", []) == "mock_tool"
+        assert pool.replica_name("mock_tool", [mock_container("mock_tool")]) == (
+            "mock_tool-2"
+        )
+
+    def test_take_idle_keeps_min_replicas(self):
+        """
+            - Given three idle replicas, one of them serving a request, and min_replicas 1,
+            - When idle replicas are taken,
+            - Then both replicas without requests are drained and not selected anymore.
+        """
+        pool = ToolReplicaPool("mock_tool", min_replicas=1)
+        replicas = [mock_container(f"mock_tool-{index}") for index in range(3)]
+        pool.acquire(replicas[0])
+        for container in replicas:
+            pool.last_used[container.id] = 0
+
+        idle = pool.take_idle(replicas, idle_timeout=10)
+
+        assert idle == replicas[1:]
+        assert pool.select(replicas) is replicas[0]
+        assert pool.take_idle(replicas, idle_timeout=10) == []
@@ -211,6 +211,10 @@ class CodeTaskData(BaseModel):
     entrypoint: str
     func_kwargs: dict | None = None
     global_kwargs: dict[str, Any] | None = None
+    # Channel the result is published to in addition to the shared results channel
+    reply_channel: str | None = None
+    # Tasks are queued fairly between sessions in the sandbox
+    session_id: int | None = None
 
 
 class CrewNodeData(BaseModel):
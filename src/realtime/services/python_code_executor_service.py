@@ -1,3 +1,4 @@
+import os
 import uuid
 import asyncio
 from typing import Any
@@ -9,15 +10,90 @@ from models.request_models import CodeResultData, CodeTaskData, PythonCodeData
 
 
 class PythonCodeExecutorService(metaclass=SingletonMeta):
-    def __init__(self, redis_service: RedisService):
+    """
+    Request/reply client for the sandbox.
+
+    Every task carries a reply channel unique to this process. One shared
+    listener is subscribed to it and resolves the waiting run_code call by
+    execution_id, so callers neither poll nor see results of other processes.
+    """
+
+    def __init__(
+        self,
+        redis_service: RedisService,
+        task_stream: str = "code_exec_tasks",
+        timeout: float | None = None,
+        task_stream_maxlen: int = 10000,
+    ):
         self.redis_service = redis_service
+        # Redis Stream consumed by the sandbox consumer group
+        self.task_stream = task_stream
+        self.task_stream_maxlen = task_stream_maxlen
+        # None waits for the sandbox as long as it takes
+        self.timeout = timeout
+        self.reply_channel = f"code_results:{os.getpid()}:{uuid.uuid4().hex}"
+
+        self._pending: dict[str, asyncio.Future] = {}
+        self._listener_task: asyncio.Task | None = None
+        self._listener_lock = asyncio.Lock()
+
+    async def _ensure_listener(self):
+        """Subscribe to the reply channel once, before the first task is published."""
+        if self._listener_task is not None and not self._listener_task.done():
+            return
+
+        async with self._listener_lock:
+            if self._listener_task is not None and not self._listener_task.done():
+                return
+            pubsub = await self.redis_service.async_subscribe(self.reply_channel)
+            self._listener_task = asyncio.create_task(self._listen(pubsub))
+
+    async def _listen(self, pubsub):
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    code_result_data = CodeResultData.model_validate_json(
+                        message["data"]
+                    )
+                except Exception as e:
+                    logger.error(f"Invalid code result message: {e}")
+                    continue
+
+                future = self._pending.pop(code_result_data.execution_id, None)
+                if future is not None and not future.done():
+                    future.set_result(code_result_data.model_dump())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Code results listener stopped: {e}")
+            # Results published while nobody listens are lost, fail the waiters
+            # instead of letting them hang. The next run_code resubscribes.
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError(f"Code results listener stopped: {e}")
+                    )
+            self._pending.clear()
+        finally:
+            await pubsub.unsubscribe(self.reply_channel)
+            await pubsub.aclose()
 
     async def run_code(
         self,
         python_code_data: PythonCodeData,
         inputs: dict[str, Any],
         additional_global_kwargs: dict[str, Any] | None = None,
-    ) -> dict:
+        timeout: float | None = None,
+        session_id: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Execute code in the sandbox and wait for its result.
+
+        Raises TimeoutError if there is no result within timeout seconds
+        (defaults to the service timeout). Cancelling the caller stops waiting.
+        """
         additional_global_kwargs = additional_global_kwargs or {}
         venv_name = python_code_data.venv_name
         code = python_code_data.code
@@ -38,20 +114,25 @@ class PythonCodeExecutorService(metaclass=SingletonMeta):
                 **global_kwargs,
                 **additional_global_kwargs,
             },
+            reply_channel=self.reply_channel,
+            session_id=session_id,
         )
 
-        pubsub = await self.redis_service.async_subscribe("code_results")
-        await self.redis_service.async_publish(
-            "code_exec_tasks", code_task_data.model_dump()
-        )
-        logger.info("Waiting for code_results")
-
-        while True:
-            message = await pubsub.get_message(
-                ignore_subscribe_messages=True, timeout=1.0
+        await self._ensure_listener()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[unique_task_id] = future
+        try:
+            await self.redis_service.async_xadd(
+                self.task_stream,
+                code_task_data.model_dump(),
+                maxlen=self.task_stream_maxlen,
+            )
+            logger.info(f"Waiting for code result {unique_task_id}")
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"No code result for execution {unique_task_id} "
+                f"within {timeout or self.timeout}s"
             )
-            if message:
-                code_result_data = CodeResultData.model_validate_json(message["data"])
-                if code_result_data.execution_id == unique_task_id:
-                    return code_result_data.model_dump()
-            await asyncio.sleep(0.1)
+        finally:
+            self._pending.pop(unique_task_id, None)
@@ -30,6 +30,19 @@ class RedisService(metaclass=SingletonMeta):
         await self.aioredis_client.publish(channel, json.dumps(message))
         logger.info(f"Message published to channel '{channel}': {message}")
 
+    async def async_xadd(
+        self, stream: str, message: object, maxlen: int | None = None
+    ) -> str:
+        """Add a message to a Redis stream, trimmed to about maxlen entries."""
+        entry_id = await self.aioredis_client.xadd(
+            stream,
+            {"data": json.dumps(message)},
+            maxlen=maxlen,
+            approximate=True,
+        )
+        logger.info(f"Message added to stream '{stream}'.")
+        return entry_id
+
     async def listen_to_channel(self, channel: str, callback):
         """Listen for messages on a Redis channel."""
         pubsub = await self.async_subscribe(channel)
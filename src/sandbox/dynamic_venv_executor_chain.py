@@ -5,12 +5,14 @@ from asyncio.subprocess import Process
 import hashlib
 import json
 import os
+import re
 import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from loguru import logger
 from models import CodeResultData
 from services.redis_service import RedisService
+from interpreter_pool import InterpreterPoolManager, InterpreterStartError
 
 
 class Handler(ABC):
@@ -58,16 +60,18 @@ class CreateVenvHandler(AbstractHandler):
         """Create virtual environment task."""
         venv_path = context.get("venv_path")
 
-        if not venv_path.exists():
-            logger.info(f"Creating virtual environment at {venv_path}...")
-            process = await asyncio.create_subprocess_shell(
-                f"{sys.executable} -m venv {venv_path}",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            await process.communicate()
-        else:
-            logger.info(f"Virtual environment already exists at {venv_path}.")
+        async with context["venv_lock"]:
+            if not venv_path.exists():
+                logger.info(f"Creating virtual environment at {venv_path}...")
+                # Libraries are installed by pip of the sandbox, skip bootstrapping pip
+                process = await asyncio.create_subprocess_shell(
+                    f"{sys.executable} -m venv --without-pip {venv_path}",
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                await process.communicate()
+            else:
+                logger.info(f"Virtual environment already exists at {venv_path}.")
 
         if self._next_handler:
             return await super().handle(context)
@@ -75,6 +79,16 @@ class CreateVenvHandler(AbstractHandler):
 
 
 class InstallLibrariesHandler(AbstractHandler):
+    """
+    Brings venv libraries to the requested set by difference: requirements
+    that are no longer requested are uninstalled and the requested ones are
+    resolved by a single pip invocation. pip of the sandbox is run against
+    the venv interpreter, so venvs need no pip of their own and all of them
+    share one pip cache.
+    """
+
+    def __init__(self, pip_cache_dir: str | Path | None = None):
+        self.pip_cache_dir = pip_cache_dir
 
     def _calculate_hash(self, libraries: List[str]) -> str:
         """Calculate a hash of the libraries list."""
@@ -94,109 +108,107 @@ class InstallLibrariesHandler(AbstractHandler):
         with open(hash_file, "w") as f:
             f.write(lib_hash)
 
-    async def handle(self, context: Dict[str, Any]) -> Any:
-        """Install libraries asynchronously."""
-        python_executable = context["python_executable"]
-        
+    def _load_requirements(self, requirements_file: Path) -> set[str]:
+        """Requirements installed by the previous run, empty for venvs installed before they were saved."""
+        if requirements_file.exists():
+            with open(requirements_file, "r") as f:
+                return set(json.load(f))
+        return set()
+
+    def _save_requirements(self, requirements: set[str], requirements_file: Path):
+        with open(requirements_file, "w") as f:
+            json.dump(sorted(requirements), f)
+
+    @staticmethod
+    def _package_name(requirement: str) -> str | None:
+        """Normalized distribution name of a requirement, None for paths and URLs."""
+        if "/" in requirement or "\\" in requirement or requirement.startswith("."):
+            return None
+        match = re.match(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)", requirement)
+        if match is None:
+            return None
+        return re.sub(r"[-_.]+", "-", match.group(1)).lower()
+
+    async def _pip(self, context: Dict[str, Any], *args: str) -> CodeResultData | None:
+        """Run pip against the venv, returns the result of a failed call."""
+        cache_args = ["--cache-dir", str(self.pip_cache_dir)] if self.pip_cache_dir else []
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "pip",
+            "--python",
+            str(context["python_executable"]),
+            "--disable-pip-version-check",
+            *args,
+            *cache_args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            return CodeResultData(
+                execution_id=context["execution_id"],
+                stderr=stderr.decode("utf-8", errors="replace"),
+                stdout=stdout.decode("utf-8", errors="replace"),
+                returncode=process.returncode,
+            )
+        return None
+
+    async def _install(self, context: Dict[str, Any]) -> CodeResultData | None:
+        """Install libraries if they changed, returns the result of a failed pip call."""
         context["libraries"] = set(context["libraries"])
         # Install libraries
         predefined_libraries = {"/home/user/root/app/shared/dotdict"}
         context["libraries"].update(predefined_libraries)
 
-        lib_hash = self._calculate_hash(list(context["libraries"]))
+        lib_hash = self._calculate_hash(sorted(context["libraries"]))
         hash_changed = self._hash_changed(
             lib_hash=lib_hash, hash_file=context["hash_file"]
         )
 
         if hash_changed:
-            logger.info("Installing libraries...")
-
-            # Upgrade pip
-            process = await asyncio.create_subprocess_shell(
-                f"{python_executable} -m pip install --upgrade pip",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await process.communicate()
-            stderr = stderr.decode("utf-8", errors="replace")
-            stdout = stdout.decode("utf-8", errors="replace")
-            returncode = process.returncode
-
-            if returncode != 0:
-                return CodeResultData(
-                    execution_id=context["execution_id"],
-                    stderr=stderr,
-                    stdout=stdout,
-                    returncode=returncode,
+            requirements_file = context["venv_path"] / "requirements.json"
+            installed = self._load_requirements(requirements_file)
+            requested = context["libraries"]
+
+            # A changed version of a requested package is replaced by the install
+            requested_names = {self._package_name(r) for r in requested}
+            to_uninstall = {
+                name
+                for name in map(self._package_name, installed - requested)
+                if name is not None and name not in requested_names
+            }
+            if to_uninstall:
+                logger.info(f"Uninstalling {', '.join(sorted(to_uninstall))}...")
+                error_result = await self._pip(
+                    context, "uninstall", "-y", *sorted(to_uninstall)
                 )
+                if error_result is not None:
+                    return error_result
 
-            # Uninstall all libraries
-            logger.info("Uninstalling all libraries...")
-            process = await asyncio.create_subprocess_shell(
-                f"{python_executable} -m pip freeze",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await process.communicate()
-            returncode = process.returncode
-
-            stderr = stderr.decode("utf-8", errors="replace")
-            stdout = stdout.decode("utf-8", errors="replace")
-
-            if returncode != 0:
-                return CodeResultData(
-                    execution_id=context["execution_id"],
-                    stderr=stderr,
-                    stdout=stdout,
-                    returncode=returncode,
-                )
-
-            installed_packages = stdout.splitlines()
-
-            for package in installed_packages:
-                package_name = package.split("==")[0]
-                logger.info(f"Uninstalling {package_name}...")
-                await asyncio.create_subprocess_shell(
-                    f"{python_executable} -m pip uninstall -y {package_name}",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                stdout, stderr = await process.communicate()
-                stderr = stderr.decode("utf-8", errors="replace")
-                stdout = stdout.decode("utf-8", errors="replace")
-                if returncode != 0:
-                    return CodeResultData(
-                        execution_id=context["execution_id"],
-                        stderr=stderr,
-                        stdout=stdout,
-                        returncode=returncode,
-                    )
-
-            # Install libraries
-            for library in context["libraries"]:
-                logger.info(f"Installing {library}...")
-                process = await asyncio.create_subprocess_shell(
-                    f"{python_executable} -m pip install {library}",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                stdout, stderr = await process.communicate()
-                stderr = stderr.decode("utf-8", errors="replace")
-                stdout = stdout.decode("utf-8", errors="replace")
-                returncode = process.returncode
-
-                if returncode != 0:
-                    return CodeResultData(
-                        execution_id=context["execution_id"],
-                        stderr=stderr,
-                        stdout=stdout,
-                        returncode=returncode,
-                    )
+            logger.info(f"Installing {', '.join(sorted(requested))}...")
+            error_result = await self._pip(context, "install", *sorted(requested))
+            if error_result is not None:
+                return error_result
 
+            self._save_requirements(requested, requirements_file)
             self._update_hash(lib_hash=lib_hash, hash_file=context["hash_file"])
+            if context.get("interpreter_pools") is not None:
+                # Warm interpreters may have imported the replaced libraries
+                await context["interpreter_pools"].reset(context["venv_name"])
         else:
             logger.info("Libraries are up-to-date. Skipping installation.")
 
+        return None
+
+    async def handle(self, context: Dict[str, Any]) -> Any:
+        """Install libraries asynchronously."""
+        # Tasks of the same venv must not reinstall it concurrently
+        async with context["venv_lock"]:
+            error_result = await self._install(context)
+        if error_result is not None:
+            return error_result
+
         if self._next_handler:
             return await super().handle(context)
         return "Libraries installed."
@@ -209,10 +221,11 @@ class ExecuteCodeHandler(AbstractHandler):
         code: str,
         result_file_path: Path,
         entrypoint: str,
-        func_kwargs: dict[str, Any],
-        global_kwargs: dict[str, Any] | None = None,
     ):
-        global_kwargs = global_kwargs or dict()
+        """
+        Wrap the code into a script that reads func_kwargs and global_kwargs
+        as a JSON payload from stdin, see build_payload.
+        """
         code_lines = code.split("\n")
         code_lines = ["    " + line for line in code_lines]
         code = "\n".join(code_lines)
@@ -221,12 +234,14 @@ import sys
 import json
 from dotdict import DotDict
 try:
-    for k, v in {global_kwargs}.items():
+    __sys_payload = json.load(sys.stdin)
+    for k, v in __sys_payload["global_kwargs"].items():
         globals()[k] = v
     
 {code}
     
-    __sys_dot_kwargs = DotDict({func_kwargs})
+    __sys_dot_kwargs = DotDict(__sys_payload["func_kwargs"])
+    del __sys_payload
     
     sys_result_variable = {entrypoint}(**__sys_dot_kwargs)
     with open(r'{result_file_path.as_posix()}', 'w', encoding='utf-8') as file:
@@ -241,8 +256,51 @@ sys.exit(0)
 
         return wrapped_code
 
+    def build_payload(
+        self,
+        func_kwargs: dict[str, Any],
+        global_kwargs: dict[str, Any] | None = None,
+    ) -> bytes:
+        """Inputs of the wrapped code, passed through stdin instead of the generated source."""
+        return json.dumps(
+            {"func_kwargs": func_kwargs, "global_kwargs": global_kwargs or dict()}
+        ).encode("utf-8")
+
+    async def _execute_warm(self, context: Dict[str, Any]) -> CodeResultData:
+        """Execute the code in a warm interpreter of the venv, the result is returned in-band."""
+        interpreter_pools: InterpreterPoolManager = context["interpreter_pools"]
+        pool = await interpreter_pools.get(
+            context["venv_name"], context["python_executable"]
+        )
+        logger.info(f"Executing code in warm interpreter of {context['venv_name']}...")
+        response = await pool.execute(
+            {
+                "code": context["code"],
+                "entrypoint": context["entrypoint"],
+                "func_kwargs": context["func_kwargs"],
+                "global_kwargs": context["global_kwargs"],
+            }
+        )
+        if response["stderr"]:
+            logger.info(f"Error: {response['stderr']}")
+
+        return CodeResultData(
+            execution_id=context["execution_id"],
+            result_data=response["result_data"],
+            stderr=response["stderr"],
+            stdout=response["stdout"],
+            returncode=response["returncode"],
+        )
+
     async def handle(self, context: Dict[str, Any]) -> Any:
         """Execute the provided code asynchronously."""
+        if context.get("interpreter_pools") is not None:
+            try:
+                return await self._execute_warm(context)
+            except (OSError, InterpreterStartError) as e:
+                # e.g. dotdict is missing in the venv, run the code in a new process
+                logger.warning(f"Warm interpreter failed to start, falling back: {e}")
+
         python_executable = context["python_executable"]
 
         temp_code_path = context["temp_code_path"]
@@ -251,6 +309,8 @@ sys.exit(0)
             code=context["code"],
             result_file_path=context["result_file_path"],
             entrypoint=context["entrypoint"],
+        )
+        payload = self.build_payload(
             func_kwargs=context["func_kwargs"],
             global_kwargs=context["global_kwargs"],
         )
@@ -263,10 +323,11 @@ sys.exit(0)
         logger.info(f"Executing code using {python_executable}...")
         process = await asyncio.create_subprocess_shell(
             f"{python_executable} {temp_code_path}",
+            stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
         )
-        stdout, stderr = await process.communicate()
+        stdout, stderr = await process.communicate(input=payload)
         stderr = stderr.decode("utf-8", errors="replace")
         stdout = stdout.decode("utf-8", errors="replace")
         returncode = process.returncode
@@ -304,13 +365,19 @@ class DynamicVenvExecutorChain:
         self,
         output_path: str | Path,
         base_venv_path: str | Path,
+        interpreter_pools: InterpreterPoolManager | None = None,
+        pip_cache_dir: str | Path | None = None,
     ):
         self.output_path = output_path
         self.base_venv_path = base_venv_path
+        # Without interpreter pools every execution starts a new python process
+        self.interpreter_pools = interpreter_pools
+        # Serializes creating and installing libraries of the same venv
+        self._venv_locks: dict[str, asyncio.Lock] = {}
 
         # Build the chain of responsibility
         create_venv_handler = CreateVenvHandler()
-        install_libraries_handler = InstallLibrariesHandler()
+        install_libraries_handler = InstallLibrariesHandler(pip_cache_dir=pip_cache_dir)
         execute_code_handler = ExecuteCodeHandler()
 
         self.chain: Handler = DummyHandler()
@@ -340,6 +407,7 @@ class DynamicVenvExecutorChain:
 
         context = {
             "venv_path": venv_path,
+            "venv_name": venv_name,
             "libraries": libraries,
             "python_executable": (
                 venv_path / Path(f"bin/python")
@@ -354,6 +422,8 @@ class DynamicVenvExecutorChain:
             "func_kwargs": func_kwargs,
             "execution_id": execution_id,
             "global_kwargs": global_kwargs,
+            "venv_lock": self._venv_locks.setdefault(venv_name, asyncio.Lock()),
+            "interpreter_pools": self.interpreter_pools,
         }
 
         result = await self.chain.handle(context)
@@ -0,0 +1,215 @@
+from __future__ import annotations
+import asyncio
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+from loguru import logger
+
+WORKER_SCRIPT = Path(__file__).resolve().parent / "interpreter_worker.py"
+# Results are returned in-band as one JSON line
+RESPONSE_LIMIT = 256 * 1024 * 1024
+
+
+class InterpreterStartError(RuntimeError):
+    pass
+
+
+class InterpreterWorker:
+    """A warm interpreter process of a venv, runs one request at a time."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.runs = 0
+        self.max_rss = 0
+        self.killed = False
+
+    @classmethod
+    async def start(
+        cls, python_executable: str | Path, start_timeout: float = 30
+    ) -> InterpreterWorker:
+        process = await asyncio.create_subprocess_exec(
+            str(python_executable),
+            "-u",
+            str(WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=RESPONSE_LIMIT,
+        )
+        worker = cls(process)
+        try:
+            ready = await asyncio.wait_for(process.stdout.readline(), start_timeout)
+        except BaseException:
+            worker.kill()
+            raise
+        if not ready:
+            raise InterpreterStartError(
+                f"Interpreter {python_executable} exited with code "
+                f"{await process.wait()} before it was ready"
+            )
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        return not self.killed and self.process.returncode is None
+
+    async def execute(self, request: dict[str, Any]) -> dict[str, Any]:
+        self.process.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+        line = await self.process.stdout.readline()
+        if not line:
+            # Same as a crashed script, e.g. os._exit or a segfault in the code
+            returncode = await self.process.wait()
+            return {
+                "returncode": returncode,
+                "result_data": None,
+                "stdout": "",
+                "stderr": f"Interpreter exited with code {returncode}",
+            }
+
+        self.runs += 1
+        response = json.loads(line)
+        self.max_rss = response.pop("max_rss", 0)
+        return response
+
+    def kill(self):
+        if self.alive:
+            self.process.kill()
+        self.killed = True
+
+
+class InterpreterPool:
+    """
+    Warm interpreters of one venv.
+
+    Workers are started on demand up to max_size and reused between
+    executions. A worker is replaced after max_runs executions or when its
+    peak memory exceeds max_rss_mb, and killed when an execution times out
+    or is cancelled, so state left by one execution has a bounded lifetime.
+    """
+
+    def __init__(
+        self,
+        python_executable: str | Path,
+        max_size: int = 4,
+        max_runs: int = 100,
+        max_rss_mb: int = 512,
+        execution_timeout: float | None = None,
+    ):
+        self.python_executable = python_executable
+        self.max_size = max_size
+        self.max_runs = max_runs
+        self.max_rss_mb = max_rss_mb
+        self.execution_timeout = execution_timeout
+
+        self._idle: list[InterpreterWorker] = []
+        self._size = 0
+        self._closed = False
+        self._available = asyncio.Condition()
+
+    async def _acquire(self) -> InterpreterWorker:
+        async with self._available:
+            await self._available.wait_for(
+                lambda: self._idle or self._size < self.max_size
+            )
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+
+        try:
+            return await InterpreterWorker.start(self.python_executable)
+        except BaseException:
+            async with self._available:
+                self._size -= 1
+                self._available.notify()
+            raise
+
+    async def _release(self, worker: InterpreterWorker):
+        recycle = (
+            self._closed
+            or not worker.alive
+            or worker.runs >= self.max_runs
+            or worker.max_rss > self.max_rss_mb * 1024
+        )
+        if recycle:
+            worker.kill()
+        async with self._available:
+            if recycle:
+                self._size -= 1
+            else:
+                self._idle.append(worker)
+            self._available.notify()
+
+    async def execute(self, request: dict[str, Any]) -> dict[str, Any]:
+        worker = await self._acquire()
+        try:
+            return await asyncio.wait_for(
+                worker.execute(request), self.execution_timeout
+            )
+        except asyncio.TimeoutError:
+            worker.kill()
+            return {
+                "returncode": -9,
+                "result_data": None,
+                "stdout": "",
+                "stderr": f"Execution timed out after {self.execution_timeout}s",
+            }
+        except BaseException:
+            # The worker may be in the middle of a request, never reuse it
+            worker.kill()
+            raise
+        finally:
+            await self._release(worker)
+
+    async def close(self):
+        """Kill idle workers, busy workers are killed when released."""
+        async with self._available:
+            self._closed = True
+            for worker in self._idle:
+                worker.kill()
+            self._size -= len(self._idle)
+            self._idle.clear()
+
+
+class InterpreterPoolManager:
+    """Interpreter pools by venv, least recently used pools are closed above max_pools."""
+
+    def __init__(
+        self,
+        max_pools: int = 16,
+        max_size: int = 4,
+        max_runs: int = 100,
+        max_rss_mb: int = 512,
+        execution_timeout: float | None = None,
+    ):
+        self.max_pools = max_pools
+        self.pool_kwargs = dict(
+            max_size=max_size,
+            max_runs=max_runs,
+            max_rss_mb=max_rss_mb,
+            execution_timeout=execution_timeout,
+        )
+        self._pools: OrderedDict[str, InterpreterPool] = OrderedDict()
+
+    async def get(self, venv_name: str, python_executable: str | Path) -> InterpreterPool:
+        pool = self._pools.get(venv_name)
+        if pool is None:
+            pool = InterpreterPool(python_executable, **self.pool_kwargs)
+            self._pools[venv_name] = pool
+            while len(self._pools) > self.max_pools:
+                _, evicted = self._pools.popitem(last=False)
+                await evicted.close()
+        self._pools.move_to_end(venv_name)
+        return pool
+
+    async def reset(self, venv_name: str):
+        """Drop warm workers of a venv, e.g. after its libraries changed."""
+        pool = self._pools.pop(venv_name, None)
+        if pool is not None:
+            logger.info(f"Resetting interpreter pool of {venv_name}")
+            await pool.close()
+
+    async def close(self):
+        for pool in self._pools.values():
+            await pool.close()
+        self._pools.clear()
@@ -0,0 +1,97 @@
+"""
+Warm interpreter of the sandbox interpreter pool.
+
+Started with the python of a venv, so it may only use the standard library
+and dotdict. Reads one JSON request per line from stdin, runs the code the
+same way ExecuteCodeHandler.wrap_code does and writes one JSON response per
+line. Output of the code, including output of subprocesses and C extensions,
+is captured at file descriptor level, so it can not corrupt the responses.
+"""
+
+import json
+import os
+import resource
+import sys
+import tempfile
+
+from dotdict import DotDict
+
+
+def _read_capture(capture) -> str:
+    capture.seek(0)
+    text = capture.read().decode("utf-8", errors="replace")
+    capture.seek(0)
+    capture.truncate()
+    return text
+
+
+def _run_code(request: dict) -> tuple[int, str | None]:
+    namespace = {"__name__": "__main__", "__builtins__": __builtins__}
+    try:
+        namespace.update(request.get("global_kwargs") or {})
+        exec(compile(request["code"], "<code>", "exec"), namespace)
+
+        sys_dot_kwargs = DotDict(request.get("func_kwargs") or {})
+        sys_result_variable = namespace[request["entrypoint"]](**sys_dot_kwargs)
+        if isinstance(sys_result_variable, DotDict):
+            sys_result_variable = sys_result_variable.model_dump()
+        return 0, json.dumps(sys_result_variable)
+    except SystemExit as e:
+        # Same as exiting the script before the result file is written
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0, None
+        print(e.code, file=sys.stderr)
+        return 1, None
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        return 1, None
+
+
+def main():
+    # Requests and responses use private copies of the standard streams,
+    # code gets /dev/null as stdin and capture files as stdout and stderr
+    requests = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    responses = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+
+    saved_stdout = os.dup(1)
+    saved_stderr = os.dup(2)
+    stdout_capture = tempfile.TemporaryFile()
+    stderr_capture = tempfile.TemporaryFile()
+    cwd = os.getcwd()
+
+    responses.write(json.dumps({"ready": True}) + "\n")
+    responses.flush()
+
+    for line in requests:
+        request = json.loads(line)
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(stdout_capture.fileno(), 1)
+        os.dup2(stderr_capture.fileno(), 2)
+        try:
+            returncode, result_data = _run_code(request)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_stdout, 1)
+            os.dup2(saved_stderr, 2)
+            os.chdir(cwd)
+
+        response = {
+            "returncode": returncode,
+            "result_data": result_data,
+            "stdout": _read_capture(stdout_capture),
+            "stderr": _read_capture(stderr_capture),
+            # Kilobytes on Linux, used to recycle workers that grew too much
+            "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+        responses.write(json.dumps(response) + "\n")
+        responses.flush()
+
+
+if __name__ == "__main__":
+    main()
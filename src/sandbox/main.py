@@ -1,18 +1,42 @@
 import asyncio
-import json
 import os
+import socket
 from pathlib import Path
-from loguru import logger
-from models import CodeTaskData
 from services.redis_service import RedisService
 from dynamic_venv_executor_chain import DynamicVenvExecutorChain
+from interpreter_pool import InterpreterPoolManager
+from scheduler import CodeTaskScheduler
 
 redis_host = os.environ.get("REDIS_HOST", "127.0.0.1")
 redis_port = int(os.environ.get("REDIS_PORT", "6379"))
 code_result_channel = os.environ.get("CODE_RESULT_CHANNEL", "code_results")
+# Redis Stream the code tasks are added to
 task_channel = os.environ.get("CODE_EXEC_TASK_CHANNEL", "code_exec_tasks")
 output_path = Path(os.environ.get("OUTPUT_PATH", "executions"))
 base_venv_path = Path(os.environ.get("BASE_VENV_PATH", "venvs"))
+# pip cache shared by all venvs, keep it on a volume to reuse wheels between restarts
+pip_cache_dir = os.environ.get("SANDBOX_PIP_CACHE_DIR")
+
+# All sandbox replicas share the consumer group, the consumer name must be unique
+consumer_group = os.environ.get("SANDBOX_CONSUMER_GROUP", "sandbox")
+consumer_name = os.environ.get(
+    "SANDBOX_CONSUMER_NAME", f"{socket.gethostname()}-{os.getpid()}"
+)
+workers = int(os.environ.get("SANDBOX_WORKERS", "4"))
+max_queue_size = int(os.environ.get("SANDBOX_MAX_QUEUE_SIZE", str(workers)))
+claim_idle_ms = int(os.environ.get("SANDBOX_CLAIM_IDLE_MS", "600000"))
+metrics_interval = float(os.environ.get("SANDBOX_METRICS_INTERVAL", "30"))
+
+# Warm interpreters per venv, recycled after max runs or above the memory limit
+warm_interpreters = os.environ.get("SANDBOX_WARM_INTERPRETERS", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+interpreter_pools = int(os.environ.get("SANDBOX_INTERPRETER_POOLS", "16"))
+interpreter_max_runs = int(os.environ.get("SANDBOX_INTERPRETER_MAX_RUNS", "100"))
+interpreter_max_rss_mb = int(os.environ.get("SANDBOX_INTERPRETER_MAX_RSS_MB", "512"))
+execution_timeout = os.environ.get("SANDBOX_EXECUTION_TIMEOUT")
 
 os.chdir("savefiles")
 
@@ -22,39 +46,40 @@ async def main():
 
     await redis_service.connect()
 
+    interpreter_pool_manager = None
+    if warm_interpreters:
+        interpreter_pool_manager = InterpreterPoolManager(
+            max_pools=interpreter_pools,
+            max_size=workers,
+            max_runs=interpreter_max_runs,
+            max_rss_mb=interpreter_max_rss_mb,
+            execution_timeout=float(execution_timeout) if execution_timeout else None,
+        )
+
     executor_chain = DynamicVenvExecutorChain(
         output_path=output_path,
         base_venv_path=base_venv_path,
+        interpreter_pools=interpreter_pool_manager,
+        pip_cache_dir=pip_cache_dir,
     )
 
-    logger.info(f"Subscribed to channel '{task_channel}' for code execution tasks.")
-
-    pubsub = await redis_service.async_subscribe(task_channel)
-
-    async for message in pubsub.listen():
-        if message["type"] == "message":
-            try:
-                logger.info(f"Received message: {message['data']}")
-
-                data = json.loads(message["data"])
-                code_task_data = CodeTaskData(**data)
-
-                # Run the dynamic virtual environment execution chain
-                result = await executor_chain.run(
-                    venv_name=code_task_data.venv_name,
-                    libraries=code_task_data.libraries,
-                    code=code_task_data.code,
-                    execution_id=code_task_data.execution_id,
-                    entrypoint=code_task_data.entrypoint,
-                    func_kwargs=code_task_data.func_kwargs,
-                    global_kwargs=code_task_data.global_kwargs,
-                )
-                await redis_service.async_publish(
-                    channel=code_result_channel, message=result.model_dump()
-                )
-
-            except Exception as e:
-                logger.error(f"Error processing message: {e}")
+    scheduler = CodeTaskScheduler(
+        executor_chain=executor_chain,
+        redis_service=redis_service,
+        task_stream=task_channel,
+        result_channel=code_result_channel,
+        consumer_group=consumer_group,
+        consumer_name=consumer_name,
+        workers=workers,
+        max_queue_size=max_queue_size,
+        claim_idle_ms=claim_idle_ms,
+        metrics_interval=metrics_interval,
+    )
+    try:
+        await scheduler.run()
+    finally:
+        if interpreter_pool_manager is not None:
+            await interpreter_pool_manager.close()
 
 
 if __name__ == "__main__":
@@ -16,4 +16,8 @@ class CodeTaskData(BaseModel):
     execution_id: str
     entrypoint: str
     func_kwargs: dict | None = None
-    global_kwargs: dict[str, Any] | None = None
\ No newline at end of file
+    global_kwargs: dict[str, Any] | None = None
+    # Channel the result is published to in addition to the shared results channel
+    reply_channel: str | None = None
+    # Tasks are queued fairly between sessions in the sandbox
+    session_id: int | None = None
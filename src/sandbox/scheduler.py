@@ -0,0 +1,331 @@
+import asyncio
+import json
+import time
+from collections import deque
+from loguru import logger
+from models import CodeResultData, CodeTaskData
+from services.redis_service import RedisService
+from dynamic_venv_executor_chain import DynamicVenvExecutorChain
+
+
+class FairQueue:
+    """
+    Queue with a FIFO per key, served round-robin between keys,
+    so one session flooding the sandbox does not starve the others.
+    """
+
+    def __init__(self):
+        self._queues: dict[str, deque] = {}
+        self._keys: deque[str] = deque()
+        self._size = 0
+        self._not_empty = asyncio.Condition()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def depth_by_key(self) -> dict[str, int]:
+        return {key: len(queue) for key, queue in self._queues.items()}
+
+    async def put(self, key: str, item):
+        async with self._not_empty:
+            if key not in self._queues:
+                self._queues[key] = deque()
+                self._keys.append(key)
+            self._queues[key].append(item)
+            self._size += 1
+            self._not_empty.notify()
+
+    async def get(self):
+        async with self._not_empty:
+            await self._not_empty.wait_for(lambda: self._size > 0)
+            key = self._keys.popleft()
+            queue = self._queues[key]
+            item = queue.popleft()
+            self._size -= 1
+            if queue:
+                self._keys.append(key)
+            else:
+                del self._queues[key]
+            return item
+
+
+class CodeTaskScheduler:
+    """
+    Reads code tasks from a Redis Stream consumer group and executes them
+    on a bounded pool of workers.
+
+    Every sandbox replica is a consumer of the same group, so tasks are
+    distributed between replicas and each task is delivered to one of them.
+    A replica reads new tasks only while it has free capacity, tasks are
+    acknowledged after their result is published, and tasks left pending by
+    a dead replica are claimed after claim_idle_ms. The idle time of the
+    tasks a replica has queued or running is reset every third of
+    claim_idle_ms, so long running tasks are not claimed and run twice.
+    """
+
+    def __init__(
+        self,
+        executor_chain: DynamicVenvExecutorChain,
+        redis_service: RedisService,
+        task_stream: str,
+        result_channel: str,
+        consumer_group: str,
+        consumer_name: str,
+        workers: int = 4,
+        max_queue_size: int | None = None,
+        claim_idle_ms: int = 600_000,
+        metrics_interval: float = 30,
+    ):
+        self.executor_chain = executor_chain
+        self.redis_service = redis_service
+        self.task_stream = task_stream
+        self.result_channel = result_channel
+        self.consumer_group = consumer_group
+        self.consumer_name = consumer_name
+        self.workers = workers
+        # Tasks read ahead of free workers, kept small so other replicas get the rest
+        self.max_queue_size = max_queue_size or workers
+        self.claim_idle_ms = claim_idle_ms
+        self.metrics_interval = metrics_interval
+
+        self.queue = FairQueue()
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        # Tasks queued or running, at most workers + max_queue_size
+        self.capacity = self.workers + self.max_queue_size
+        self._reserved = 0
+        self._capacity_freed = asyncio.Condition()
+        # Ids of the entries queued or running on this consumer
+        self._owned: set[str] = set()
+        self._tasks: list[asyncio.Task] = []
+
+    @staticmethod
+    def _fairness_key(code_task_data: CodeTaskData) -> str:
+        if code_task_data.session_id is not None:
+            return f"session:{code_task_data.session_id}"
+        if code_task_data.reply_channel:
+            return f"reply:{code_task_data.reply_channel}"
+        return f"venv:{code_task_data.venv_name}"
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self.queue),
+            "running": self.running,
+            "workers": self.workers,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queued_by_key": self.queue.depth_by_key(),
+        }
+
+    async def run(self):
+        await self.redis_service.ensure_consumer_group(
+            self.task_stream, self.consumer_group
+        )
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._report_metrics()))
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+        logger.info(
+            f"Consuming '{self.task_stream}' as '{self.consumer_name}' "
+            f"in group '{self.consumer_group}' with {self.workers} workers."
+        )
+        try:
+            await self._consume()
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _consume(self):
+        # Entries delivered to this consumer before a restart come first
+        last_id = "0"
+        while last_id := await self._read(stream_id=last_id):
+            pass
+        await self._claim_stale()
+        last_claim = time.monotonic()
+
+        while True:
+            if await self._read(stream_id=">") is None:
+                # An empty read may return without waiting, let the workers run
+                await asyncio.sleep(0)
+            if time.monotonic() - last_claim > self.claim_idle_ms / 1000:
+                await self._claim_stale()
+                last_claim = time.monotonic()
+
+    async def _read(self, stream_id: str) -> str | None:
+        """
+        Read entries after stream_id, ">" reads entries never delivered to the group.
+        Returns the id of the last entry read.
+        """
+        # Wait for free capacity before taking entries from the group
+        async with self._capacity_freed:
+            await self._capacity_freed.wait_for(
+                lambda: self._reserved < self.capacity
+            )
+            count = self.capacity - self._reserved
+
+        entries = await self.redis_service.read_group(
+            self.task_stream,
+            self.consumer_group,
+            self.consumer_name,
+            stream_id=stream_id,
+            count=max(count, 1),
+            block_ms=5000 if stream_id == ">" else None,
+        )
+        for entry_id, fields in entries:
+            await self._enqueue(entry_id, fields)
+        return entries[-1][0] if entries else None
+
+    @staticmethod
+    def _stream_id_key(entry_id: str) -> tuple[int, int]:
+        milliseconds, _, sequence = entry_id.partition("-")
+        return int(milliseconds), int(sequence or 0)
+
+    async def _claim_stale(self):
+        start_id = "0-0"
+        claimed = 0
+        while True:
+            cursor, entries = await self.redis_service.autoclaim(
+                self.task_stream,
+                self.consumer_group,
+                self.consumer_name,
+                min_idle_ms=self.claim_idle_ms,
+                count=self.max_queue_size,
+                start_id=start_id,
+            )
+            claimed += len(entries)
+            for entry_id, fields in entries:
+                await self._enqueue(entry_id, fields)
+
+            if cursor == "0-0":
+                break
+            if entries:
+                # The next pass starts after the claimed entries even if the
+                # server returns the last claimed id as the cursor
+                milliseconds, sequence = self._stream_id_key(entries[-1][0])
+                cursor = max(
+                    cursor, f"{milliseconds}-{sequence + 1}", key=self._stream_id_key
+                )
+            if self._stream_id_key(cursor) <= self._stream_id_key(start_id):
+                break
+            start_id = cursor
+        if claimed:
+            logger.warning(f"Claimed {claimed} stale code tasks.")
+
+    async def _enqueue(self, entry_id: str, fields: dict | None):
+        # Fields are None for pending entries that were deleted from the stream
+        try:
+            code_task_data = CodeTaskData(**json.loads(fields["data"]))
+        except Exception as e:
+            logger.error(f"Invalid code task {entry_id}: {e}")
+            await self._ack(entry_id)
+            return
+        if entry_id in self._owned:
+            # Claimed again while it is still queued or running here
+            return
+
+        self._owned.add(entry_id)
+        async with self._capacity_freed:
+            await self._capacity_freed.wait_for(
+                lambda: self._reserved < self.capacity
+            )
+            self._reserved += 1
+        await self.queue.put(
+            self._fairness_key(code_task_data), (entry_id, code_task_data)
+        )
+
+    async def _worker(self, worker_id: int):
+        while True:
+            entry_id, code_task_data = await self.queue.get()
+            self.running += 1
+            try:
+                await self._execute(code_task_data)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(
+                    f"Worker {worker_id} failed on {code_task_data.execution_id}: {e}"
+                )
+                await self._publish_result(
+                    code_task_data,
+                    CodeResultData(
+                        execution_id=code_task_data.execution_id,
+                        stderr=str(e),
+                        stdout="",
+                        returncode=1,
+                    ),
+                )
+            finally:
+                self.running -= 1
+                async with self._capacity_freed:
+                    self._reserved -= 1
+                    self._capacity_freed.notify_all()
+                await self._ack(entry_id)
+                self._owned.discard(entry_id)
+
+    async def _ack(self, entry_id: str):
+        try:
+            await self.redis_service.ack(
+                self.task_stream, self.consumer_group, entry_id
+            )
+        except Exception as e:
+            # Unacknowledged entries are claimed and executed again after claim_idle_ms
+            logger.error(f"Failed to acknowledge code task {entry_id}: {e}")
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.claim_idle_ms / 3000)
+            if not self._owned:
+                continue
+            try:
+                await self.redis_service.touch(
+                    self.task_stream,
+                    self.consumer_group,
+                    self.consumer_name,
+                    list(self._owned),
+                )
+            except Exception as e:
+                logger.error(f"Failed to refresh the idle time of code tasks: {e}")
+
+    async def _execute(self, code_task_data: CodeTaskData):
+        logger.info(f"Executing code task {code_task_data.execution_id}")
+        result: CodeResultData = await self.executor_chain.run(
+            venv_name=code_task_data.venv_name,
+            libraries=code_task_data.libraries,
+            code=code_task_data.code,
+            execution_id=code_task_data.execution_id,
+            entrypoint=code_task_data.entrypoint,
+            func_kwargs=code_task_data.func_kwargs,
+            global_kwargs=code_task_data.global_kwargs,
+        )
+        await self._publish_result(code_task_data, result)
+
+    async def _publish_result(
+        self, code_task_data: CodeTaskData, result: CodeResultData
+    ):
+        try:
+            if code_task_data.reply_channel:
+                await self.redis_service.async_publish(
+                    channel=code_task_data.reply_channel, message=result.model_dump()
+                )
+            await self.redis_service.async_publish(
+                channel=self.result_channel, message=result.model_dump()
+            )
+        except Exception as e:
+            logger.error(f"Failed to publish result {result.execution_id}: {e}")
+
+    async def _report_metrics(self):
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            stats = self.stats()
+            logger.info(f"Sandbox scheduler stats: {stats}")
+            try:
+                await self.redis_service.set_metrics(
+                    f"sandbox:metrics:{self.consumer_name}",
+                    stats,
+                    ttl=int(self.metrics_interval * 3),
+                )
+            except Exception as e:
+                logger.error(f"Failed to publish scheduler metrics: {e}")
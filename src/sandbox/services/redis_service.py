@@ -2,6 +2,7 @@ import json
 import redis.asyncio as aioredis
 from loguru import logger
 from redis.client import PubSub
+from redis.exceptions import ResponseError
 
 
 class RedisService:
@@ -23,3 +24,71 @@ class RedisService:
     async def async_publish(self, channel: str, message: object):
         await self.aioredis_client.publish(channel, json.dumps(message))
         logger.info(f"Message published to channel '{channel}'.")
+
+    async def ensure_consumer_group(self, stream: str, group: str):
+        """Create the consumer group (and the stream) if it does not exist."""
+        try:
+            await self.aioredis_client.xgroup_create(
+                stream, group, id="0", mkstream=True
+            )
+            logger.info(f"Created consumer group '{group}' for stream '{stream}'.")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read_group(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        stream_id: str = ">",
+        count: int = 1,
+        block_ms: int | None = None,
+    ) -> list[tuple[str, dict | None]]:
+        response = await self.aioredis_client.xreadgroup(
+            group, consumer, {stream: stream_id}, count=count, block=block_ms
+        )
+        if not response:
+            return []
+        _, entries = response[0]
+        return entries
+
+    async def autoclaim(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        min_idle_ms: int,
+        count: int,
+        start_id: str = "0-0",
+    ) -> tuple[str, list[tuple[str, dict | None]]]:
+        """
+        Claim entries idle for min_idle_ms, scanning from start_id.
+        Returns the id to continue the scan from, "0-0" once it is complete.
+        """
+        response = await self.aioredis_client.xautoclaim(
+            stream,
+            group,
+            consumer,
+            min_idle_time=min_idle_ms,
+            start_id=start_id,
+            count=count,
+        )
+        return response[0], response[1]
+
+    async def touch(self, stream: str, group: str, consumer: str, entry_ids: list[str]):
+        """Reset the idle time of pending entries, so other consumers do not claim them."""
+        await self.aioredis_client.xclaim(
+            stream,
+            group,
+            consumer,
+            min_idle_time=0,
+            message_ids=entry_ids,
+            justid=True,
+        )
+
+    async def ack(self, stream: str, group: str, entry_id: str):
+        await self.aioredis_client.xack(stream, group, entry_id)
+
+    async def set_metrics(self, key: str, metrics: dict, ttl: int):
+        await self.aioredis_client.set(key, json.dumps(metrics), ex=ttl)
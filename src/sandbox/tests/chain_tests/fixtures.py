@@ -5,12 +5,14 @@ import shutil
 import uuid
 import dotenv
 import pytest
+import pytest_asyncio
 import fakeredis
 from typing import Any, Generator
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import redis.asyncio as aioredis
 
-from dynamic_venv_executor_chain import DynamicVenvExecutorChain
+from dynamic_venv_executor_chain import DynamicVenvExecutorChain, InstallLibrariesHandler
+from interpreter_pool import InterpreterPoolManager
 
 @pytest.fixture
 def output_path() -> Path:
@@ -28,6 +30,17 @@ def executor_chain(output_path, base_venv_path) -> Generator[Any, Any, DynamicVe
     )
 
 
+@pytest_asyncio.fixture
+async def warm_executor_chain(output_path, base_venv_path):
+    interpreter_pools = InterpreterPoolManager(max_size=1, max_runs=2)
+    yield DynamicVenvExecutorChain(
+        output_path=output_path,
+        base_venv_path=base_venv_path,
+        interpreter_pools=interpreter_pools,
+    )
+    await interpreter_pools.close()
+
+
 @pytest.fixture
 def get_formatted_time_with_short_uuid() -> str:
 
@@ -48,4 +61,29 @@ def set_env_rapidapi_key() -> str:
 def clear_venvs_and_executions(output_path: Path, base_venv_path: Path):
     yield
     shutil.rmtree(output_path)
-    shutil.rmtree(base_venv_path)
\ No newline at end of file
+    shutil.rmtree(base_venv_path)
+
+@pytest.fixture
+def install_libraries_handler() -> InstallLibrariesHandler:
+    """InstallLibrariesHandler with a mocked pip, every pip call succeeds."""
+    handler = InstallLibrariesHandler()
+    handler._pip = AsyncMock(return_value=None)
+    return handler
+
+
+@pytest.fixture
+def install_context(tmp_path: Path) -> dict[str, Any]:
+    """Context of InstallLibrariesHandler for an existing venv without libraries."""
+    venv_path = tmp_path / "venv"
+    venv_path.mkdir()
+    interpreter_pools = MagicMock()
+    interpreter_pools.reset = AsyncMock()
+    return {
+        "venv_path": venv_path,
+        "venv_name": "venv",
+        "libraries": [],
+        "python_executable": venv_path / "bin/python",
+        "hash_file": venv_path / "libhash",
+        "execution_id": "execution",
+        "interpreter_pools": interpreter_pools,
+    }
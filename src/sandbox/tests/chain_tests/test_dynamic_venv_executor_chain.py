@@ -223,3 +223,92 @@ def main(var1, var2):
     assert code_result_data.returncode == 1
     assert code_result_data.result_data is None
     assert code_result_data.stderr != ""
+
+
+@pytest.mark.asyncio
+async def test_run_executor_warm_interpreter(
+    warm_executor_chain: DynamicVenvExecutorChain,
+    get_formatted_time_with_short_uuid: str,
+    clear_venvs_and_executions,
+):
+
+    test_code = """
+import os
+
+def main(var1, var2):
+    print("stdout")
+    return {"sum": var1 + var2 + offset, "pid": os.getpid()}
+"""
+    pids = []
+    # Pool of one worker recycled after two runs
+    for i in range(3):
+        code_result_data = await warm_executor_chain.run(
+            venv_name="test_run_executor_warm_interpreter_venv",
+            libraries=[],
+            code=test_code,
+            execution_id=f"{get_formatted_time_with_short_uuid}-{i}",
+            entrypoint="main",
+            func_kwargs={"var1": 1, "var2": i},
+            global_kwargs={"offset": 10},
+        )
+
+        assert code_result_data.returncode == 0
+        assert code_result_data.stdout == "stdout\n"
+        result = json.loads(code_result_data.result_data)
+        assert result["sum"] == 11 + i
+        pids.append(result["pid"])
+
+    assert pids[0] == pids[1]
+    assert pids[1] != pids[2]
+
+
+@pytest.mark.asyncio
+async def test_run_executor_kwargs_round_trip(
+    executor_chain: DynamicVenvExecutorChain,
+    warm_executor_chain: DynamicVenvExecutorChain,
+    get_formatted_time_with_short_uuid: str,
+    clear_venvs_and_executions,
+):
+    """
+        - Given func_kwargs and global_kwargs with quotes, newlines, backslashes,
+          nested dicts and lists and unicode,
+        - When the entrypoint returns them in a subprocess and in a warm interpreter,
+        - Then it received exactly the values that were passed.
+    """
+    test_code = """
+import json
+
+def main(text, nested, elements):
+    return json.loads(json.dumps({
+        "text": text,
+        "nested": nested,
+        "elements": elements,
+        "globals": {"prefix": prefix, "config": config},
+    }, default=lambda value: value.model_dump()))
+"""
+    func_kwargs = {
+        "text": "It's a \"quoted\"\nmulti-line \\ string with ''' and \"\"\" inside",
+        "nested": {"path": "C:\\temp\\new", "unicode": "Привіт, 世界 🚀", "empty": {}},
+        "elements": [1, 2.5, None, True, ["\t", "\\n"], {"key": "}{"}],
+    }
+    global_kwargs = {
+        "prefix": "'); import os; print('",
+        "config": {"list": ["a\nb", "é"], "flag": False},
+    }
+
+    for i, chain in enumerate((executor_chain, warm_executor_chain)):
+        code_result_data = await chain.run(
+            venv_name="test_run_executor_kwargs_round_trip_venv",
+            libraries=[],
+            code=test_code,
+            execution_id=f"{get_formatted_time_with_short_uuid}-{i}",
+            entrypoint="main",
+            func_kwargs=func_kwargs,
+            global_kwargs=global_kwargs,
+        )
+
+        assert code_result_data.returncode == 0, code_result_data.stderr
+        assert json.loads(code_result_data.result_data) == {
+            **func_kwargs,
+            "globals": global_kwargs,
+        }
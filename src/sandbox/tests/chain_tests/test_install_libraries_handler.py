@@ -0,0 +1,123 @@
+import json
+from unittest.mock import call
+import pytest
+from dynamic_venv_executor_chain import InstallLibrariesHandler
+from models import CodeResultData
+from fixtures import *
+
+DOTDICT = "/home/user/root/app/shared/dotdict"
+
+
+def save_requirements(install_context: dict, requirements: list[str]):
+    with open(install_context["venv_path"] / "requirements.json", "w") as f:
+        json.dump(requirements, f)
+
+
+def load_requirements(install_context: dict) -> list[str]:
+    with open(install_context["venv_path"] / "requirements.json") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize(
+    "requirement, package_name",
+    [
+        ("requests", "requests"),
+        ("Python_Dotenv==1.0.1", "python-dotenv"),
+        ("zope.interface>=6", "zope-interface"),
+        ("pydantic[email]", "pydantic"),
+        (DOTDICT, None),
+        ("./local_package", None),
+        ("git+https://github.com/org/package.git", None),
+        ("==1.0", None),
+    ],
+)
+def test_package_name(requirement, package_name):
+    assert InstallLibrariesHandler._package_name(requirement) == package_name
+
+
+@pytest.mark.asyncio
+async def test_first_install(install_libraries_handler, install_context):
+    install_context["libraries"] = ["requests", "pydantic"]
+
+    result = await install_libraries_handler._install(install_context)
+
+    assert result is None
+    install_libraries_handler._pip.assert_awaited_once_with(
+        install_context, "install", DOTDICT, "pydantic", "requests"
+    )
+    assert load_requirements(install_context) == [DOTDICT, "pydantic", "requests"]
+    assert install_context["hash_file"].exists()
+    install_context["interpreter_pools"].reset.assert_awaited_once_with("venv")
+
+
+@pytest.mark.asyncio
+async def test_unchanged_libraries_are_not_installed(
+    install_libraries_handler, install_context
+):
+    install_context["libraries"] = ["requests"]
+    await install_libraries_handler._install(install_context)
+    install_libraries_handler._pip.reset_mock()
+    install_context["interpreter_pools"].reset.reset_mock()
+
+    install_context["libraries"] = ["requests"]
+    result = await install_libraries_handler._install(install_context)
+
+    assert result is None
+    install_libraries_handler._pip.assert_not_awaited()
+    install_context["interpreter_pools"].reset.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_dropped_packages_are_uninstalled(
+    install_libraries_handler, install_context
+):
+    """
+        - Given a venv with requests 2.31, pydantic and a path and a URL requirement,
+        - When requests 2.32 is requested without the others,
+        - Then only pydantic is uninstalled, requests is replaced by the install.
+    """
+    save_requirements(
+        install_context,
+        [
+            DOTDICT,
+            "requests==2.31.0",
+            "pydantic",
+            "./local_package",
+            "git+https://github.com/org/package.git",
+        ],
+    )
+    install_context["libraries"] = ["requests==2.32.0"]
+
+    result = await install_libraries_handler._install(install_context)
+
+    assert result is None
+    assert install_libraries_handler._pip.await_args_list == [
+        call(install_context, "uninstall", "-y", "pydantic"),
+        call(install_context, "install", DOTDICT, "requests==2.32.0"),
+    ]
+    assert load_requirements(install_context) == [DOTDICT, "requests==2.32.0"]
+    install_context["interpreter_pools"].reset.assert_awaited_once_with("venv")
+
+
+@pytest.mark.asyncio
+async def test_failed_install_is_retried(install_libraries_handler, install_context):
+    """
+        - Given pip fails to install the requested libraries,
+        - When the same libraries are requested again,
+        - Then the error is returned, nothing is saved and the install is retried.
+    """
+    error_result = CodeResultData(
+        execution_id="execution", stderr="error", stdout="", returncode=1
+    )
+    install_libraries_handler._pip.return_value = error_result
+    install_context["libraries"] = ["some-invalid-lib"]
+
+    assert await install_libraries_handler._install(install_context) is error_result
+    assert not (install_context["venv_path"] / "requirements.json").exists()
+    assert not install_context["hash_file"].exists()
+    install_context["interpreter_pools"].reset.assert_not_awaited()
+
+    install_libraries_handler._pip.return_value = None
+    install_context["libraries"] = ["some-invalid-lib"]
+    assert await install_libraries_handler._install(install_context) is None
+    assert install_libraries_handler._pip.await_count == 2
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import pytest
+import fakeredis
+from unittest.mock import AsyncMock, MagicMock
+from models import CodeResultData, CodeTaskData
+from scheduler import CodeTaskScheduler, FairQueue
+from services.redis_service import RedisService
+
+
+@pytest.mark.asyncio
+async def test_fair_queue_round_robin():
+    queue = FairQueue()
+    for i in range(3):
+        await queue.put("session:1", f"a{i}")
+    await queue.put("session:2", "b0")
+    await queue.put("session:3", "c0")
+
+    items = [await queue.get() for _ in range(5)]
+
+    assert items == ["a0", "b0", "c0", "a1", "a2"]
+    assert len(queue) == 0
+    assert queue.depth_by_key() == {}
+
+
+@pytest.mark.asyncio
+async def test_scheduler_executes_stream_tasks():
+    redis_service = RedisService(host="127.0.0.1", port=6379)
+    redis_service.aioredis_client = fakeredis.aioredis.FakeRedis(
+        decode_responses=True
+    )
+
+    executor_chain = MagicMock()
+    executor_chain.run = AsyncMock(
+        side_effect=lambda **kwargs: CodeResultData(
+            execution_id=kwargs["execution_id"], stderr="", stdout=""
+        )
+    )
+
+    scheduler = CodeTaskScheduler(
+        executor_chain=executor_chain,
+        redis_service=redis_service,
+        task_stream="code_exec_tasks",
+        result_channel="code_results",
+        consumer_group="sandbox",
+        consumer_name="test",
+        workers=2,
+    )
+
+    pubsub = await redis_service.async_subscribe("reply")
+    for i in range(3):
+        code_task_data = CodeTaskData(
+            venv_name="venv",
+            libraries=[],
+            code="def main(): return 1",
+            execution_id=str(i),
+            entrypoint="main",
+            reply_channel="reply",
+            session_id=i,
+        )
+        await redis_service.aioredis_client.xadd(
+            "code_exec_tasks", {"data": code_task_data.model_dump_json()}
+        )
+
+    scheduler_task = asyncio.create_task(scheduler.run())
+    execution_ids = set()
+    async with asyncio.timeout(5):
+        while len(execution_ids) < 3:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=1
+            )
+            if message:
+                execution_ids.add(json.loads(message["data"])["execution_id"])
+
+    # Let the workers acknowledge the last entries
+    await asyncio.sleep(0.1)
+    scheduler_task.cancel()
+    await asyncio.gather(scheduler_task, return_exceptions=True)
+
+    assert execution_ids == {"0", "1", "2"}
+    assert scheduler.completed == 3
+    pending = await redis_service.aioredis_client.xpending(
+        "code_exec_tasks", "sandbox"
+    )
+    assert pending["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_claims_all_stale_tasks():
+    redis_service = RedisService(host="127.0.0.1", port=6379)
+    redis_service.aioredis_client = fakeredis.aioredis.FakeRedis(
+        decode_responses=True
+    )
+    await redis_service.ensure_consumer_group("code_exec_tasks", "sandbox")
+    for i in range(3):
+        code_task_data = CodeTaskData(
+            venv_name="venv",
+            libraries=[],
+            code="def main(): return 1",
+            execution_id=str(i),
+            entrypoint="main",
+        )
+        await redis_service.aioredis_client.xadd(
+            "code_exec_tasks", {"data": code_task_data.model_dump_json()}
+        )
+    # Delivered to a replica that never acknowledges them
+    await redis_service.read_group("code_exec_tasks", "sandbox", "dead", count=3)
+
+    scheduler = CodeTaskScheduler(
+        executor_chain=MagicMock(),
+        redis_service=redis_service,
+        task_stream="code_exec_tasks",
+        result_channel="code_results",
+        consumer_group="sandbox",
+        consumer_name="test",
+        workers=2,
+        max_queue_size=1,
+        claim_idle_ms=0,
+    )
+    await scheduler._claim_stale()
+
+    assert len(scheduler.queue) == 3
+
+
+@pytest.mark.asyncio
+async def test_long_running_task_is_not_claimed():
+    redis_service = RedisService(host="127.0.0.1", port=6379)
+    redis_service.aioredis_client = fakeredis.aioredis.FakeRedis(
+        decode_responses=True
+    )
+
+    async def run(**kwargs):
+        # Outlives claim_idle_ms several times
+        await asyncio.sleep(1)
+        return CodeResultData(execution_id=kwargs["execution_id"], stderr="", stdout="")
+
+    executor_chain = MagicMock()
+    executor_chain.run = AsyncMock(side_effect=run)
+    scheduler_kwargs = dict(
+        redis_service=redis_service,
+        task_stream="code_exec_tasks",
+        result_channel="code_results",
+        consumer_group="sandbox",
+        workers=1,
+        claim_idle_ms=300,
+    )
+    scheduler = CodeTaskScheduler(
+        executor_chain=executor_chain, consumer_name="test", **scheduler_kwargs
+    )
+    code_task_data = CodeTaskData(
+        venv_name="venv",
+        libraries=[],
+        code="def main(): return 1",
+        execution_id="0",
+        entrypoint="main",
+    )
+    await redis_service.ensure_consumer_group("code_exec_tasks", "sandbox")
+    await redis_service.aioredis_client.xadd(
+        "code_exec_tasks", {"data": code_task_data.model_dump_json()}
+    )
+
+    scheduler_task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.7)
+    # Another replica does not claim the running task either
+    other_scheduler = CodeTaskScheduler(
+        executor_chain=MagicMock(), consumer_name="other", **scheduler_kwargs
+    )
+    await other_scheduler._claim_stale()
+    async with asyncio.timeout(5):
+        while scheduler.completed < 1:
+            await asyncio.sleep(0.05)
+    await asyncio.sleep(0.5)
+    scheduler_task.cancel()
+    await asyncio.gather(scheduler_task, return_exceptions=True)
+
+    assert len(other_scheduler.queue) == 0
+    assert executor_chain.run.await_count == 1
+    assert scheduler.completed == 1
@@ -17,6 +17,12 @@ load_env_from_yaml_config("/home/user/root/app/env_config/config.yaml")
 init_tools()
 os.chdir("savefiles")
 
+
+@app.get("/health", status_code=200)
+def health():
+    return {"status": "ok"}
+
+
 @app.post(
     "/tool/{tool_alias}/class-data/",
     status_code=200,